@@ -0,0 +1,85 @@
+"""Compare the warm PDFRenderer against the per-call PDFGenerator path.
+
+Usage:
+    python benchmarks/bench_pdf_render.py [--documents 20]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from study_assistant.pdf_generator import PDFGenerator, PDFRenderer
+
+SAMPLE_MARKDOWN = """# Summary
+Cell biology studies the structure and function of cells, the basic unit of life.
+Cells are either prokaryotic or eukaryotic, and eukaryotic cells contain
+membrane-bound organelles such as the nucleus and mitochondria.
+
+# Key Points
+- The plasma membrane controls what enters and leaves the cell
+- Mitochondria produce ATP through cellular respiration
+- Ribosomes synthesize proteins from messenger RNA
+
+# Study Questions
+1. **Question:** What is the role of the mitochondria?
+   **Answer:** They produce most of the cell's ATP through oxidative phosphorylation.
+
+# Flashcards
+**Card 1**
+- **Front:** Basic unit of life
+- **Back:** The cell
+
+| Organelle | Function |
+|-----------|----------|
+| Nucleus   | Stores DNA |
+| Ribosome  | Builds proteins |
+"""
+
+
+def time_renders(render: Callable[[str, Path, str], bool], out_dir: Path, count: int) -> List[float]:
+    """Render ``count`` documents and return per-document seconds."""
+    timings = []
+    for i in range(count):
+        start = time.perf_counter()
+        if not render(SAMPLE_MARKDOWN, out_dir / f"doc_{i}.pdf", "Biology - Study Material"):
+            raise RuntimeError("PDF render failed")
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(name: str, timings: List[float]) -> None:
+    """Print summary statistics for one renderer."""
+    print(
+        f"{name:<22} first {timings[0] * 1000:8.1f} ms   "
+        f"median {statistics.median(timings) * 1000:8.1f} ms   "
+        f"mean {statistics.mean(timings) * 1000:8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=20, help="Documents per renderer")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        
+        cold = time_renders(PDFGenerator.markdown_to_pdf, out_dir, args.documents)
+        
+        setup_start = time.perf_counter()
+        renderer = PDFRenderer()
+        setup = time.perf_counter() - setup_start
+        warm = time_renders(renderer.render, out_dir, args.documents)
+    
+    print(f"{args.documents} documents each\n")
+    report("PDFGenerator (static)", cold)
+    report("PDFRenderer (warm)", warm)
+    print(f"\nPDFRenderer one-time setup: {setup * 1000:.1f} ms")
+    print(f"Median speedup: {statistics.median(cold) / statistics.median(warm):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
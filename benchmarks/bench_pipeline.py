@@ -0,0 +1,307 @@
+"""End-to-end throughput benchmark against the mock OpenAI server.
+
+Generates a synthetic corpus (see corpus.py), serves chat completions from
+mock_openai_server.py in this process and runs the real pipeline over the
+corpus, either as ``process`` (every note at once) or as the watcher
+(notes moved into the incoming folder while it runs). Reports files per
+minute, p50/p95 seconds per pipeline stage and peak RSS, without any
+real API calls.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--mode process|watch] [--files 40] [--workers 4]
+        [--latency 1.0] [--jitter 0.3] [--rate-429 0.02] [--capacity 6] [--response-tokens 1200]
+        [--cassette run.jsonl [--upstream https://api.openai.com/v1]] [--json report.json]
+        [--backends 0.3,1.0,3.0 [--backend-concurrency 4] [--dead-backends 1]]
+
+``--backends`` starts one mock server per latency given and routes the
+pipeline across them through an LLM_ENDPOINTS_FILE; ``--dead-backends``
+adds endpoints that refuse connections, to exercise ejection.
+
+Settings not given here (MAX_REQUESTS_PER_MINUTE, PDF_WORKERS, PDF_EXTRACTOR,
+STREAM_OUTPUT, ...) are read from the environment as usual. PDF render
+timings need WeasyPrint and its system libraries installed.
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from corpus import generate_corpus, parse_mix, parse_pages
+from mock_openai_server import Cassette, MockOpenAIState, make_server
+
+STAGES = ("parse", "llm", "write", "pdf", "note")
+
+
+class StageTimer:
+    """Collect wall-clock durations per pipeline stage from any thread."""
+    
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+    
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.durations[stage].append(seconds)
+    
+    def wrap(self, stage: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Return ``func`` timed as ``stage``."""
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+        return timed
+    
+    def wrap_future(self, stage: str, func: Callable[..., Future]) -> Callable[..., Future]:
+        """Return ``func`` timed as ``stage`` until the future it returns is done."""
+        def timed(*args: Any, **kwargs: Any) -> Future:
+            start = time.perf_counter()
+            future = func(*args, **kwargs)
+            future.add_done_callback(lambda _: self.record(stage, time.perf_counter() - start))
+            return future
+        return timed
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return count, p50 and p95 seconds per stage."""
+        summary = {}
+        with self._lock:
+            for stage in STAGES:
+                values = sorted(self.durations.get(stage, []))
+                if values:
+                    summary[stage] = {
+                        "count": len(values),
+                        "p50": percentile(values, 0.50),
+                        "p95": percentile(values, 0.95),
+                    }
+        return summary
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Return the given percentile of sorted values."""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    """Peak resident set size of this process and of its finished children."""
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale,
+    }
+
+
+def instrument(processor: Any, timer: StageTimer) -> None:
+    """Time the stages of one NoteProcessor by wrapping its collaborators."""
+    file_handler = processor.file_handler
+    file_handler.read_note_file = timer.wrap("parse", file_handler.read_note_file)
+    file_handler.save_output = timer.wrap("write", file_handler.save_output)
+    # Streamed generation writes as it goes, so it counts as one LLM stage
+    file_handler.save_output_stream = timer.wrap("llm", file_handler.save_output_stream)
+    processor.ai_client.generate_study_material = timer.wrap("llm", processor.ai_client.generate_study_material)
+    processor.pdf_pool.submit = timer.wrap_future("pdf", processor.pdf_pool.submit)
+    processor._process_note = timer.wrap_future("note", processor._process_note)
+
+
+def run_process(processor: Any, staging: Path, incoming: Path) -> float:
+    """Move the corpus in and run ``process`` over it; return elapsed seconds."""
+    for path in staging.iterdir():
+        shutil.move(str(path), incoming / path.name)
+    
+    start = time.perf_counter()
+    results = processor.process_all_notes()
+    elapsed = time.perf_counter() - start
+    
+    failed = [name for name, ok in results.items() if not ok]
+    if failed:
+        print(f"{len(failed)} note(s) failed: {', '.join(failed[:5])}")
+    return elapsed
+
+
+def run_watch(processor: Any, staging: Path, incoming: Path, config: Any, interval: float, timeout: float) -> float:
+    """Start the watcher, move the corpus in and wait until every note is handled."""
+    from watchdog.observers import Observer
+    
+    from study_assistant.auto_watcher import NoteWatcher
+    
+    files = sorted(staging.iterdir())
+    watcher = NoteWatcher(processor, config.watch_workers, config.watch_queue_size, config.watch_settle_seconds)
+    observer = Observer()
+    observer.schedule(watcher, str(incoming), recursive=False)
+    observer.start()
+    watcher.start(reconcile=False)
+    
+    try:
+        start = time.perf_counter()
+        for path in files:
+            # A rename, like a browser download or an editor's atomic save
+            os.replace(path, incoming / path.name)
+            if interval:
+                time.sleep(interval)
+        
+        deadline = time.monotonic() + timeout
+        while watcher.stats()["completed"] < len(files):
+            if time.monotonic() > deadline:
+                print(f"Timed out with {watcher.stats()['completed']} of {len(files)} note(s) handled")
+                break
+            time.sleep(0.05)
+        return time.perf_counter() - start
+    finally:
+        observer.stop()
+        observer.join()
+        watcher.stop()
+
+
+def write_endpoints(path: Path, servers: List[Any], dead: int, concurrency: int) -> Path:
+    """Write an endpoints file for the mock servers plus ``dead`` unreachable endpoints."""
+    urls = [f"http://127.0.0.1:{server.server_port}/v1" for server in servers]
+    for _ in range(dead):
+        # A port that was free a moment ago refuses connections
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            urls.append(f"http://127.0.0.1:{sock.getsockname()[1]}/v1")
+    
+    entries = [
+        {"name": f"mock{i}" if i < len(servers) else f"dead{i - len(servers)}",
+         "base_url": url, "max_concurrency": concurrency}
+        for i, url in enumerate(urls)
+    ]
+    # JSON is valid YAML
+    path.write_text(json.dumps(entries, indent=2), encoding="utf-8")
+    return path
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("process", "watch"), default="process")
+    parser.add_argument("--files", type=int, default=40, help="Notes in the corpus")
+    parser.add_argument("--mix", default="txt=2,md=1,pdf=1,docx=1", help="Corpus format weights")
+    parser.add_argument("--pages", default="1-8", help="Pages per note, N or MIN-MAX")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the corpus and the mock server")
+    parser.add_argument("--workers", type=int, default=None, help="MAX_WORKERS / WATCH_WORKERS for this run")
+    parser.add_argument("--settle", type=float, default=0.2, help="WATCH_SETTLE_SECONDS in watch mode")
+    parser.add_argument("--interval", type=float, default=0.0, help="Seconds between arrivals in watch mode")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Longest wait for watch mode to finish")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean completion latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Uniform latency variation in seconds")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of completions answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with a 429")
+    parser.add_argument("--response-tokens", type=int, default=800, help="Approximate completion length")
+    parser.add_argument("--capacity", type=int, default=0, help="Completions each mock serves at once before 429s")
+    parser.add_argument("--cassette", type=Path, default=None, help="Replay completions recorded in this file")
+    parser.add_argument("--upstream", default=None, help="Record cassette misses from this base URL")
+    parser.add_argument("--json", type=Path, default=None, help="Also write the report as JSON")
+    parser.add_argument("--backends", default=None, help="Comma-separated latencies, one mock endpoint each")
+    parser.add_argument("--backend-concurrency", type=int, default=4, help="max_concurrency of each endpoint")
+    parser.add_argument("--dead-backends", type=int, default=0, help="Endpoints that refuse connections")
+    args = parser.parse_args()
+    
+    cassette = None
+    if args.cassette:
+        cassette = Cassette(args.cassette, args.upstream, os.environ.get("OPENAI_API_KEY"))
+    latencies = [float(value) for value in args.backends.split(",")] if args.backends else [args.latency]
+    states = [
+        MockOpenAIState(
+            latency=latency,
+            jitter=args.jitter,
+            rate_429=args.rate_429,
+            retry_after=args.retry_after,
+            response_tokens=args.response_tokens,
+            seed=args.seed + i,
+            cassette=cassette,
+            capacity=args.capacity
+        )
+        for i, latency in enumerate(latencies)
+    ]
+    servers = [make_server(state=state) for state in states]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, name="mock-openai", daemon=True).start()
+    
+    with tempfile.TemporaryDirectory(prefix="notepal-bench-") as tmp:
+        workdir = Path(tmp)
+        staging, incoming, output = workdir / "staging", workdir / "incoming", workdir / "output"
+        incoming.mkdir()
+        generate_corpus(staging, args.files, parse_mix(args.mix), parse_pages(args.pages), args.seed)
+        
+        from study_assistant import processor as processor_module
+        from study_assistant.config import AppConfig
+        
+        overrides: Dict[str, Any] = {
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{servers[0].server_port}/v1",
+            "NOTES_INCOMING_DIR": incoming,
+            "NOTES_OUTPUT_DIR": output,
+            "PROCESSED_INDEX_PATH": workdir / "processed.json",
+            "CACHE_DIR": workdir / "cache",
+            # Every run starts cold: cached responses would skip the LLM stage
+            "USE_CACHE": False,
+            "WATCH_SETTLE_SECONDS": args.settle,
+        }
+        if args.workers:
+            overrides["MAX_WORKERS"] = overrides["WATCH_WORKERS"] = args.workers
+        if args.backends or args.dead_backends:
+            overrides["LLM_ENDPOINTS_FILE"] = write_endpoints(
+                workdir / "endpoints.yaml", servers, args.dead_backends, args.backend_concurrency
+            )
+        config = AppConfig(**overrides)
+        processor_module.OUTPUT_BASE = output
+        
+        processor = processor_module.NoteProcessor(config)
+        timer = StageTimer()
+        instrument(processor, timer)
+        try:
+            if args.mode == "process":
+                elapsed = run_process(processor, staging, incoming)
+            else:
+                elapsed = run_watch(processor, staging, incoming, config, args.interval, args.timeout)
+        finally:
+            processor.close()
+            for server in servers:
+                server.shutdown()
+        endpoints = processor.ai_client.endpoints.stats()
+    
+    handled = len(timer.durations.get("note", []))
+    report = {
+        "mode": args.mode,
+        "files": args.files,
+        "handled": handled,
+        "elapsed_seconds": elapsed,
+        "files_per_minute": handled / elapsed * 60 if elapsed else 0.0,
+        "stages": timer.summary(),
+        "peak_rss_mb": peak_rss_mb(),
+        "server": {key: sum(state.stats()[key] for state in states) for key in states[0].stats()},
+        "endpoints": endpoints,
+    }
+    
+    print(f"\n{args.mode}: {handled}/{args.files} note(s) in {elapsed:.2f}s = {report['files_per_minute']:.1f} files/min")
+    for stage, figures in report["stages"].items():
+        print(f"  {stage:<6} n={figures['count']:<5} p50 {figures['p50']:7.3f}s   p95 {figures['p95']:7.3f}s")
+    rss = report["peak_rss_mb"]
+    print(f"  peak RSS {rss['self']:.0f} MB (children {rss['children']:.0f} MB)")
+    print(f"  server {', '.join(f'{k}={v}' for k, v in report['server'].items())}")
+    if len(endpoints) > 1 or args.capacity:
+        for stats in endpoints:
+            print(
+                f"  {stats['name']:<10} requests={stats['requests']} failures={stats['failures']} "
+                f"latency={stats['latency']:.2f}s limit={stats['limit']} ejected={stats['ejected']}"
+            )
+    
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
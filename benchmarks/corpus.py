@@ -0,0 +1,191 @@
+"""Generate a synthetic corpus of notes for benchmarks.
+
+Notes are named ``<subject>_<topic>_<n>.<ext>`` so NotePal files them by
+subject, and are written as plain text, Markdown, PDF and DOCX in the
+requested mix. Content is drawn from a fixed vocabulary with a seed, so
+the same arguments always produce the same corpus.
+
+Usage:
+    python benchmarks/corpus.py OUT_DIR [--files 40] [--mix txt=2,md=1,pdf=1,docx=1] [--pages 1-8]
+"""
+
+import argparse
+import random
+import sys
+import textwrap
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SUBJECTS = ("biology", "history", "physics", "economics", "chemistry", "literature")
+
+TOPICS = ("lecture", "seminar", "reading", "lab", "review")
+
+VOCABULARY = (
+    "cell membrane protein energy reaction equilibrium market demand supply "
+    "revolution treaty empire force velocity momentum field particle wave "
+    "novel narrative author theme structure function process system model "
+    "theory evidence experiment result analysis concept example definition "
+    "important because therefore however although consider observe measure "
+    "the a of and to in is that for with as on by from which this are"
+).split()
+
+DEFAULT_MIX = {"txt": 2, "md": 1, "pdf": 1, "docx": 1}
+
+# Roughly one printed page of notes
+LINES_PER_PAGE = 40
+LINE_WIDTH = 80
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    """
+    Parse a format mix such as ``txt=2,pdf=1``.
+    
+    Args:
+        spec: Comma-separated ``format=weight`` pairs
+    
+    Returns:
+        Mapping of format to relative weight
+    
+    Raises:
+        ValueError: If a format is unknown or a weight is not an integer
+    """
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip().lower()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown format {name!r}, expected one of {', '.join(DEFAULT_MIX)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def parse_pages(spec: str) -> Tuple[int, int]:
+    """Parse a page count or ``min-max`` range."""
+    low, _, high = spec.partition("-")
+    return int(low), int(high or low)
+
+
+def make_page(rng: random.Random, subject: str, number: int) -> str:
+    """Return one page of note text with a heading and paragraphs."""
+    lines = [f"{subject.title()} notes, part {number}", ""]
+    while len(lines) < LINES_PER_PAGE:
+        words = [rng.choice(VOCABULARY) for _ in range(rng.randint(30, 90))]
+        paragraph = " ".join(words).capitalize() + "."
+        lines.extend(textwrap.wrap(paragraph, LINE_WIDTH))
+        lines.append("")
+    return "\n".join(lines[:LINES_PER_PAGE])
+
+
+def write_text(path: Path, pages: List[str]) -> None:
+    path.write_text("\n\n".join(pages), encoding="utf-8")
+
+
+def write_markdown(path: Path, pages: List[str]) -> None:
+    sections = []
+    for page in pages:
+        heading, _, body = page.partition("\n")
+        sections.append(f"## {heading}\n{body}")
+    path.write_text("\n\n".join(sections), encoding="utf-8")
+
+
+def write_docx(path: Path, pages: List[str]) -> None:
+    from docx import Document
+    
+    document = Document()
+    for page in pages:
+        heading, _, body = page.partition("\n")
+        document.add_heading(heading, level=2)
+        for paragraph in body.split("\n\n"):
+            if paragraph.strip():
+                document.add_paragraph(" ".join(paragraph.split()))
+    document.save(str(path))
+
+
+def write_pdf(path: Path, pages: List[str]) -> None:
+    """Write a text PDF with one Helvetica page per entry, without dependencies."""
+    font_id = 3 + 2 * len(pages)
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode("ascii"),
+    ]
+    for i, page in enumerate(pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>".encode("ascii")
+        )
+        shown = " ".join(
+            "(" + line.replace("\\", "").replace("(", "").replace(")", "") + ") '"
+            for line in page.split("\n")
+        )
+        stream = f"BT /F1 11 Tf 56 740 Td 16 TL {shown} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode("latin-1"))
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("ascii")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii")
+    path.write_bytes(bytes(out))
+
+
+WRITERS = {"txt": write_text, "md": write_markdown, "pdf": write_pdf, "docx": write_docx}
+
+
+def generate_corpus(
+    out_dir: Path,
+    files: int,
+    mix: Dict[str, int] = DEFAULT_MIX,
+    pages: Tuple[int, int] = (1, 8),
+    seed: int = 0
+) -> List[Path]:
+    """
+    Write a synthetic corpus of notes.
+    
+    Args:
+        out_dir: Directory to write into (created if missing)
+        files: Number of notes
+        mix: Relative weight of each format
+        pages: Inclusive range of pages per note
+        seed: Random seed
+    
+    Returns:
+        Paths of the written notes
+    """
+    rng = random.Random(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    formats = [name for name, weight in mix.items() for _ in range(weight)]
+    
+    paths = []
+    for n in range(files):
+        ext = formats[n % len(formats)]
+        subject = rng.choice(SUBJECTS)
+        note_pages = [make_page(rng, subject, i + 1) for i in range(rng.randint(*pages))]
+        path = out_dir / f"{subject}_{rng.choice(TOPICS)}_{n:04d}.{ext}"
+        WRITERS[ext](path, note_pages)
+        paths.append(path)
+    return paths
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--files", type=int, default=40, help="Number of notes")
+    parser.add_argument("--mix", default="txt=2,md=1,pdf=1,docx=1", help="Format weights")
+    parser.add_argument("--pages", default="1-8", help="Pages per note, N or MIN-MAX")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    paths = generate_corpus(args.out_dir, args.files, parse_mix(args.mix), parse_pages(args.pages), args.seed)
+    print(f"Wrote {len(paths)} note(s) to {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,486 @@
+"""Local stand-in for the OpenAI endpoints NotePal uses.
+
+Serves chat completions (plain and streamed), file uploads and the Batch
+API so the CLI can be exercised without real API calls:
+
+    python benchmarks/mock_openai_server.py --port 8089
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=test study-assistant process --batch
+
+Chat completions can be made slow, jittery, throttled (HTTP 429 with
+Retry-After) and long, to approximate the real API under load:
+
+    python benchmarks/mock_openai_server.py --latency 2 --jitter 0.5 --rate-429 0.05 --response-tokens 1500
+
+``--capacity N`` answers 429 whenever N completions are already in flight,
+like an API that throttles on concurrency rather than at random.
+
+Real responses can be recorded once through the mock and replayed later for
+deterministic reruns:
+
+    OPENAI_API_KEY=sk-... python benchmarks/mock_openai_server.py --cassette run.jsonl --upstream https://api.openai.com/v1
+    python benchmarks/mock_openai_server.py --cassette run.jsonl
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import random
+import threading
+import time
+import urllib.request
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+STUDY_MATERIAL = """# Summary
+These notes cover the main concepts of the lecture.
+
+# Key Points
+- First key point
+- Second key point
+
+# Study Questions
+1. **Question:** What is the main concept?
+   **Answer:** The main concept of the lecture.
+
+# Flashcards
+**Card 1**
+- **Front:** Main concept
+- **Back:** The main concept of the lecture
+"""
+
+
+class Cassette:
+    """
+    Chat completion texts keyed by request, stored as JSONL.
+    
+    With an ``upstream`` endpoint, misses are fetched from it and appended
+    to the file (recording); without one, the file is only read (replay).
+    """
+    
+    def __init__(self, path: Path, upstream: Optional[str] = None, api_key: Optional[str] = None):
+        """
+        Initialize cassette.
+        
+        Args:
+            path: JSONL file of ``{"key": ..., "content": ...}`` lines
+            upstream: Real OpenAI-compatible base URL to record from
+            api_key: API key for the upstream endpoint
+        """
+        self.path = path
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.api_key = api_key
+        self.entries: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["key"]] = entry["content"]
+    
+    @staticmethod
+    def key(body: Dict[str, Any]) -> str:
+        """Identify a request by the fields that determine its response."""
+        fields = [body.get("model"), body.get("messages"), body.get("max_tokens"), body.get("temperature")]
+        return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+    
+    def lookup(self, body: Dict[str, Any]) -> Optional[str]:
+        """Return the recorded text for a request, recording it first if possible."""
+        key = self.key(body)
+        with self._lock:
+            content = self.entries.get(key)
+        if content is not None:
+            self.hits += 1
+            return content
+        
+        self.misses += 1
+        if not self.upstream:
+            return None
+        
+        content = self._fetch(body)
+        with self._lock:
+            self.entries[key] = content
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "content": content}) + "\n")
+        return content
+    
+    def _fetch(self, body: Dict[str, Any]) -> str:
+        """Run a request against the upstream endpoint without streaming."""
+        request_body = {k: v for k, v in body.items() if k not in ("stream", "stream_options")}
+        request = urllib.request.Request(
+            f"{self.upstream}/chat/completions",
+            data=json.dumps(request_body).encode("utf-8"),
+            headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.api_key}"}
+        )
+        with urllib.request.urlopen(request, timeout=600) as response:
+            return json.load(response)["choices"][0]["message"]["content"]
+
+
+class MockOpenAIState:
+    """Uploaded files, batch jobs and response behaviour, shared by all request handlers."""
+    
+    def __init__(
+        self,
+        batch_delay: float = 0.0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_429: float = 0.0,
+        retry_after: float = 1.0,
+        response_tokens: int = 0,
+        seed: Optional[int] = None,
+        cassette: Optional[Cassette] = None,
+        capacity: int = 0
+    ):
+        """
+        Initialize server state.
+        
+        Args:
+            batch_delay: Seconds a batch stays in_progress before completing
+            latency: Mean seconds before a chat completion starts responding
+            jitter: Latency varies uniformly by up to this many seconds either way
+            rate_429: Fraction of chat completions rejected with HTTP 429
+            retry_after: Retry-After seconds sent with a 429
+            response_tokens: Approximate completion length (0 sends the sample once)
+            seed: Seed for latency and 429 draws, for repeatable runs
+            cassette: Recorded responses to serve instead of the sample
+            capacity: Completions served at once before the rest get a 429
+                (0 for no limit)
+        """
+        self.batch_delay = batch_delay
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.response_tokens = response_tokens
+        self.cassette = cassette
+        self.capacity = capacity
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.active = 0
+        self.peak_active = 0
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+    
+    def new_id(self, prefix: str) -> str:
+        with self.lock:
+            return f"{prefix}-{next(self._ids)}"
+    
+    def admit(self) -> Tuple[bool, float]:
+        """
+        Decide how to answer the next chat completion.
+        
+        Returns:
+            Whether to throttle it, and the seconds to wait before responding
+        """
+        with self.lock:
+            self.requests += 1
+            if self._random.random() < self.rate_429 or (self.capacity and self.active >= self.capacity):
+                self.throttled += 1
+                return True, 0.0
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        return False, max(0.0, delay)
+    
+    def release(self) -> None:
+        """Mark an admitted chat completion as answered."""
+        with self.lock:
+            self.active -= 1
+    
+    def stats(self) -> Dict[str, int]:
+        """Return request counters."""
+        stats = {"requests": self.requests, "throttled": self.throttled, "peak_active": self.peak_active}
+        if self.cassette is not None:
+            stats.update(cassette_hits=self.cassette.hits, cassette_misses=self.cassette.misses)
+        return stats
+    
+    def completion_text(self, body: Dict[str, Any]) -> str:
+        """Return the study material for one chat completion request."""
+        if self.cassette is not None:
+            content = self.cassette.lookup(body)
+            if content is not None:
+                return content
+        
+        if self.response_tokens <= 0:
+            return STUDY_MATERIAL
+        repeats = max(1, self.response_tokens * 4 // len(STUDY_MATERIAL))
+        return "\n".join([STUDY_MATERIAL] * repeats)
+    
+    def completion(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a chat completion response body."""
+        content = self.completion_text(body)
+        prompt_tokens = sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": self.new_id("chatcmpl"),
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+    
+    def add_file(self, filename: str, content: bytes, purpose: str) -> Dict[str, Any]:
+        file_id = self.new_id("file")
+        record = {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed"
+        }
+        with self.lock:
+            self.files[file_id] = {"record": record, "content": content}
+        return record
+    
+    def create_batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        batch_id = self.new_id("batch")
+        batch = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": body["endpoint"],
+            "input_file_id": body["input_file_id"],
+            "completion_window": body.get("completion_window", "24h"),
+            "status": "in_progress",
+            "created_at": int(time.time()),
+            "output_file_id": None,
+            "error_file_id": None,
+            "metadata": body.get("metadata"),
+            "request_counts": {"completed": 0, "failed": 0, "total": 0}
+        }
+        with self.lock:
+            self.batches[batch_id] = batch
+        return batch
+    
+    def retrieve_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Return a batch, completing it once ``batch_delay`` has passed."""
+        with self.lock:
+            batch = self.batches.get(batch_id)
+        if batch is None:
+            return None
+        if batch["status"] == "in_progress" and time.time() - batch["created_at"] >= self.batch_delay:
+            self._complete_batch(batch)
+        return batch
+    
+    def _complete_batch(self, batch: Dict[str, Any]) -> None:
+        with self.lock:
+            requests = self.files[batch["input_file_id"]]["content"].decode("utf-8")
+        
+        lines = []
+        for line in requests.splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            lines.append(json.dumps({
+                "id": self.new_id("batch_req"),
+                "custom_id": request["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "request_id": self.new_id("req"),
+                    "body": self.completion(request["body"])
+                },
+                "error": None
+            }))
+        
+        output = self.add_file("batch_output.jsonl", ("\n".join(lines) + "\n").encode("utf-8"), "batch_output")
+        batch.update(
+            status="completed",
+            output_file_id=output["id"],
+            completed_at=int(time.time()),
+            request_counts={"completed": len(lines), "failed": 0, "total": len(lines)}
+        )
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """HTTP handler implementing the subset of the OpenAI API NotePal calls."""
+    
+    state: MockOpenAIState
+    
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+    
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+    
+    def _send_json(self, payload: Any, status: int = 200) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _send_rate_limited(self) -> None:
+        data = json.dumps({"error": {
+            "message": "Rate limit reached (mock)",
+            "type": "requests",
+            "code": "rate_limit_exceeded"
+        }}).encode("utf-8")
+        self.send_response(429)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Retry-After", f"{self.state.retry_after:g}")
+        self.send_header("retry-after-ms", str(int(self.state.retry_after * 1000)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _not_found(self) -> None:
+        self._send_json({"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}}, 404)
+    
+    def do_POST(self) -> None:
+        body = self._read_body()
+        
+        if self.path == "/v1/chat/completions":
+            request = json.loads(body)
+            throttle, delay = self.state.admit()
+            if throttle:
+                self._send_rate_limited()
+                return
+            try:
+                time.sleep(delay)
+                if request.get("stream"):
+                    self._stream_completion(request)
+                else:
+                    self._send_json(self.state.completion(request))
+            finally:
+                self.state.release()
+        elif self.path == "/v1/files":
+            filename, content, purpose = self._parse_upload(body)
+            self._send_json(self.state.add_file(filename, content, purpose))
+        elif self.path == "/v1/batches":
+            self._send_json(self.state.create_batch(json.loads(body)))
+        else:
+            self._not_found()
+    
+    def do_GET(self) -> None:
+        parts = self.path.strip("/").split("/")
+        
+        if parts[:2] == ["v1", "batches"] and len(parts) == 3:
+            batch = self.state.retrieve_batch(parts[2])
+            self._send_json(batch) if batch else self._not_found()
+        elif parts[:2] == ["v1", "files"] and len(parts) == 4 and parts[3] == "content":
+            stored = self.state.files.get(parts[2])
+            if stored is None:
+                self._not_found()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(stored["content"])))
+            self.end_headers()
+            self.wfile.write(stored["content"])
+        else:
+            self._not_found()
+    
+    def _stream_completion(self, request: Dict[str, Any]) -> None:
+        """Send a completion as server-sent events, one word per event."""
+        completion = self.state.completion(request)
+        content = completion["choices"][0]["message"]["content"]
+        
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        
+        def event(payload: Dict[str, Any]) -> None:
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        
+        base = {"id": completion["id"], "object": "chat.completion.chunk",
+                "created": completion["created"], "model": completion["model"]}
+        for word in content.split(" "):
+            event({**base, "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]})
+        event({**base, "choices": [], "usage": completion["usage"]})
+        self.wfile.write(b"data: [DONE]\n\n")
+    
+    def _parse_upload(self, body: bytes) -> Tuple[str, bytes, str]:
+        """Extract filename, content and purpose from a multipart upload."""
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8")
+        message = BytesParser(policy=HTTP).parsebytes(header + body)
+        filename, content, purpose = "upload.jsonl", b"", "batch"
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if name == "file":
+                filename = part.get_filename() or filename
+                content = part.get_payload(decode=True) or b""
+            elif name == "purpose":
+                purpose = part.get_content().strip()
+        return filename, content, purpose
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, state: Optional[MockOpenAIState] = None) -> ThreadingHTTPServer:
+    """
+    Create (but do not start) a mock server.
+    
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+        state: Server state (a fresh one by default)
+    
+    Returns:
+        Server; its base URL is ``http://host:server.server_port/v1``
+    """
+    handler = type("BoundMockOpenAIHandler", (MockOpenAIHandler,), {"state": state or MockOpenAIState()})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--batch-delay", type=float, default=0.0, help="Seconds before a batch completes")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean seconds before a completion responds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform latency variation in seconds")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of completions answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with a 429")
+    parser.add_argument("--response-tokens", type=int, default=0, help="Approximate completion length")
+    parser.add_argument("--capacity", type=int, default=0, help="Completions served at once before 429s")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for latency and 429 draws")
+    parser.add_argument("--cassette", type=Path, default=None, help="JSONL file of recorded responses to replay")
+    parser.add_argument("--upstream", default=None, help="Record cassette misses from this base URL")
+    args = parser.parse_args()
+    
+    cassette = None
+    if args.cassette:
+        cassette = Cassette(args.cassette, args.upstream, os.environ.get("OPENAI_API_KEY"))
+    state = MockOpenAIState(
+        batch_delay=args.batch_delay,
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        response_tokens=args.response_tokens,
+        seed=args.seed,
+        cassette=cassette,
+        capacity=args.capacity
+    )
+    server = make_server(args.host, args.port, state)
+    print(f"Mock OpenAI server on http://{args.host}:{server.server_port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,12 @@ import typer
 from rich.console import Console
 
 from .config import load_config
-from .processor import NoteProcessor
 from .utils.logger import setup_logger
 
+# The processing modules are imported inside the commands that need them, so
+# `info` and `--help` start without loading the OpenAI SDK, WeasyPrint or the
+# document parsers.
+
 app = typer.Typer(
     name="study-assistant",
     help="AI-powered study assistant that processes notes automatically"
@@ -30,10 +33,46 @@ def process(
         "--log-level",
         "-l",
         help="Logging level (DEBUG, INFO, WARNING, ERROR)"
+    ),
+    workers: Optional[int] = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        min=1,
+        help="Number of notes to process concurrently"
+    ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Always call the API instead of reusing cached study material"
+    ),
+    stream: bool = typer.Option(
+        False,
+        "--stream",
+        help="Write and print study material as it is generated"
+    ),
+    batch: bool = typer.Option(
+        False,
+        "--batch",
+        help="Submit pending notes as one OpenAI Batch API job (see 'collect')"
+    ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Sample each stage and write flame graph profiles next to the outputs"
+    ),
+    token_budget: Optional[int] = typer.Option(
+        None,
+        "--token-budget",
+        min=1,
+        help="Stop starting notes once this many API tokens (estimated) are used"
     )
 ) -> None:
     """Process all unprocessed notes in the incoming directory."""
     try:
+        from .batch import BatchProcessor
+        from .processor import NoteProcessor
+        
         # Load configuration
         config = load_config()
         
@@ -42,6 +81,12 @@ def process(
             config.notes_incoming_dir = incoming_dir
         if log_level:
             config.log_level = log_level
+        if workers:
+            config.max_workers = workers
+        if no_cache:
+            config.use_cache = False
+        if stream:
+            config.stream_output = True
         
         # Setup logger
         logger = setup_logger("study_assistant", config.log_level)
@@ -50,8 +95,18 @@ def process(
         console.print("\n[bold blue]Study Assistant[/bold blue]\n", style="bold")
         
         # Process notes
-        processor = NoteProcessor(config)
-        results = processor.process_all_notes()
+        # Echo tokens only when one note is generated at a time
+        on_token = None
+        if config.stream_output and config.max_workers == 1:
+            on_token = lambda token: console.out(token, end="", highlight=False)
+        processor = NoteProcessor(config, on_token=on_token, profile=profile)
+        try:
+            if batch:
+                results = BatchProcessor(processor).submit_pending()
+            else:
+                results = processor.process_all_notes(token_budget=token_budget)
+        finally:
+            processor.close()
         
         if not results:
             console.print("[yellow]No new files to process[/yellow]")
@@ -61,6 +116,38 @@ def process(
         raise typer.Exit(code=1)
 
 
+@app.command()
+def collect(
+    log_level: Optional[str] = typer.Option(
+        None,
+        "--log-level",
+        "-l",
+        help="Logging level (DEBUG, INFO, WARNING, ERROR)"
+    )
+) -> None:
+    """Collect finished batch jobs into subject folders and PDFs."""
+    try:
+        from .batch import BatchProcessor
+        from .processor import NoteProcessor
+        
+        config = load_config()
+        if log_level:
+            config.log_level = log_level
+        setup_logger("study_assistant", config.log_level)
+        
+        console.print("\n[bold blue]Study Assistant[/bold blue]\n", style="bold")
+        
+        processor = NoteProcessor(config)
+        try:
+            BatchProcessor(processor).collect()
+        finally:
+            processor.close()
+        
+    except Exception as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(code=1)
+
+
 @app.command()
 def info() -> None:
     """Display configuration and system information."""
@@ -69,8 +156,20 @@ def info() -> None:
         
         console.print("\n[bold]Study Assistant Configuration[/bold]\n")
         console.print(f"Model: {config.openai_model}")
+        if config.llm_endpoints_file:
+            console.print(f"Endpoints: {config.llm_endpoints_file}")
         console.print(f"Incoming Directory: {config.notes_incoming_dir}")
         console.print(f"Index Path: {config.processed_index_path}")
+        console.print(f"Workers: {config.max_workers}")
+        console.print(f"Response Cache: {config.cache_dir if config.use_cache else 'disabled'}")
+        console.print(
+            f"Text Cache: {config.text_cache_max_mb} MB" if config.text_cache_max_mb else "Text Cache: disabled"
+        )
+        console.print(f"Metrics: {config.metrics_dir if config.metrics_enabled else 'disabled'}")
+        console.print(
+            f"Rate Limit: {config.max_requests_per_minute} req/min, "
+            f"{config.max_tokens_per_minute} tokens/min"
+        )
         console.print(f"Log Level: {config.log_level}\n")
         
     except Exception as e:
@@ -78,11 +177,17 @@ def info() -> None:
         raise typer.Exit(code=1)
     
 @app.command()
-def watch() -> None:
+def watch(
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Sample each stage and write flame graph profiles next to the outputs"
+    )
+) -> None:
     """Watch incoming directory and auto-process new notes."""
     try:
         from .auto_watcher import start_watching
-        start_watching()
+        start_watching(profile=profile)
     except KeyboardInterrupt:
         console.print("\n[yellow]Stopped watching[/yellow]")
     except Exception as e:
@@ -0,0 +1,216 @@
+"""Adaptive concurrency limits and retry backoff for API requests."""
+
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Exponential backoff without a server hint: base * 2^attempt, capped, fully jittered
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+
+# Longest server-requested wait honoured before retrying anyway
+MAX_RETRY_HINT = 120.0
+
+# Extra wait on top of a server hint, as a fraction of it, so that
+# throttled requests do not all come back at the same instant
+HINT_JITTER = 0.1
+
+# Seconds per unit of an x-ratelimit-reset duration
+DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+# 4xx statuses worth retrying: timeout, conflict, rate limit
+RETRYABLE_STATUSES = (408, 409, 429)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on the requests one endpoint has in flight.
+    
+    While requests succeed at normal latency and the limit is what holds
+    requests back, it grows: by one per success at first (slow start),
+    then by about one per window of requests. A 429, 5xx or timeout
+    halves it and ends slow start; failures from requests that were
+    already in flight when it was cut count once. A success slower than
+    ``latency_tolerance`` times the fastest recent latency means the
+    server is queueing, so the limit holds.
+    """
+    
+    DECREASE = 0.5
+    
+    # How fast the latency baseline follows slower responses
+    BASELINE_DRIFT = 0.05
+    
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 64,
+        latency_tolerance: float = 2.0
+    ):
+        """
+        Initialize limit.
+        
+        Args:
+            initial: Starting limit
+            minimum: Lowest the limit is cut to
+            maximum: Highest the limit grows to
+            latency_tolerance: Latency, as a multiple of the baseline, above
+                which the limit stops growing
+        """
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = float(min(self.maximum, max(minimum, initial)))
+        self.latency_tolerance = latency_tolerance
+        self.slow_start = True
+        self.baseline: Optional[float] = None
+        self._last_decrease = 0.0
+    
+    @property
+    def current(self) -> int:
+        """Requests that may be in flight now."""
+        return int(self.limit)
+    
+    def on_success(self, latency: float, in_flight: int) -> None:
+        """
+        Record a successful request.
+        
+        Args:
+            latency: Seconds the request took
+            in_flight: Requests in flight when it finished, itself included
+        """
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+        else:
+            self.baseline += self.BASELINE_DRIFT * (latency - self.baseline)
+        
+        if latency > self.latency_tolerance * self.baseline:
+            return
+        if in_flight * 2 < self.current:
+            # The limit was not what held requests back
+            return
+        
+        step = 1.0 if self.slow_start else 1.0 / self.limit
+        previous = self.current
+        self.limit = min(float(self.maximum), self.limit + step)
+        if self.current != previous:
+            logger.debug(f"Concurrency limit raised to {self.current}")
+    
+    def on_overload(self) -> None:
+        """Record a 429, 5xx or timeout."""
+        now = time.monotonic()
+        if now - self._last_decrease < (self.baseline or 0.0):
+            return
+        self._last_decrease = now
+        self.slow_start = False
+        self.limit = max(float(self.minimum), self.limit * self.DECREASE)
+        logger.debug(f"Concurrency limit cut to {self.current}")
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed request may succeed if sent again."""
+    status = getattr(error, "status_code", None)
+    return status is None or status >= 500 or status in RETRYABLE_STATUSES
+
+
+def retry_hint(error: BaseException) -> Optional[float]:
+    """
+    Read how long the server asked the client to wait.
+    
+    Checks ``retry-after-ms``, then ``Retry-After`` (seconds or an HTTP
+    date), then the reset time of whichever ``x-ratelimit`` quota is used
+    up.
+    
+    Args:
+        error: Error raised by the OpenAI SDK
+    
+    Returns:
+        Seconds to wait (at most ``MAX_RETRY_HINT``), or None without a hint
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    
+    seconds: Optional[float] = None
+    if headers.get("retry-after-ms"):
+        seconds = _to_float(headers["retry-after-ms"], 0.001)
+    if seconds is None and headers.get("retry-after"):
+        value = headers["retry-after"]
+        seconds = _to_float(value)
+        if seconds is None:
+            try:
+                seconds = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                seconds = None
+    if seconds is None:
+        parsed = [
+            _parse_duration(headers.get(f"x-ratelimit-reset-{quota}", ""))
+            for quota in ("requests", "tokens")
+            if headers.get(f"x-ratelimit-remaining-{quota}") == "0"
+        ]
+        resets = [reset for reset in parsed if reset is not None]
+        seconds = max(resets) if resets else None
+    
+    if seconds is None:
+        return None
+    return min(MAX_RETRY_HINT, max(0.0, seconds))
+
+
+def retry_delay(error: BaseException, failures: int, rng: Any = random) -> float:
+    """
+    Seconds to wait before sending a failed request again.
+    
+    A server hint is honoured, plus a little jitter. Without one the wait
+    is exponential in the number of failures in a row, with full jitter.
+    
+    Args:
+        error: Error the last attempt raised
+        failures: Consecutive failures so far, this one included
+        rng: Source of jitter
+    
+    Returns:
+        Seconds to wait
+    """
+    hint = retry_hint(error)
+    if hint is not None:
+        return hint + rng.uniform(0, hint * HINT_JITTER)
+    return rng.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** max(0, failures - 1)))
+
+
+def _to_float(value: str, scale: float = 1.0) -> Optional[float]:
+    try:
+        return float(value) * scale
+    except ValueError:
+        return None
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """
+    Parse an ``x-ratelimit-reset-*`` duration such as ``20ms``, ``1s`` or ``6m0s``.
+    
+    Returns None for anything else, so a malformed header is no hint.
+    """
+    total = 0.0
+    number = ""
+    i = 0
+    while i < len(value):
+        char = value[i]
+        if char.isdigit() or char == ".":
+            number += char
+        elif char in "hms" and number:
+            unit = "ms" if value.startswith("ms", i) else char
+            seconds = _to_float(number, DURATION_UNITS[unit])
+            if seconds is None:
+                return None
+            total += seconds
+            number = ""
+            i += len(unit) - 1
+        else:
+            return None
+        i += 1
+    return total if value and not number else None
@@ -0,0 +1,252 @@
+"""Asyncio processing API for embedding Study Assistant in async services."""
+
+import asyncio
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from rich.console import Console
+
+from . import metrics
+from .backends import EndpointPool
+from .cache import open_response_cache, open_text_cache
+from .config import AppConfig
+from .document_parser import DocumentParser
+from .file_handler import FileHandler
+from .metrics import Metrics
+from .openai_client import AsyncStudyAssistantClient
+from .pdf_generator import render_pdf
+from .processed_index import ProcessedIndex
+from .processor import OUTPUT_BASE
+from .rate_limiter import RateLimiter
+from .subject_parser import SubjectParser
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+console = Console()
+
+
+class AsyncNoteProcessor:
+    """Process notes concurrently on a single event loop."""
+    
+    def __init__(
+        self,
+        config: AppConfig,
+        concurrency: Optional[int] = None,
+        executor: Optional[Executor] = None
+    ):
+        """
+        Initialize async note processor.
+        
+        Args:
+            config: Application configuration
+            concurrency: Maximum generations in flight
+                (defaults to ``config.max_workers``)
+            executor: Executor for file parsing and PDF rendering
+                (defaults to the event loop's default executor)
+        """
+        self.config = config
+        self.concurrency = max(1, concurrency or config.max_workers)
+        self.executor = executor
+        self.file_handler = FileHandler(
+            config.notes_incoming_dir,
+            config.processed_index_path,
+            DocumentParser.from_config(config),
+            open_text_cache(config)
+        )
+        self.ai_client = AsyncStudyAssistantClient(
+            api_key=config.openai_api_key,
+            model=config.openai_model,
+            rate_limiter=RateLimiter(
+                config.max_requests_per_minute,
+                config.max_tokens_per_minute
+            ),
+            cache=open_response_cache(config),
+            chunk_token_budget=config.chunk_token_budget,
+            chunk_workers=config.chunk_workers,
+            base_url=config.openai_base_url,
+            endpoints=EndpointPool.from_config(config)
+        )
+        self.metrics = Metrics()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Semaphore bounding generations, created on the running loop."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+    
+    async def generate_from_text(self, note_content: str) -> Optional[str]:
+        """
+        Generate study material from raw note text.
+        
+        Args:
+            note_content: Raw note text
+        
+        Returns:
+            Generated study material in Markdown format, or None on failure
+        """
+        async with self.semaphore:
+            return await self.ai_client.generate_study_material(note_content)
+    
+    async def generate_from_texts(self, notes: Iterable[str]) -> List[Optional[str]]:
+        """
+        Generate study material for several notes concurrently.
+        
+        Args:
+            notes: Raw note texts
+        
+        Returns:
+            Study material for each note, in input order
+        """
+        return list(await asyncio.gather(
+            *(self.generate_from_text(note) for note in notes)
+        ))
+    
+    async def process_file(self, filepath: Path) -> bool:
+        """
+        Process a single note file.
+        
+        Args:
+            filepath: Path to the note file
+        
+        Returns:
+            True if processing was successful
+        """
+        subject = SubjectParser.extract_subject(filepath.name) or ""
+        with self.metrics.track(filepath.name, subject) as record:
+            success = await self._process_file(filepath)
+        self.metrics.finish(record, success)
+        return success
+    
+    async def _process_file(self, filepath: Path) -> bool:
+        """Run the stages of ``process_file``."""
+        filename = filepath.name
+        logger.info(f"Processing: {filename}")
+        loop = asyncio.get_running_loop()
+        
+        try:
+            subject = SubjectParser.extract_subject(filename)
+            if not subject:
+                logger.error(f"Invalid filename format: {filename}")
+                console.print(f"[red]✗[/red] Invalid filename format: {filename}")
+                return False
+            
+            with metrics.timed("parse"):
+                note_content = await loop.run_in_executor(
+                    self.executor,
+                    metrics.in_current_context(self.file_handler.read_note_file),
+                    filepath
+                )
+            
+            console.print(f"  Generating study material for [cyan]{subject}[/cyan]...")
+            with metrics.timed("llm"):
+                study_material = await self.generate_from_text(note_content)
+            
+            if not study_material:
+                logger.error(f"Failed to generate study material for {filename}")
+                console.print(f"[red]✗[/red] Failed to generate material for {filename}")
+                return False
+            
+            subject_folder = SubjectParser.get_subject_folder(OUTPUT_BASE, subject)
+            output_filename = SubjectParser.generate_output_filename(filename)
+            output_path = subject_folder / output_filename
+            
+            with metrics.timed("write"):
+                await loop.run_in_executor(
+                    self.executor,
+                    self.file_handler.save_output,
+                    output_path,
+                    study_material
+                )
+            console.print(f"[green]✓[/green] Markdown saved to {output_path}")
+            
+            pdf_path = subject_folder / output_filename.replace('.md', '.pdf')
+            with metrics.timed("pdf"):
+                pdf_success = await loop.run_in_executor(
+                    self.executor,
+                    render_pdf,
+                    study_material,
+                    pdf_path,
+                    f"{subject.title()} - Study Material"
+                )
+            
+            if pdf_success:
+                console.print(f"[green]✓[/green] PDF saved to {pdf_path}")
+            else:
+                console.print(f"[yellow]⚠[/yellow] PDF generation failed, but Markdown is saved")
+            
+            return True
+            
+        except Exception as e:
+            logger.exception(f"Error processing {filename}: {e}")
+            console.print(f"[red]✗[/red] Error processing {filename}: {e}")
+            return False
+    
+    async def process_files(self, filepaths: Iterable[Path]) -> Dict[str, bool]:
+        """
+        Process several note files concurrently, ignoring the processed index.
+        
+        Args:
+            filepaths: Note files to process
+        
+        Returns:
+            Dictionary mapping filename to success status
+        """
+        filepaths = list(filepaths)
+        outcomes = await asyncio.gather(
+            *(self.process_file(filepath) for filepath in filepaths)
+        )
+        return {filepath.name: success for filepath, success in zip(filepaths, outcomes)}
+    
+    async def process_all_notes(self) -> Dict[str, bool]:
+        """
+        Process all unprocessed notes in incoming directory.
+        
+        Notes waiting in a batch job are skipped, like ``NoteProcessor.process``
+        skips them. Index lookups hash files, so they run on the executor.
+        
+        Returns:
+            Dictionary mapping filename to success status
+        """
+        loop = asyncio.get_running_loop()
+        processed_index = self.file_handler.load_processed_index()
+        pending = await loop.run_in_executor(self.executor, self._pending_files, processed_index)
+        
+        async def process_and_record(filepath: Path) -> bool:
+            success = await self.process_file(filepath)
+            if success:
+                await loop.run_in_executor(
+                    self.executor,
+                    self.file_handler.mark_processed,
+                    filepath,
+                    processed_index
+                )
+            return success
+        
+        with processed_index:
+            outcomes = await asyncio.gather(*(process_and_record(fp) for fp in pending))
+        
+        if self.config.metrics_enabled:
+            self.ai_client.endpoints.export_gauges(self.metrics)
+            self.metrics.export(self.config.metrics_dir)
+        return {filepath.name: success for filepath, success in zip(pending, outcomes)}
+    
+    def _pending_files(self, processed_index: ProcessedIndex) -> List[Path]:
+        """List incoming notes that are neither processed nor waiting in a batch."""
+        batched = processed_index.batched_names()
+        pending = []
+        for filepath in self.file_handler.list_incoming_files():
+            if filepath.name in batched:
+                logger.info(f"Skipping {filepath.name}, already waiting in a batch")
+            elif self.file_handler.is_processed(filepath, processed_index):
+                logger.info(f"Skipping already processed file: {filepath.name}")
+            else:
+                pending.append(filepath)
+        return pending
+    
+    async def aclose(self) -> None:
+        """Release the document parser's worker processes."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self.file_handler.parser.close)
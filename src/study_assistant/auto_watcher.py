@@ -1,24 +1,167 @@
 """Automatic file watcher for NotePal."""
 
+import threading
 import time
 from pathlib import Path
+from typing import Dict, List, Tuple
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler, FileCreatedEvent, FileModifiedEvent
 
 from .processor import NoteProcessor
 from .config import load_config
 from .utils.logger import setup_logger
+from .work_queue import CoalescingQueue, QueueClosed
 
 logger = setup_logger(__name__)
 
+# Seconds between queue statistics log lines and metrics exports while watching
+STATS_INTERVAL = 60
+
 
 class NoteWatcher(FileSystemEventHandler):
-    """Watch for new notes and process them automatically."""
+    """
+    Watch for new notes and process them automatically.
+    
+    Event handlers only note which files changed. A settle thread queues a
+    file once its size and mtime have stopped changing for
+    ``settle_seconds``, and a pool of worker threads takes files off the
+    queue and runs the processing pipeline, so a slow note never holds up
+    the observer thread and a file is never read while half-written.
+    
+    Results are recorded in the same processed index as ``process``, and
+    ``start`` first queues any notes that arrived while nothing was watching.
+    """
     
-    def __init__(self, processor: NoteProcessor):
+    def __init__(
+        self,
+        processor: NoteProcessor,
+        workers: int = 1,
+        queue_size: int = 256,
+        settle_seconds: float = 2.0
+    ):
+        """
+        Initialize watcher.
+        
+        Args:
+            processor: Note processor running the pipeline
+            workers: Number of notes processed at once
+            queue_size: Distinct files that may wait before events block
+            settle_seconds: How long a file must stay unchanged before it
+                is processed (0 queues it on the first event)
+        """
         self.processor = processor
-        self.processing_files = set()
         self.supported_extensions = {".txt", ".md", ".markdown", ".pdf", ".docx", ".doc"}
+        self.workers = max(1, workers)
+        self.settle_seconds = settle_seconds
+        self.queue: CoalescingQueue[Path] = CoalescingQueue(queue_size)
+        self.index = processor.file_handler.load_processed_index()
+        self.skipped_unchanged = 0
+        self._threads: List[threading.Thread] = []
+        
+        # path -> (size, mtime_ns, monotonic time the signature was first seen)
+        self._settling: Dict[Path, Tuple[int, int, float]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+    
+    def start(self, reconcile: bool = True) -> None:
+        """
+        Start the settle thread, the worker threads and the backlog scan.
+        
+        Args:
+            reconcile: Queue notes that are missing from the processed index
+        """
+        if self.settle_seconds > 0:
+            thread = threading.Thread(target=self._settle_loop, name="watch-settle", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        
+        for number in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker,
+                name=f"watch-worker-{number}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        
+        if reconcile:
+            thread = threading.Thread(target=self.reconcile, name="watch-reconcile", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def reconcile(self) -> int:
+        """
+        Queue notes that arrived or changed while the watcher was not running.
+        
+        Only file metadata is compared against the index here; workers
+        hash a queued file before processing it, so touched files and
+        renamed copies of processed notes are still skipped. The backlog
+        is queued cheapest first, like ``process`` orders it.
+        
+        Returns:
+            Number of files queued
+        """
+        started = time.monotonic()
+        file_handler = self.processor.file_handler
+        files = file_handler.list_incoming_files()
+        batched = self.index.batched_names()
+        
+        stale = []
+        for filepath in files:
+            if self._stopping.is_set():
+                break
+            if filepath.name.startswith(".") or filepath.name in batched:
+                continue
+            
+            try:
+                stat = filepath.stat()
+            except FileNotFoundError:
+                continue
+            if file_handler.is_known_version(self.index.get(filepath.name), stat):
+                continue
+            
+            stale.append(filepath)
+        
+        queued = 0
+        for cost in self.processor.cost_estimator.shortest_first(stale):
+            if self._stopping.is_set():
+                break
+            self._enqueue(cost.filepath)
+            queued += 1
+        
+        logger.info(
+            f"Startup scan: {queued} of {len(files)} file(s) need processing "
+            f"({time.monotonic() - started:.2f}s)"
+        )
+        if queued:
+            print(f" Found {queued} unprocessed note(s) from while the watcher was stopped")
+        return queued
+    
+    def stop(self) -> None:
+        """Drop queued files and wait for notes already being processed."""
+        self._stopping.set()
+        self._wakeup.set()
+        self.queue.close()
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+        self.index.close()
+    
+    def stats(self) -> Dict[str, float]:
+        """Return work queue depth, latency and settle statistics."""
+        stats = self.queue.stats()
+        with self._lock:
+            stats["settling"] = len(self._settling)
+        stats["skipped_unchanged"] = self.skipped_unchanged
+        return stats
+    
+    def export_metrics(self) -> None:
+        """Export the processor's metrics with the current queue gauges."""
+        stats = self.stats()
+        for name in ("depth", "in_flight", "settling"):
+            self.processor.metrics.set_gauge(f"watch_queue_{name}", stats[name])
+        self.processor.export_metrics()
     
     def on_created(self, event):
         """Handle new file creation."""
@@ -32,60 +175,151 @@ class NoteWatcher(FileSystemEventHandler):
         if event.is_directory:
             return
         
-        # Wait a bit to ensure file is fully written
-        time.sleep(1)
         self._handle_file(event.src_path)
     
-    def _handle_file(self, file_path: str | bytes | Path) -> None:
-        """Process a file if it's supported."""
+    def on_moved(self, event):
+        """Handle atomic-rename saves and files moved into the folder."""
+        if event.is_directory:
+            return
+        
+        with self._lock:
+            self._settling.pop(self._to_path(event.src_path), None)
+        
+        dest = self._to_path(event.dest_path)
+        if dest.parent.resolve() == self.processor.file_handler.incoming_dir.resolve():
+            self._handle_file(dest)
+    
+    @staticmethod
+    def _to_path(file_path: str | bytes | Path) -> Path:
+        """Convert a watchdog event path to a Path."""
         # Convert to Path, handling bytes/str/Path
         if isinstance(file_path, bytes):
-            filepath: Path = Path(file_path.decode('utf-8'))
+            return Path(file_path.decode('utf-8'))
         elif isinstance(file_path, str):
-            filepath: Path = Path(file_path)
+            return Path(file_path)
         elif isinstance(file_path, Path):
-            filepath: Path = file_path
+            return file_path
         else:
             # Fallback for any unexpected types
-            filepath: Path = Path(str(file_path))
+            return Path(str(file_path))
+    
+    def _handle_file(self, file_path: str | bytes | Path) -> None:
+        """Start settling a file if it's supported."""
+        filepath = self._to_path(file_path)
         
-        # Now filepath is guaranteed to be Path type
+        # Check if supported file type, ignoring editor and Finder temp files
+        if filepath.suffix.lower() not in self.supported_extensions or filepath.name.startswith("."):
+            return
         
-        # Check if supported file type
-        if filepath.suffix.lower() not in self.supported_extensions:
+        if self.settle_seconds <= 0:
+            self._enqueue(filepath)
             return
         
-        # Avoid processing the same file multiple times
-        if filepath in self.processing_files:
+        # Every event restarts the settle window
+        with self._lock:
+            self._settling[filepath] = (-1, -1, time.monotonic())
+        self._wakeup.set()
+    
+    def _settle_loop(self) -> None:
+        """Queue files whose size and mtime have stopped changing."""
+        poll_interval = min(0.5, self.settle_seconds / 4)
+        while not self._stopping.is_set():
+            self._wakeup.wait(poll_interval)
+            self._wakeup.clear()
+            for filepath in self._settled_files():
+                self._enqueue(filepath)
+    
+    def _settled_files(self) -> List[Path]:
+        """Check settling files and return those unchanged for the settle window."""
+        now = time.monotonic()
+        settled = []
+        with self._lock:
+            for filepath, (size, mtime_ns, since) in list(self._settling.items()):
+                try:
+                    stat = filepath.stat()
+                except FileNotFoundError:
+                    # Temp file renamed away or deleted
+                    del self._settling[filepath]
+                    continue
+                
+                if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                    self._settling[filepath] = (stat.st_size, stat.st_mtime_ns, now)
+                elif now - since >= self.settle_seconds:
+                    del self._settling[filepath]
+                    settled.append(filepath)
+        return settled
+    
+    def _enqueue(self, filepath: Path) -> None:
+        """Queue a settled file for processing."""
+        # Repeated events for a waiting file collapse into one entry
+        try:
+            queued = self.queue.put(filepath)
+        except QueueClosed:
             return
         
-        logger.info(f" New file detected: {filepath.name}")
-        print(f"\n New file detected: {filepath.name}")
-        print(" Auto-processing...")
+        if queued:
+            logger.info(f" New file detected: {filepath.name}")
+            print(f"\n New file detected: {filepath.name}")
+        else:
+            logger.debug(f"Coalesced event for {filepath.name}")
+    
+    def _worker(self) -> None:
+        """Process queued files until the queue is closed."""
+        while True:
+            filepath = self.queue.get()
+            if filepath is None:
+                return
+            
+            try:
+                self._process_file(filepath)
+            except Exception as e:
+                logger.exception(f"Unexpected error processing {filepath.name}: {e}")
+            finally:
+                self.queue.task_done(filepath)
+    
+    def _process_file(self, filepath: Path) -> None:
+        """Run the pipeline for one queued file."""
+        file_handler = self.processor.file_handler
+        try:
+            stat = filepath.stat()
+            # One generation per file version: touches and duplicate saves are free
+            if file_handler.is_processed(filepath, self.index):
+                with self._lock:
+                    self.skipped_unchanged += 1
+                logger.debug(f"Skipping {filepath.name}, this version is already processed")
+                return
+        except FileNotFoundError:
+            logger.debug(f"Skipping {filepath.name}, removed before processing")
+            return
         
-        self.processing_files.add(filepath)
+        if filepath.name in self.index.batched_names():
+            logger.info(f"Skipping {filepath.name}, already waiting in a batch")
+            return
         
-        try:
-            # Process the note
-            success = self.processor._process_single_note(filepath)
-            
-            if success:
-                logger.info(f" Auto-processed: {filepath.name}")
-                print(f" Auto-processed successfully!\n")
-            else:
-                logger.error(f" Failed to process: {filepath.name}")
-                print(f" Processing failed\n")
-        
-        finally:
-            # Remove from processing set after a delay
-            time.sleep(2)
-            self.processing_files.discard(filepath)
+        print(f" Auto-processing {filepath.name}...")
+        
+        # Process the note
+        success = self.processor._process_single_note(filepath)
+        
+        if success:
+            # Record the version that was read, even if it changed since
+            file_handler.mark_processed(filepath, self.index, stat)
+            logger.info(f" Auto-processed: {filepath.name}")
+            print(f" Auto-processed {filepath.name} successfully!\n")
+        else:
+            logger.error(f" Failed to process: {filepath.name}")
+            print(f" Processing failed for {filepath.name}\n")
 
 
-def start_watching():
-    """Start watching the incoming directory."""
+def start_watching(profile: bool = False):
+    """
+    Start watching the incoming directory.
+    
+    Args:
+        profile: Sample each stage and write collapsed-stack profiles
+    """
     config = load_config()
-    processor = NoteProcessor(config)
+    processor = NoteProcessor(config, profile=profile)
     
     incoming_dir = config.notes_incoming_dir
     
@@ -102,19 +336,42 @@ Drop your notes into the folder and they'll be processed automatically!
 Press Ctrl+C to stop...
 """)
     
-    event_handler = NoteWatcher(processor)
+    event_handler = NoteWatcher(
+        processor,
+        config.watch_workers,
+        config.watch_queue_size,
+        config.watch_settle_seconds
+    )
     observer = Observer()
     observer.schedule(event_handler, str(incoming_dir), recursive=False)
     observer.start()
+    # Start after the observer so nothing arriving during the backlog scan is missed
+    event_handler.start()
     
     try:
+        last_stats = None
         while True:
-            time.sleep(1)
+            time.sleep(STATS_INTERVAL)
+            event_handler.export_metrics()
+            processor.write_profile()
+            stats = event_handler.stats()
+            if stats != last_stats:
+                logger.info(
+                    f"Watch queue: {stats['settling']} settling, "
+                    f"{stats['depth']} waiting, {stats['in_flight']} in progress, "
+                    f"{stats['completed']} done, {stats['coalesced']} coalesced; "
+                    f"wait p50/p95 {stats['wait_p50']:.1f}s/{stats['wait_p95']:.1f}s, "
+                    f"run p50/p95 {stats['run_p50']:.1f}s/{stats['run_p95']:.1f}s"
+                )
+                last_stats = stats
     except KeyboardInterrupt:
         observer.stop()
         print("\n\n NotePal Auto-Watcher stopped")
     
     observer.join()
+    event_handler.stop()
+    processor.close()
+    event_handler.export_metrics()
 
 
 if __name__ == "__main__":
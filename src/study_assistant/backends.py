@@ -0,0 +1,493 @@
+"""Pool of OpenAI-compatible endpoints with latency-aware routing and backoff."""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from .adaptive import AdaptiveConcurrency, retry_delay
+from .config import AppConfig
+from .metrics import Metrics
+from .rate_limiter import RateLimiter
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class EndpointConfig(BaseModel):
+    """One entry of the endpoints file."""
+    
+    name: str
+    type: Literal["openai", "azure"] = "openai"
+    # API base URL; for Azure the resource endpoint (https://<name>.openai.azure.com)
+    base_url: Optional[str] = None
+    api_key: Optional[str] = None
+    # Environment variable holding the key, so the file can be shared
+    api_key_env: Optional[str] = None
+    # Azure API version
+    api_version: Optional[str] = None
+    # Model (Azure: deployment) to request instead of OPENAI_MODEL
+    model: Optional[str] = None
+    # Requests in flight at once; the ceiling of the adaptive limit (unset: no limit,
+    # or 64 with ADAPTIVE_CONCURRENCY)
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+    # Per-endpoint rate limits (unset: MAX_REQUESTS_PER_MINUTE / MAX_TOKENS_PER_MINUTE)
+    requests_per_minute: Optional[int] = Field(default=None, ge=1)
+    tokens_per_minute: Optional[int] = Field(default=None, ge=0)
+    # Retries inside the OpenAI SDK. NotePal retries with backoff itself and
+    # needs to see every 429 to adapt, so this is off by default
+    max_retries: int = Field(default=0, ge=0)
+
+
+class Endpoint:
+    """One API endpoint, its clients and its health."""
+    
+    # Weight of the newest request in the latency average
+    LATENCY_SMOOTHING = 0.3
+    
+    # Ceiling of the adaptive limit for endpoints without max_concurrency
+    ADAPTIVE_MAX_CONCURRENCY = 64
+    
+    def __init__(
+        self,
+        config: EndpointConfig,
+        api_key: str,
+        rate_limiter: Optional[RateLimiter] = None,
+        adaptive: bool = True
+    ):
+        """
+        Initialize endpoint.
+        
+        Args:
+            config: Endpoint settings
+            api_key: Resolved API key
+            rate_limiter: Limiter for requests to this endpoint only
+            adaptive: Adjust the concurrency limit to throttling and latency
+                (see ``AdaptiveConcurrency``) instead of fixing it at
+                ``max_concurrency``
+        """
+        self.config = config
+        self.name = config.name
+        self.model = config.model
+        self.max_concurrency = config.max_concurrency
+        self.rate_limiter = rate_limiter
+        self.concurrency = (
+            AdaptiveConcurrency(maximum=config.max_concurrency or self.ADAPTIVE_MAX_CONCURRENCY)
+            if adaptive else None
+        )
+        self._api_key = api_key
+        self._client: Any = None
+        self._async_client: Any = None
+        
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.backoff_until = 0.0
+    
+    @property
+    def limit(self) -> Optional[int]:
+        """Requests that may be in flight now (None for no limit)."""
+        if self.concurrency is not None:
+            return self.concurrency.current
+        return self.max_concurrency
+    
+    def _client_options(self) -> Dict[str, Any]:
+        """Keyword arguments shared by the synchronous and asyncio SDK clients."""
+        options: Dict[str, Any] = {
+            "api_key": self._api_key,
+            "max_retries": self.config.max_retries
+        }
+        if self.config.type == "azure":
+            # Without a base_url the SDK falls back to AZURE_OPENAI_ENDPOINT
+            options["azure_endpoint"] = self.config.base_url
+            options["api_version"] = self.config.api_version
+        else:
+            options["base_url"] = self.config.base_url
+        return options
+    
+    @property
+    def client(self) -> Any:
+        """Synchronous SDK client, created on first use."""
+        if self._client is None:
+            # Imported here: the SDK takes longer to import than the CLI needs to start
+            from openai import AzureOpenAI, OpenAI
+            
+            client_class = AzureOpenAI if self.config.type == "azure" else OpenAI
+            self._client = client_class(**self._client_options())
+        return self._client
+    
+    @property
+    def async_client(self) -> Any:
+        """Asyncio SDK client, created on first use."""
+        if self._async_client is None:
+            from openai import AsyncAzureOpenAI, AsyncOpenAI
+            
+            client_class = AsyncAzureOpenAI if self.config.type == "azure" else AsyncOpenAI
+            self._async_client = client_class(**self._client_options())
+        return self._async_client
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return load, latency and health figures."""
+        now = time.monotonic()
+        return {
+            "name": self.name,
+            "in_flight": self.in_flight,
+            "limit": self.limit,
+            "latency": self.latency or 0.0,
+            "requests": self.requests,
+            "failures": self.failures,
+            "backoff": max(0.0, self.backoff_until - now),
+            "ejected": self.ejected_until > now,
+        }
+
+
+class EndpointPool:
+    """
+    Route requests across endpoints.
+    
+    Each request goes to the available endpoint with the lowest expected
+    wait: its recent average latency times the requests it already has in
+    flight, so idle and fast endpoints are preferred. An endpoint that
+    has not answered yet is tried first, with one request at a time until
+    it does. Endpoints whose last request failed are used only when no
+    healthy one is free, so a retry goes elsewhere. Endpoints at their
+    concurrency limit are skipped; when all are, ``acquire`` waits for a
+    slot.
+    
+    A 429, 5xx response or connection error puts the endpoint in backoff
+    for as long as the server asked (``Retry-After`` and similar headers)
+    or, without a hint, for a jittered exponential delay. Nothing is sent
+    to it meanwhile, so retries wait out the backoff or go to another
+    endpoint. 429s, 5xx responses and timeouts also cut the endpoint's
+    adaptive concurrency limit.
+    
+    An endpoint that fails ``EJECT_AFTER`` requests in a row, the last
+    with a connection error, timeout or 5xx response, is ejected for a
+    while, twice as long each time it is ejected again, and re-admitted
+    afterwards with a single trial request. A pool of one endpoint never
+    ejects it.
+    """
+    
+    EJECT_AFTER = 3
+    EJECT_SECONDS = 30.0
+    MAX_EJECT_SECONDS = 600.0
+    
+    # How often an asyncio caller re-checks for a free endpoint
+    ASYNC_POLL_INTERVAL = 0.05
+    
+    def __init__(self, endpoints: List[Endpoint]):
+        """
+        Initialize pool.
+        
+        Args:
+            endpoints: Endpoints to route across, in order of preference
+                for ties
+        
+        Raises:
+            ValueError: If no endpoints are given
+        """
+        if not endpoints:
+            raise ValueError("An endpoint pool needs at least one endpoint")
+        self.endpoints = endpoints
+        self._cond = threading.Condition()
+    
+    @classmethod
+    def single(cls, api_key: str, base_url: Optional[str] = None, adaptive: bool = True) -> "EndpointPool":
+        """Pool of one OpenAI endpoint without a fixed concurrency limit."""
+        return cls([Endpoint(EndpointConfig(name="default", base_url=base_url), api_key, adaptive=adaptive)])
+    
+    @classmethod
+    def from_config(cls, config: AppConfig) -> "EndpointPool":
+        """
+        Load the endpoints file named by ``LLM_ENDPOINTS_FILE``.
+        
+        Args:
+            config: Application configuration
+        
+        Returns:
+            Pool of the configured endpoints, or of the one endpoint set by
+            ``OPENAI_API_KEY`` and ``OPENAI_BASE_URL`` if no file is set
+        
+        Raises:
+            ValueError: If the file is not a list of valid endpoints
+        """
+        if config.llm_endpoints_file is None:
+            return cls.single(config.openai_api_key, config.openai_base_url, config.adaptive_concurrency)
+        return cls.load(config.llm_endpoints_file, config)
+    
+    @classmethod
+    def load(cls, path: Path, config: AppConfig) -> "EndpointPool":
+        """
+        Build a pool from a YAML (or JSON) list of endpoint settings.
+        
+        Args:
+            path: Endpoints file
+            config: Supplies the default API key and rate limits
+        
+        Returns:
+            Pool of the configured endpoints
+        
+        Raises:
+            ValueError: If the file is not a list of valid endpoints
+        """
+        import yaml
+        
+        with open(path, encoding="utf-8") as f:
+            entries = yaml.safe_load(f)
+        if not isinstance(entries, list):
+            raise ValueError(f"{path} must contain a list of endpoints")
+        
+        endpoints = []
+        for entry in entries:
+            endpoint_config = EndpointConfig.model_validate(entry)
+            api_key = endpoint_config.api_key
+            if api_key is None and endpoint_config.api_key_env:
+                api_key = os.environ.get(endpoint_config.api_key_env)
+                if api_key is None:
+                    raise ValueError(
+                        f"Endpoint {endpoint_config.name}: {endpoint_config.api_key_env} is not set"
+                    )
+            rate_limiter = RateLimiter(
+                endpoint_config.requests_per_minute or config.max_requests_per_minute,
+                config.max_tokens_per_minute if endpoint_config.tokens_per_minute is None
+                else endpoint_config.tokens_per_minute
+            )
+            endpoints.append(Endpoint(
+                endpoint_config,
+                api_key or config.openai_api_key,
+                rate_limiter,
+                config.adaptive_concurrency
+            ))
+        
+        logger.info(f"Routing across {len(endpoints)} endpoint(s): {', '.join(e.name for e in endpoints)}")
+        return cls(endpoints)
+    
+    @property
+    def primary(self) -> Endpoint:
+        """First configured endpoint, used for the Batch API."""
+        return self.endpoints[0]
+    
+    def acquire(self) -> Endpoint:
+        """
+        Take a request slot on the best available endpoint, waiting if needed.
+        
+        Returns:
+            Endpoint to send the request to; pass it to ``release`` afterwards
+        """
+        with self._cond:
+            while True:
+                endpoint = self._pick()
+                if endpoint is not None:
+                    endpoint.in_flight += 1
+                    return endpoint
+                self._cond.wait(self._next_available())
+    
+    async def acquire_async(self) -> Endpoint:
+        """Take a request slot without blocking the event loop (see ``acquire``)."""
+        while True:
+            with self._cond:
+                endpoint = self._pick()
+                if endpoint is not None:
+                    endpoint.in_flight += 1
+                    return endpoint
+            await asyncio.sleep(self.ASYNC_POLL_INTERVAL)
+    
+    @contextmanager
+    def request(self, tokens: int, rate_limiter: Optional[RateLimiter] = None) -> Iterator[Endpoint]:
+        """
+        Send one request through the pool.
+        
+        Holds a slot on the chosen endpoint for the duration of the block,
+        waits on the endpoint's rate limiter (or ``rate_limiter`` if it has
+        none) and records the block's latency or error.
+        
+        Args:
+            tokens: Estimated tokens of the request
+            rate_limiter: Limiter for endpoints without their own
+        
+        Yields:
+            Endpoint to send the request to
+        """
+        endpoint = self.acquire()
+        started = time.monotonic()
+        try:
+            limiter = endpoint.rate_limiter or rate_limiter
+            if limiter:
+                limiter.acquire(tokens)
+            started = time.monotonic()
+            yield endpoint
+        except BaseException as e:
+            self.release(endpoint, error=e)
+            raise
+        self.release(endpoint, time.monotonic() - started)
+    
+    @asynccontextmanager
+    async def request_async(
+        self,
+        tokens: int,
+        rate_limiter: Optional[RateLimiter] = None
+    ) -> AsyncIterator[Endpoint]:
+        """Send one request through the pool from asyncio code (see ``request``)."""
+        endpoint = await self.acquire_async()
+        started = time.monotonic()
+        try:
+            limiter = endpoint.rate_limiter or rate_limiter
+            if limiter:
+                await limiter.acquire_async(tokens)
+            started = time.monotonic()
+            yield endpoint
+        except BaseException as e:
+            self.release(endpoint, error=e)
+            raise
+        self.release(endpoint, time.monotonic() - started)
+    
+    def release(
+        self,
+        endpoint: Endpoint,
+        latency: Optional[float] = None,
+        error: Optional[BaseException] = None
+    ) -> None:
+        """
+        Return a request slot and record how the request went.
+        
+        Args:
+            endpoint: Endpoint from ``acquire``
+            latency: Seconds the request took, if it succeeded
+            error: Exception the request raised, if any
+        """
+        with self._cond:
+            try:
+                endpoint.requests += 1
+                
+                if error is None:
+                    if latency is not None:
+                        if endpoint.latency is None:
+                            endpoint.latency = latency
+                        else:
+                            endpoint.latency += Endpoint.LATENCY_SMOOTHING * (latency - endpoint.latency)
+                        if endpoint.concurrency is not None:
+                            endpoint.concurrency.on_success(latency, endpoint.in_flight)
+                    endpoint.consecutive_failures = 0
+                    endpoint.ejections = 0
+                else:
+                    failure = self._classify(error)
+                    if failure is not None:
+                        self._back_off(endpoint, error, failure)
+            finally:
+                # Always returned, or the endpoint would lose a slot for good
+                endpoint.in_flight -= 1
+                self._cond.notify_all()
+    
+    def stats(self) -> List[Dict[str, Any]]:
+        """Return per-endpoint load, latency and health figures."""
+        with self._cond:
+            return [endpoint.stats() for endpoint in self.endpoints]
+    
+    def export_gauges(self, metrics: Metrics) -> None:
+        """Record per-endpoint figures as ``endpoint_*`` gauges."""
+        for stats in self.stats():
+            name = stats["name"]
+            metrics.set_gauge("endpoint_in_flight", stats["in_flight"], endpoint=name)
+            if stats["limit"] is not None:
+                metrics.set_gauge("endpoint_concurrency_limit", stats["limit"], endpoint=name)
+            metrics.set_gauge("endpoint_backoff_seconds", stats["backoff"], endpoint=name)
+            metrics.set_gauge("endpoint_latency_seconds", stats["latency"], endpoint=name)
+            metrics.set_gauge("endpoint_requests", stats["requests"], endpoint=name)
+            metrics.set_gauge("endpoint_failures", stats["failures"], endpoint=name)
+            metrics.set_gauge("endpoint_ejected", int(stats["ejected"]), endpoint=name)
+    
+    def _pick(self) -> Optional[Endpoint]:
+        """Choose an endpoint with a free slot; the caller holds the lock."""
+        now = time.monotonic()
+        candidates = []
+        for endpoint in self.endpoints:
+            if endpoint.ejected_until > now or endpoint.backoff_until > now:
+                continue
+            limit = endpoint.limit
+            if limit is not None and endpoint.in_flight >= limit:
+                continue
+            if endpoint.in_flight and (endpoint.latency is None or endpoint.ejections) and len(self.endpoints) > 1:
+                # Not yet proven, or re-admitted after ejection: one trial request at a time
+                continue
+            candidates.append(endpoint)
+        
+        if not candidates:
+            return None
+        return min(
+            candidates,
+            key=lambda endpoint: (
+                endpoint.consecutive_failures,
+                (endpoint.latency or 0.0) * (endpoint.in_flight + 1),
+                endpoint.in_flight
+            )
+        )
+    
+    def _next_available(self) -> Optional[float]:
+        """Seconds until an endpoint leaves backoff or ejection, if any is in either."""
+        now = time.monotonic()
+        waits = [
+            until - now
+            for endpoint in self.endpoints
+            for until in (endpoint.ejected_until, endpoint.backoff_until)
+            if until > now
+        ]
+        return min(waits) if waits else None
+    
+    def _back_off(self, endpoint: Endpoint, error: BaseException, failure: str) -> None:
+        """Record a failed request; the caller holds the lock."""
+        endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+        
+        delay = retry_delay(error, endpoint.consecutive_failures)
+        endpoint.backoff_until = max(endpoint.backoff_until, time.monotonic() + delay)
+        if failure != "connection" and endpoint.concurrency is not None:
+            endpoint.concurrency.on_overload()
+        logger.debug(
+            f"Endpoint {endpoint.name}: {failure}, backing off {delay:.2f}s "
+            f"(concurrency limit {endpoint.limit})"
+        )
+        
+        if failure != "throttled" and endpoint.consecutive_failures >= self.EJECT_AFTER and len(self.endpoints) > 1:
+            self._eject(endpoint)
+    
+    def _eject(self, endpoint: Endpoint) -> None:
+        """Take a failing endpoint out of rotation; the caller holds the lock."""
+        seconds = min(self.MAX_EJECT_SECONDS, self.EJECT_SECONDS * 2 ** endpoint.ejections)
+        endpoint.ejections += 1
+        endpoint.consecutive_failures = 0
+        endpoint.ejected_until = time.monotonic() + seconds
+        logger.warning(
+            f"Endpoint {endpoint.name} failed {self.EJECT_AFTER} requests in a row; "
+            f"ejected for {seconds:.0f}s"
+        )
+    
+    @staticmethod
+    def _classify(error: BaseException) -> Optional[str]:
+        """
+        Say how an error reflects on the endpoint.
+        
+        Returns:
+            "throttled" (429), "overloaded" (5xx or timeout), "connection"
+            (unreachable), or None if the request itself was at fault
+        """
+        from openai import APIConnectionError, APIStatusError, APITimeoutError
+        
+        if isinstance(error, APITimeoutError):
+            return "overloaded"
+        if isinstance(error, APIConnectionError):
+            return "connection"
+        if isinstance(error, APIStatusError):
+            if error.status_code == 429:
+                return "throttled"
+            if error.status_code >= 500:
+                return "overloaded"
+        return None
@@ -0,0 +1,217 @@
+"""Bulk backlog processing through the OpenAI Batch API."""
+
+import json
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Dict, List
+
+from rich.console import Console
+
+from .processor import NoteProcessor
+from .subject_parser import SubjectParser
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+console = Console()
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Batch states after which no further results will arrive
+FINISHED_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchProcessor:
+    """Submit pending notes as one batch job and collect the results later."""
+    
+    def __init__(self, processor: NoteProcessor):
+        """
+        Initialize batch processor.
+        
+        Args:
+            processor: Note processor whose client, file handler and PDF
+                stage are reused
+        """
+        self.processor = processor
+        self.file_handler = processor.file_handler
+        self.ai_client = processor.ai_client
+    
+    def build_request(self, filename: str, note_content: str) -> Dict[str, Any]:
+        """
+        Build one line of the batch input file.
+        
+        Args:
+            filename: Note filename, used as the request's custom id
+            note_content: Raw note text
+        
+        Returns:
+            Batch request object
+        """
+        return {
+            "custom_id": filename,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                # The batch is submitted to the first endpoint, with its model
+                "model": self.ai_client.model_for(self.ai_client.endpoints.primary),
+                "messages": self.ai_client.build_messages(
+                    self.ai_client.build_prompt(note_content)
+                ),
+                "max_tokens": self.ai_client.MAX_TOKENS,
+                "temperature": self.ai_client.TEMPERATURE
+            }
+        }
+    
+    def submit_pending(self) -> Dict[str, bool]:
+        """
+        Submit every unprocessed, unbatched note as one batch job.
+        
+        Returns:
+            Dictionary mapping filename to whether it was submitted
+        """
+        files = self.file_handler.list_incoming_files()
+        results: Dict[str, bool] = {}
+        
+        with self.file_handler.load_processed_index() as processed_index:
+            batched = processed_index.batched_names()
+            lines: List[str] = []
+            entries: Dict[str, Dict[str, Any]] = {}
+            
+            for filepath in files:
+                filename = filepath.name
+                if filename in batched:
+                    logger.info(f"Skipping {filename}, already waiting in a batch")
+                    continue
+                if self.file_handler.is_processed(filepath, processed_index):
+                    logger.info(f"Skipping already processed file: {filename}")
+                    continue
+                if not SubjectParser.extract_subject(filename):
+                    console.print(f"[red]✗[/red] Invalid filename format: {filename}")
+                    results[filename] = False
+                    continue
+                
+                try:
+                    note_content = self.file_handler.read_note_file(filepath)
+                except Exception as e:
+                    console.print(f"[red]✗[/red] Error reading {filename}: {e}")
+                    results[filename] = False
+                    continue
+                
+                stat = filepath.stat()
+                entries[filename] = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "digest": self.file_handler.file_digest(filepath, stat)
+                }
+                lines.append(json.dumps(self.build_request(filename, note_content), ensure_ascii=False))
+            
+            if not lines:
+                return results
+            
+            client = self.ai_client.client
+            batch_file = client.files.create(
+                file=("notepal_batch.jsonl", ("\n".join(lines) + "\n").encode("utf-8")),
+                purpose="batch"
+            )
+            batch = client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window="24h",
+                metadata={"source": "notepal"}
+            )
+            processed_index.add_batch(batch.id, entries)
+        
+        console.print(
+            f"[green]✓[/green] Submitted {len(entries)} note(s) as batch [cyan]{batch.id}[/cyan]\n"
+            f"  Run [bold]study-assistant collect[/bold] once it has completed"
+        )
+        results.update({filename: True for filename in entries})
+        return results
+    
+    def collect(self) -> Dict[str, bool]:
+        """
+        Fetch finished batches and write their study material and PDFs.
+        
+        Returns:
+            Dictionary mapping filename to success status for collected notes
+        """
+        results: Dict[str, bool] = {}
+        client = self.ai_client.client
+        
+        with self.file_handler.load_processed_index() as processed_index:
+            batch_ids = processed_index.open_batches()
+            if not batch_ids:
+                console.print("[yellow]No batches waiting to be collected[/yellow]")
+                return results
+            
+            for batch_id in batch_ids:
+                batch = client.batches.retrieve(batch_id)
+                counts = batch.request_counts
+                progress = f" ({counts.completed}/{counts.total} done)" if counts else ""
+                
+                if batch.status not in FINISHED_STATES:
+                    console.print(f"  Batch [cyan]{batch_id}[/cyan] is {batch.status}{progress}")
+                    continue
+                
+                console.print(f"  Collecting batch [cyan]{batch_id}[/cyan] ({batch.status})")
+                entries = processed_index.batch_entries(batch_id)
+                outputs = self._read_outputs(batch.output_file_id)
+                
+                note_futures: Dict["Future[bool]", str] = {}
+                for filename in entries:
+                    study_material = outputs.get(filename)
+                    if study_material:
+                        note_futures[self._write_outputs(filename, study_material)] = filename
+                        continue
+                    
+                    # Failed, expired or missing: forget it so it is resubmitted
+                    console.print(f"[red]✗[/red] No study material returned for {filename}")
+                    results[filename] = False
+                    processed_index.remove_batch_item(filename)
+                
+                for future, filename in note_futures.items():
+                    results[filename] = future.result()
+                    if results[filename]:
+                        entry = dict(entries[filename])
+                        entry["processed_at"] = datetime.now().isoformat()
+                        processed_index.set(filename, entry)
+                    processed_index.remove_batch_item(filename)
+        
+        successful = sum(1 for v in results.values() if v)
+        if results:
+            console.print(f"\n[green]✓[/green] Collected {successful}/{len(results)} file(s)")
+        return results
+    
+    def _read_outputs(self, output_file_id: Any) -> Dict[str, str]:
+        """Download a batch output file and map custom id to completion text."""
+        if not output_file_id:
+            return {}
+        
+        outputs: Dict[str, str] = {}
+        text = self.ai_client.client.files.content(output_file_id).text
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                logger.error(f"Batch request {record.get('custom_id')} failed: {record.get('error')}")
+                continue
+            choices = response.get("body", {}).get("choices") or []
+            content = choices[0]["message"].get("content") if choices else None
+            if content:
+                outputs[record["custom_id"]] = content
+        return outputs
+    
+    def _write_outputs(self, filename: str, study_material: str) -> "Future[bool]":
+        """Save the Markdown for a collected note and queue its PDF."""
+        try:
+            subject = SubjectParser.extract_subject(filename)
+            if not subject:
+                raise ValueError(f"Invalid filename format: {filename}")
+            output_path = self.processor._output_path(filename, subject)
+            self.file_handler.save_output(output_path, study_material)
+            return self.processor._queue_pdf(filename, subject, output_path, study_material)
+        except Exception as e:
+            logger.exception(f"Error saving study material for {filename}: {e}")
+            console.print(f"[red]✗[/red] Error saving study material for {filename}: {e}")
+            return NoteProcessor._resolved(False)
@@ -0,0 +1,162 @@
+"""Persistent, size-bounded key/value cache on SQLite."""
+
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+from .config import AppConfig
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class DiskCache:
+    """Compressed on-disk cache with least-recently-used eviction."""
+    
+    def __init__(self, path: Path, max_bytes: int):
+        """
+        Initialize disk cache.
+        
+        Args:
+            path: SQLite database file
+            max_bytes: Total size of stored values before eviction starts
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL stays consistent without an fsync per commit; lookups commit often
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+        self._conn.commit()
+        # Running total of stored sizes, so ``set`` need not sum the table;
+        # entries other processes add are counted from the next open
+        self._size: int = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+        logger.debug(f"Opened cache at {path}")
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Look up a value and mark it as recently used.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Stored value, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            
+            self._conn.execute(
+                "UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return zlib.decompress(row[0])
+    
+    def set(self, key: str, value: bytes) -> None:
+        """
+        Store a value, evicting least recently used entries if over budget.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        blob = zlib.compress(value)
+        with self._lock:
+            replaced = self._conn.execute(
+                "SELECT size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, accessed) "
+                "VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time())
+            )
+            self._size += len(blob) - (replaced[0] if replaced else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+    
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits its budget."""
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed"
+        ).fetchall():
+            if self._size <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._size -= size
+            evicted += 1
+        logger.debug(f"Evicted {evicted} cache entries from {self.path.name}")
+    
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+    
+    def close(self) -> None:
+        """Close the underlying database."""
+        with self._lock:
+            self._conn.close()
+
+
+def open_response_cache(config: AppConfig) -> Optional[DiskCache]:
+    """
+    Open the LLM response cache described by the configuration.
+    
+    Args:
+        config: Application configuration
+    
+    Returns:
+        Response cache, or None when caching is disabled
+    """
+    if not config.use_cache:
+        return None
+    return DiskCache(
+        config.cache_dir / "responses.sqlite3",
+        config.response_cache_max_mb * 1024 * 1024
+    )
+
+
+def open_text_cache(config: AppConfig) -> Optional[DiskCache]:
+    """
+    Open the extracted-text cache described by the configuration.
+    
+    Args:
+        config: Application configuration
+    
+    Returns:
+        Text cache, or None when it is disabled
+    """
+    if config.text_cache_max_mb <= 0:
+        return None
+    return DiskCache(
+        config.cache_dir / "parsed_text.sqlite3",
+        config.text_cache_max_mb * 1024 * 1024
+    )
@@ -0,0 +1,126 @@
+"""Split long notes into token-bounded chunks."""
+
+import re
+from typing import Iterable, Iterator, List
+
+from .document_parser import PAGE_BREAK
+from .utils.logger import setup_logger
+from .utils.tokens import CHARS_PER_TOKEN, estimate_tokens
+
+logger = setup_logger(__name__)
+
+# Markdown ATX headings start a new section
+HEADING_PATTERN = re.compile(r"^(?=#{1,6}\s)", re.MULTILINE)
+
+PARAGRAPH_PATTERN = re.compile(r"\n\s*\n")
+
+
+class NoteChunker:
+    """Split note text on pages, headings and paragraphs within a token budget."""
+    
+    def __init__(self, max_tokens: int):
+        """
+        Initialize chunker.
+        
+        Args:
+            max_tokens: Estimated token budget per chunk
+        """
+        self.max_tokens = max_tokens
+    
+    def split(self, text: str) -> List[str]:
+        """
+        Split note text into chunks of at most ``max_tokens``.
+        
+        Whole pages and heading sections are packed together where they
+        fit; oversized sections are split into paragraphs, and a single
+        paragraph over budget is cut at whitespace.
+        
+        Args:
+            text: Full note text
+        
+        Returns:
+            Chunks in document order (a single chunk if the note fits)
+        """
+        if estimate_tokens(text) <= self.max_tokens:
+            return [text]
+        
+        chunks = self.pack(self._blocks(text))
+        logger.info(f"Split note into {len(chunks)} chunks of <= {self.max_tokens} tokens")
+        return chunks
+    
+    def iter_chunks(self, pages: Iterable[str]) -> Iterator[str]:
+        """
+        Chunk a note that arrives page by page (see ``DocumentParser.iter_pages``).
+        
+        Each chunk is yielded as soon as it is full, so a caller can start
+        on the first chunks before the rest of the document is parsed.
+        
+        Args:
+            pages: Page texts in document order
+        
+        Yields:
+            Chunks of at most ``max_tokens``
+        """
+        return self._iter_pack(self._sections(pages))
+    
+    def pack(self, blocks: Iterable[str]) -> List[str]:
+        """
+        Greedily pack consecutive blocks into chunks within the budget.
+        
+        Args:
+            blocks: Text blocks in document order
+        
+        Returns:
+            Packed chunks
+        """
+        return list(self._iter_pack(blocks))
+    
+    def _iter_pack(self, blocks: Iterable[str]) -> Iterator[str]:
+        """Pack blocks into chunks, yielding each chunk once it is full."""
+        current: List[str] = []
+        current_tokens = 0
+        
+        for block in blocks:
+            for piece in self._fit(block):
+                piece_tokens = estimate_tokens(piece)
+                if current and current_tokens + piece_tokens > self.max_tokens:
+                    yield "\n\n".join(current)
+                    current, current_tokens = [], 0
+                current.append(piece)
+                current_tokens += piece_tokens
+        
+        if current:
+            yield "\n\n".join(current)
+    
+    def _blocks(self, text: str) -> Iterable[str]:
+        """Yield sections of the note: pages, then headings within a page."""
+        return self._sections(text.split(PAGE_BREAK))
+    
+    def _sections(self, pages: Iterable[str]) -> Iterator[str]:
+        """Yield the heading sections of each page."""
+        for page in pages:
+            for section in HEADING_PATTERN.split(page):
+                section = section.strip()
+                if section:
+                    yield section
+    
+    def _fit(self, block: str) -> List[str]:
+        """Split a block that is over budget into paragraphs, then at whitespace."""
+        if estimate_tokens(block) <= self.max_tokens:
+            return [block]
+        
+        paragraphs = [p.strip() for p in PARAGRAPH_PATTERN.split(block) if p.strip()]
+        if len(paragraphs) > 1:
+            return [piece for paragraph in paragraphs for piece in self._fit(paragraph)]
+        
+        limit = self.max_tokens * CHARS_PER_TOKEN
+        pieces = []
+        while len(block) > limit:
+            cut = block.rfind(" ", 0, limit)
+            if cut <= 0:
+                cut = limit
+            pieces.append(block[:cut].strip())
+            block = block[cut:].strip()
+        if block:
+            pieces.append(block)
+        return pieces
@@ -2,7 +2,7 @@
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
@@ -15,6 +15,11 @@ class AppConfig(BaseSettings):
     # OpenAI settings
     openai_api_key: str = Field(..., validation_alias="OPENAI_API_KEY")
     openai_model: str = Field(default="gpt-4o-mini", validation_alias="OPENAI_MODEL")
+    openai_base_url: Optional[str] = Field(default=None, validation_alias="OPENAI_BASE_URL")
+    # YAML list of API endpoints to route requests across (replaces the key and URL above)
+    llm_endpoints_file: Optional[Path] = Field(default=None, validation_alias="LLM_ENDPOINTS_FILE")
+    # Grow requests in flight per endpoint while healthy, halve on 429/5xx
+    adaptive_concurrency: bool = Field(default=True, validation_alias="ADAPTIVE_CONCURRENCY")
     
     # Directory settings
     notes_incoming_dir: Path = Field(
@@ -34,7 +39,54 @@ class AppConfig(BaseSettings):
     log_level: str = Field(default="INFO", validation_alias="LOG_LEVEL")
     
     # Rate limiting
-    max_requests_per_minute: int = Field(default=50, validation_alias="MAX_REQUESTS_PER_MINUTE")
+    max_requests_per_minute: int = Field(default=50, ge=1, validation_alias="MAX_REQUESTS_PER_MINUTE")
+    max_tokens_per_minute: int = Field(default=200_000, ge=0, validation_alias="MAX_TOKENS_PER_MINUTE")
+    
+    # Caching
+    cache_dir: Path = Field(default=Path("./.cache"), validation_alias="CACHE_DIR")
+    use_cache: bool = Field(default=True, validation_alias="USE_CACHE")
+    response_cache_max_mb: int = Field(default=256, ge=1, validation_alias="RESPONSE_CACHE_MAX_MB")
+    
+    # Text extracted from PDF/DOCX notes, keyed by file digest (0 disables)
+    text_cache_max_mb: int = Field(default=512, ge=0, validation_alias="TEXT_CACHE_MAX_MB")
+    
+    # Concurrency
+    max_workers: int = Field(default=1, ge=1, validation_alias="MAX_WORKERS")
+    
+    # PDF rendering runs on its own process pool (0 renders inline)
+    pdf_workers: int = Field(default=2, ge=0, validation_alias="PDF_WORKERS")
+    pdf_queue_size: int = Field(default=8, ge=1, validation_alias="PDF_QUEUE_SIZE")
+    
+    # "adaptive" extracts with pypdf and re-extracts poor pages with pdfplumber
+    pdf_extractor: Literal["adaptive", "pdfplumber", "pypdf"] = Field(
+        default="adaptive",
+        validation_alias="PDF_EXTRACTOR"
+    )
+    
+    # Large PDFs are extracted in page ranges across processes
+    pdf_parse_workers: int = Field(
+        default_factory=lambda: min(8, os.cpu_count() or 1),
+        ge=0,
+        validation_alias="PDF_PARSE_WORKERS"
+    )
+    pdf_parallel_page_threshold: int = Field(default=40, ge=1, validation_alias="PDF_PARALLEL_PAGE_THRESHOLD")
+    pdf_page_timeout: float = Field(default=30.0, ge=0, validation_alias="PDF_PAGE_TIMEOUT")
+    
+    # Watch mode: notes processed at once and distinct files waiting
+    watch_workers: int = Field(default=2, ge=1, validation_alias="WATCH_WORKERS")
+    watch_queue_size: int = Field(default=256, ge=1, validation_alias="WATCH_QUEUE_SIZE")
+    watch_settle_seconds: float = Field(default=2.0, ge=0, validation_alias="WATCH_SETTLE_SECONDS")
+    
+    # Write study material to disk as it is generated
+    stream_output: bool = Field(default=False, validation_alias="STREAM_OUTPUT")
+    
+    # Long notes are summarized in chunks of this many tokens (0 disables)
+    chunk_token_budget: int = Field(default=12_000, ge=0, validation_alias="CHUNK_TOKEN_BUDGET")
+    chunk_workers: int = Field(default=4, ge=1, validation_alias="CHUNK_WORKERS")
+    
+    # Prometheus textfile and JSON summary of stage timings, tokens and cache use
+    metrics_enabled: bool = Field(default=True, validation_alias="METRICS_ENABLED")
+    metrics_dir: Path = Field(default=Path("./metrics"), validation_alias="METRICS_DIR")
     
     model_config = {
         "env_file": ".env",
@@ -1,84 +1,514 @@
 """Document parsing for multiple file formats."""
 
-from pathlib import Path
-from typing import Optional
 import logging
+import multiprocessing
+import re
+import signal
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 
-try:
-    import pypdf
-    PYPDF_AVAILABLE = True
-except ImportError:
-    PYPDF_AVAILABLE = False
+from .config import AppConfig
+from .utils.logger import setup_logger
 
-try:
-    import pdfplumber
-    PDFPLUMBER_AVAILABLE = True
-except ImportError:
-    PDFPLUMBER_AVAILABLE = False
+# The parsing libraries are imported where they are used, so importing this
+# module (and starting the CLI) does not pay for them
+PYPDF_AVAILABLE = find_spec("pypdf") is not None
+PDFPLUMBER_AVAILABLE = find_spec("pdfplumber") is not None
+DOCX_AVAILABLE = find_spec("docx") is not None
 
-try:
-    from docx import Document
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
+logger = setup_logger(__name__)
 
-from .utils.logger import setup_logger
+# Separates pages of paginated documents so later stages can split on them
+PAGE_BREAK = "\f"
+PAGE_SEPARATOR = f"\n\n{PAGE_BREAK}"
+
+# Paragraphs and table rows of Word documents are joined with this
+BLOCK_SEPARATOR = "\n\n"
+
+TEXT_EXTENSIONS = {".txt", ".md", ".markdown"}
+
+# Glyphs pdfminer/pypdf could not map to Unicode, e.g. "(cid:72)"
+CID_PATTERN = re.compile(r"\(cid:\d+\)")
+
+# Average word length above which words have likely been run together
+RUN_TOGETHER_WORD_LENGTH = 15
+
+# Characters per square inch below which a page is considered nearly empty
+MIN_CHAR_DENSITY = 0.5
+
+
+def score_page_text(text: str, page_area: Optional[float] = None) -> float:
+    """
+    Score how usable a page's extracted text looks.
+    
+    Args:
+        text: Text extracted from the page
+        page_area: Page area in PDF points (1/72 inch), if known
+    
+    Returns:
+        Score between 0 (empty or garbled) and 1 (clean text)
+    """
+    stripped = text.strip()
+    if not stripped:
+        return 0.0
+    
+    # Share of characters that decoded to something readable
+    unreadable = stripped.count("\ufffd") + sum(
+        len(match) for match in CID_PATTERN.findall(stripped)
+    )
+    unreadable += sum(1 for ch in stripped if not (ch.isprintable() or ch.isspace()))
+    score = max(0.0, 1.0 - unreadable / len(stripped))
+    
+    words = stripped.split()
+    average_length = sum(len(word) for word in words) / len(words)
+    if average_length > RUN_TOGETHER_WORD_LENGTH:
+        # Missing spaces: "Thisisasentencewithoutspaces"
+        score *= RUN_TOGETHER_WORD_LENGTH / average_length
+    
+    if len(words) >= 10:
+        # Letter-spaced output: "T h i s  i s  a  s e n t e n c e"
+        single = sum(1 for word in words if len(word) == 1) / len(words)
+        if single > 0.5:
+            score *= 1.0 - single
+    
+    if page_area:
+        density = len(stripped) / (page_area / (72 * 72))
+        score *= min(1.0, density / MIN_CHAR_DENSITY)
+    
+    return score
+
+
+class PageTimeout(Exception):
+    """Raised when extracting a single page takes too long."""
 
-logger = setup_logger(__name__)
+
+@contextmanager
+def _page_deadline(seconds: float) -> Iterator[None]:
+    """
+    Raise PageTimeout if the block runs longer than ``seconds``.
+    
+    Uses SIGALRM, so it only takes effect in a process's main thread on
+    platforms that have it (pool workers); elsewhere it is a no-op.
+    """
+    if (
+        seconds <= 0
+        or not hasattr(signal, "SIGALRM")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+    
+    def on_alarm(signum: int, frame: object) -> None:
+        raise PageTimeout()
+    
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _extract_pdfplumber_pages(
+    filepath: str,
+    page_numbers: Sequence[int],
+    page_timeout: float
+) -> List[str]:
+    """
+    Extract the given pages with pdfplumber (process pool entry point).
+    
+    A page that exceeds ``page_timeout`` is skipped and returns "".
+    """
+    import pdfplumber
+    
+    texts = []
+    with pdfplumber.open(filepath) as pdf:
+        for page_num in page_numbers:
+            page = pdf.pages[page_num]
+            try:
+                with _page_deadline(page_timeout):
+                    texts.append(page.extract_text() or "")
+            except PageTimeout:
+                logger.warning(
+                    f"Skipped page {page_num + 1} of {Path(filepath).name}: "
+                    f"extraction took over {page_timeout:.0f}s"
+                )
+                texts.append("")
+            finally:
+                # Drop cached layout objects so long ranges stay small
+                page.close()
+    return texts
 
 
 class DocumentParser:
     """Parse text from various document formats."""
     
+    # PDFs with at least this many pages are extracted in parallel
+    PARALLEL_PAGE_THRESHOLD = 40
+    
+    # Seconds pdfplumber may spend on one page before it is skipped
+    PAGE_TIMEOUT = 30.0
+    
+    # Pages pypdf extracts with a lower score are redone by pdfplumber
+    MIN_PAGE_QUALITY = 0.6
+    
+    EXTRACTORS = ("adaptive", "pdfplumber", "pypdf")
+    
+    # Bump whenever extraction output changes, to invalidate cached text
+    PARSER_VERSION = 1
+    
+    # Size of the pages iter_pages yields for formats without real pages
+    PAGE_CHARS = 4000
+    
+    def __init__(
+        self,
+        parse_workers: int = 0,
+        parallel_page_threshold: int = PARALLEL_PAGE_THRESHOLD,
+        page_timeout: float = PAGE_TIMEOUT,
+        extractor: str = "adaptive"
+    ):
+        """
+        Initialize document parser.
+        
+        Args:
+            parse_workers: Processes used to extract large PDFs (<= 1 disables)
+            parallel_page_threshold: Minimum page count for parallel extraction
+            page_timeout: Per-page extraction limit in parallel mode (0 disables)
+            extractor: PDF extraction strategy, one of ``EXTRACTORS``
+        """
+        if extractor not in self.EXTRACTORS:
+            raise ValueError(f"Unknown PDF extractor: {extractor}")
+        
+        self.extractor = extractor
+        self.parse_workers = parse_workers
+        self.parallel_page_threshold = parallel_page_threshold
+        self.page_timeout = page_timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config: AppConfig) -> "DocumentParser":
+        """Create a parser with the configured PDF extraction settings."""
+        return cls(
+            parse_workers=config.pdf_parse_workers,
+            parallel_page_threshold=config.pdf_parallel_page_threshold,
+            page_timeout=config.pdf_page_timeout,
+            extractor=config.pdf_extractor
+        )
+    
+    @property
+    def cache_tag(self) -> str:
+        """Identify the extraction settings that affect parsed text."""
+        return f"v{self.PARSER_VERSION}-{self.extractor}"
+    
     @staticmethod
-    def parse_pdf_pypdf(filepath: Path) -> str:
-        """Parse PDF using pypdf (faster, simpler)."""
+    def iter_pdf_pages_pypdf(filepath: Path) -> Iterator[str]:
+        """Yield the text of each non-empty PDF page using pypdf."""
         if not PYPDF_AVAILABLE:
             raise ImportError("pypdf not installed. Run: pip install pypdf")
+        import pypdf
         
-        text = []
         with open(filepath, 'rb') as file:
             pdf_reader = pypdf.PdfReader(file)
             for page_num, page in enumerate(pdf_reader.pages):
                 page_text = page.extract_text()
                 if page_text:
-                    text.append(page_text)
+                    yield page_text
                 logger.debug(f"Extracted page {page_num + 1}/{len(pdf_reader.pages)}")
-        
-        return "\n\n".join(text)
     
     @staticmethod
-    def parse_pdf_pdfplumber(filepath: Path) -> str:
-        """Parse PDF using pdfplumber (better for complex layouts)."""
+    def iter_pdf_pages_pdfplumber(filepath: Path) -> Iterator[str]:
+        """Yield the text of each non-empty PDF page using pdfplumber."""
         if not PDFPLUMBER_AVAILABLE:
             raise ImportError("pdfplumber not installed. Run: pip install pdfplumber")
+        import pdfplumber
         
-        text = []
         with pdfplumber.open(filepath) as pdf:
             for page_num, page in enumerate(pdf.pages):
                 page_text = page.extract_text()
+                # Drop cached layout objects so memory stays flat
+                page.close()
                 if page_text:
-                    text.append(page_text)
+                    yield page_text
                 logger.debug(f"Extracted page {page_num + 1}/{len(pdf.pages)}")
+    
+    @staticmethod
+    def parse_pdf_pypdf(filepath: Path) -> str:
+        """Parse PDF using pypdf (faster, simpler)."""
+        return PAGE_SEPARATOR.join(DocumentParser.iter_pdf_pages_pypdf(filepath))
+    
+    @staticmethod
+    def parse_pdf_pdfplumber(filepath: Path) -> str:
+        """Parse PDF using pdfplumber (better for complex layouts)."""
+        return PAGE_SEPARATOR.join(DocumentParser.iter_pdf_pages_pdfplumber(filepath))
+    
+    @staticmethod
+    def parse_pdf_pdfplumber_parallel(
+        filepath: Path,
+        executor: Executor,
+        workers: int,
+        page_timeout: float = PAGE_TIMEOUT
+    ) -> str:
+        """
+        Parse PDF using pdfplumber, splitting page ranges across processes.
+        
+        Args:
+            filepath: Path to PDF file
+            executor: Process pool running the extraction
+            workers: Number of processes in the pool
+            page_timeout: Seconds before a single page is skipped (0 disables)
+        
+        Returns:
+            Extracted text with pages in document order
+        """
+        if not PDFPLUMBER_AVAILABLE:
+            raise ImportError("pdfplumber not installed. Run: pip install pdfplumber")
+        import pdfplumber
+        
+        with pdfplumber.open(filepath) as pdf:
+            page_count = len(pdf.pages)
+        
+        texts = DocumentParser._map_page_ranges(
+            filepath, range(page_count), executor, workers, page_timeout
+        )
+        return PAGE_SEPARATOR.join(page_text for page_text in texts if page_text)
+    
+    @staticmethod
+    def _map_page_ranges(
+        filepath: Path,
+        page_numbers: Sequence[int],
+        executor: Executor,
+        workers: int,
+        page_timeout: float
+    ) -> List[str]:
+        """
+        Extract pages with pdfplumber on a process pool.
+        
+        Args:
+            filepath: Path to PDF file
+            page_numbers: Pages to extract (0-based)
+            executor: Process pool running the extraction
+            workers: Number of processes in the pool
+            page_timeout: Seconds before a single page is skipped (0 disables)
+        
+        Returns:
+            Text of each requested page, in the order given
+        """
+        page_count = len(page_numbers)
+        
+        # A few ranges per worker keeps the pool busy when page costs differ
+        range_count = min(page_count, workers * 4)
+        bounds = [page_count * i // range_count for i in range(range_count + 1)]
+        
+        logger.debug(
+            f"Extracting {page_count} pages of {filepath.name} in "
+            f"{range_count} ranges on {workers} processes"
+        )
+        ranges = executor.map(
+            _extract_pdfplumber_pages,
+            [str(filepath)] * range_count,
+            [page_numbers[start:end] for start, end in zip(bounds, bounds[1:])],
+            [page_timeout] * range_count
+        )
+        return [page_text for texts in ranges for page_text in texts]
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the extraction pool on first use and keep it for later PDFs."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.parse_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+    
+    def close(self) -> None:
+        """Stop the extraction pool, if one was started."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+    
+    def count_pdf_pages(self, filepath: Path) -> int:
+        """Return the number of pages in a PDF."""
+        if PYPDF_AVAILABLE:
+            import pypdf
+            return len(pypdf.PdfReader(filepath).pages)
+        
+        import pdfplumber
+        with pdfplumber.open(filepath) as pdf:
+            return len(pdf.pages)
+    
+    @staticmethod
+    def _iter_pypdf_scored(filepath: Path) -> Iterator[Tuple[str, float, float]]:
+        """Yield each page's pypdf text with its quality score and page area."""
+        import pypdf
         
-        return "\n\n".join(text)
+        with open(filepath, 'rb') as file:
+            pdf_reader = pypdf.PdfReader(file)
+            for page in pdf_reader.pages:
+                try:
+                    page_text = page.extract_text() or ""
+                except Exception as e:
+                    logger.debug(f"pypdf failed on a page of {filepath.name}: {e}")
+                    page_text = ""
+                page_area = float(page.mediabox.width) * float(page.mediabox.height)
+                yield page_text, score_page_text(page_text, page_area), page_area
     
     @staticmethod
-    def parse_pdf(filepath: Path, prefer_pdfplumber: bool = True) -> str:
+    def _log_extractor_stats(filepath: Path, page_count: int, replaced: List[int]) -> None:
+        """Log which library produced the pages of an adaptive extraction."""
+        logger.info(
+            f"Extracted {filepath.name}: {page_count - len(replaced)} page(s) with pypdf, "
+            f"{len(replaced)} with pdfplumber"
+            + (f" (pages {', '.join(map(str, replaced))})" if replaced else "")
+        )
+    
+    def iter_pdf_pages_adaptive(self, filepath: Path) -> Iterator[str]:
+        """
+        Yield PDF pages extracted with pypdf, redoing poor pages with pdfplumber.
+        
+        Pages are re-extracted one at a time as they are reached, so
+        memory stays bounded; ``parse_pdf_adaptive`` batches them instead.
+        
+        Args:
+            filepath: Path to PDF file
+        
+        Yields:
+            Text of each non-empty page
+        """
+        import pdfplumber
+        
+        page_count = 0
+        replaced: List[int] = []
+        with ExitStack() as stack:
+            fallback = None
+            for page_num, (page_text, score, page_area) in enumerate(self._iter_pypdf_scored(filepath)):
+                page_count += 1
+                if score < self.MIN_PAGE_QUALITY:
+                    if fallback is None:
+                        fallback = stack.enter_context(pdfplumber.open(filepath))
+                    page = fallback.pages[page_num]
+                    retry_text = page.extract_text() or ""
+                    page.close()
+                    # Keep pypdf's text unless pdfplumber did better on the same scale
+                    if score_page_text(retry_text, page_area) > score:
+                        page_text = retry_text
+                        replaced.append(page_num + 1)
+                if page_text:
+                    yield page_text
+        
+        self._log_extractor_stats(filepath, page_count, replaced)
+    
+    def parse_pdf_adaptive(self, filepath: Path) -> str:
+        """
+        Parse PDF with pypdf, re-extracting poorly scored pages with pdfplumber.
+        
+        Args:
+            filepath: Path to PDF file
+        
+        Returns:
+            Extracted text
+        """
+        texts: List[str] = []
+        scores: List[float] = []
+        areas: List[float] = []
+        for page_text, score, page_area in self._iter_pypdf_scored(filepath):
+            texts.append(page_text)
+            scores.append(score)
+            areas.append(page_area)
+        
+        retry = [
+            page_num for page_num, score in enumerate(scores)
+            if score < self.MIN_PAGE_QUALITY
+        ]
+        replaced = []
+        if retry:
+            if self.parse_workers > 1 and len(retry) >= self.parallel_page_threshold:
+                retry_texts = DocumentParser._map_page_ranges(
+                    filepath, retry, self._get_executor(),
+                    self.parse_workers, self.page_timeout
+                )
+            else:
+                retry_texts = _extract_pdfplumber_pages(str(filepath), retry, 0)
+            
+            for page_num, page_text in zip(retry, retry_texts):
+                # Keep pypdf's text unless pdfplumber did better on the same scale
+                if score_page_text(page_text, areas[page_num]) > scores[page_num]:
+                    texts[page_num] = page_text
+                    replaced.append(page_num + 1)
+        
+        self._log_extractor_stats(filepath, len(texts), replaced)
+        
+        return PAGE_SEPARATOR.join(page_text for page_text in texts if page_text)
+    
+    def _resolve_extractor(self, extractor: Optional[str]) -> str:
+        """Pick the extraction strategy, falling back to whichever library is installed."""
+        extractor = extractor or self.extractor
+        if extractor == "adaptive" and not (PYPDF_AVAILABLE and PDFPLUMBER_AVAILABLE):
+            return "pypdf" if PYPDF_AVAILABLE else "pdfplumber"
+        elif extractor == "pdfplumber" and not PDFPLUMBER_AVAILABLE:
+            return "pypdf"
+        elif extractor == "pypdf" and not PYPDF_AVAILABLE:
+            return "pdfplumber"
+        return extractor
+    
+    def iter_pdf_pages(self, filepath: Path, extractor: Optional[str] = None) -> Iterator[str]:
+        """
+        Yield the text of each non-empty PDF page, one page at a time.
+        
+        Args:
+            filepath: Path to PDF file
+            extractor: Override the parser's extraction strategy
+        
+        Yields:
+            Page text in document order
+        """
+        logger.info(f"Streaming PDF: {filepath.name}")
+        extractor = self._resolve_extractor(extractor)
+        
+        if extractor == "adaptive":
+            yield from self.iter_pdf_pages_adaptive(filepath)
+        elif extractor == "pdfplumber":
+            yield from DocumentParser.iter_pdf_pages_pdfplumber(filepath)
+        else:
+            yield from DocumentParser.iter_pdf_pages_pypdf(filepath)
+    
+    def extracts_in_parallel(self, filepath: Path, extractor: Optional[str] = None) -> bool:
+        """Whether ``parse_pdf`` splits this PDF's pages across processes (``iter_pages`` never does)."""
+        return (
+            self._resolve_extractor(extractor) == "pdfplumber"
+            and self.parse_workers > 1
+            and self.count_pdf_pages(filepath) >= self.parallel_page_threshold
+        )
+    
+    def parse_pdf(self, filepath: Path, extractor: Optional[str] = None) -> str:
         """
         Parse PDF file to text.
         
         Args:
             filepath: Path to PDF file
-            prefer_pdfplumber: Use pdfplumber if available (better quality)
+            extractor: Override the parser's extraction strategy
         
         Returns:
             Extracted text
         """
         logger.info(f"Parsing PDF: {filepath.name}")
+        extractor = self._resolve_extractor(extractor)
         
         try:
-            if prefer_pdfplumber and PDFPLUMBER_AVAILABLE:
+            if extractor == "adaptive":
+                return self.parse_pdf_adaptive(filepath)
+            elif extractor == "pdfplumber" and PDFPLUMBER_AVAILABLE:
+                if self.extracts_in_parallel(filepath, extractor):
+                    return DocumentParser.parse_pdf_pdfplumber_parallel(
+                        filepath, self._get_executor(), self.parse_workers, self.page_timeout
+                    )
                 return DocumentParser.parse_pdf_pdfplumber(filepath)
             elif PYPDF_AVAILABLE:
                 return DocumentParser.parse_pdf_pypdf(filepath)
@@ -88,6 +518,27 @@ class DocumentParser:
             logger.error(f"Error parsing PDF {filepath}: {e}")
             raise
     
+    @staticmethod
+    def iter_docx_blocks(filepath: Path) -> Iterator[str]:
+        """Yield the non-empty paragraphs, then table rows, of a Word document."""
+        if not DOCX_AVAILABLE:
+            raise ImportError("python-docx not installed. Run: pip install python-docx")
+        from docx import Document
+        
+        doc = Document(str(filepath))
+        
+        # Extract paragraphs
+        for para in doc.paragraphs:
+            if para.text.strip():
+                yield para.text
+        
+        # Extract tables
+        for table in doc.tables:
+            for row in table.rows:
+                row_text = " | ".join(cell.text.strip() for cell in row.cells)
+                if row_text.strip():
+                    yield row_text
+    
     @staticmethod
     def parse_docx(filepath: Path) -> str:
         """
@@ -99,29 +550,12 @@ class DocumentParser:
         Returns:
             Extracted text
         """
-        if not DOCX_AVAILABLE:
-            raise ImportError("python-docx not installed. Run: pip install python-docx")
-        
         logger.info(f"Parsing Word document: {filepath.name}")
         
         try:
-            doc = Document(filepath)
-            text = []
-            
-            # Extract paragraphs
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    text.append(para.text)
-            
-            # Extract tables
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = " | ".join(cell.text.strip() for cell in row.cells)
-                    if row_text.strip():
-                        text.append(row_text)
-            
+            text = list(DocumentParser.iter_docx_blocks(filepath))
             logger.debug(f"Extracted {len(text)} paragraphs/rows from Word document")
-            return "\n\n".join(text)
+            return BLOCK_SEPARATOR.join(text)
             
         except Exception as e:
             logger.error(f"Error parsing Word document {filepath}: {e}")
@@ -142,7 +576,101 @@ class DocumentParser:
         return filepath.read_text(encoding="utf-8")
     
     @staticmethod
-    def parse_file(filepath: Path) -> str:
+    def iter_text_blocks(filepath: Path) -> Iterator[str]:
+        """
+        Yield a text file paragraph by paragraph.
+        
+        Each block keeps its line endings and trailing blank lines, so
+        ``"".join`` of the blocks reproduces the file.
+        """
+        with open(filepath, encoding="utf-8") as file:
+            block: List[str] = []
+            for line in file:
+                block.append(line)
+                if not line.strip():
+                    yield "".join(block)
+                    block = []
+            if block:
+                yield "".join(block)
+    
+    def iter_blocks(self, filepath: Path) -> Iterator[str]:
+        """
+        Yield a document's content in its natural units, without loading it whole.
+        
+        PDFs yield pages, Word documents yield paragraphs and table rows,
+        and text files yield paragraphs.
+        
+        Args:
+            filepath: Path to file
+        
+        Yields:
+            Text blocks in document order
+        
+        Raises:
+            ValueError: If file format is not supported
+        """
+        extension = filepath.suffix.lower()
+        
+        if extension == ".pdf":
+            return self.iter_pdf_pages(filepath)
+        elif extension == ".docx":
+            return DocumentParser.iter_docx_blocks(filepath)
+        elif extension in TEXT_EXTENSIONS:
+            return DocumentParser.iter_text_blocks(filepath)
+        else:
+            raise ValueError(f"Unsupported file format: {extension}")
+    
+    def iter_pages(self, filepath: Path, page_chars: int = PAGE_CHARS) -> Iterator[str]:
+        """
+        Yield a document page by page, without loading it whole.
+        
+        PDF pages are yielded as extracted. Word and text documents have no
+        pages, so consecutive blocks are grouped into pages of about
+        ``page_chars`` characters (a longer single block is its own page).
+        
+        Args:
+            filepath: Path to file
+            page_chars: Target page size for formats without pages
+        
+        Yields:
+            Page text in document order; joined with ``page_separator``
+            the pages are ``parse_file``'s output
+        
+        Raises:
+            ValueError: If file format is not supported
+        """
+        blocks = self.iter_blocks(filepath)
+        if filepath.suffix.lower() == ".pdf":
+            yield from blocks
+            return
+        
+        yield from DocumentParser._group_blocks(blocks, page_chars, DocumentParser.page_separator(filepath))
+    
+    @staticmethod
+    def page_separator(filepath: Path) -> str:
+        """Return the text that joins a document's ``iter_pages`` into ``parse_file`` output."""
+        extension = filepath.suffix.lower()
+        if extension == ".pdf":
+            return PAGE_SEPARATOR
+        if extension in TEXT_EXTENSIONS:
+            return ""
+        return BLOCK_SEPARATOR
+    
+    @staticmethod
+    def _group_blocks(blocks: Iterable[str], page_chars: int, separator: str) -> Iterator[str]:
+        """Join consecutive blocks into pages of up to ``page_chars`` characters."""
+        page: List[str] = []
+        size = 0
+        for block in blocks:
+            if page and size + len(block) > page_chars:
+                yield separator.join(page)
+                page, size = [], 0
+            page.append(block)
+            size += len(block) + len(separator)
+        if page:
+            yield separator.join(page)
+    
+    def parse_file(self, filepath: Path) -> str:
         """
         Automatically detect and parse file based on extension.
         
@@ -158,10 +686,10 @@ class DocumentParser:
         extension = filepath.suffix.lower()
         
         if extension == ".pdf":
-            return DocumentParser.parse_pdf(filepath)
+            return self.parse_pdf(filepath)
         elif extension == ".docx":
             return DocumentParser.parse_docx(filepath)
-        elif extension in [".txt", ".md", ".markdown"]:
+        elif extension in TEXT_EXTENSIONS:
             return DocumentParser.parse_text(filepath)
         else:
             raise ValueError(f"Unsupported file format: {extension}")
@@ -1,12 +1,16 @@
 """File handling operations for Study Assistant."""
 
-import json
+import hashlib
+import os
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from . import metrics
+from .cache import DiskCache
 from .utils.logger import setup_logger
 from .document_parser import DocumentParser
+from .processed_index import ProcessedIndex
 
 logger = setup_logger(__name__)
 
@@ -17,17 +21,34 @@ class FileHandler:
     # Uppdaterade extensions
     SUPPORTED_EXTENSIONS = {".txt", ".md", ".markdown", ".pdf", ".docx"}
     
-    def __init__(self, incoming_dir: Path, index_path: Path):
+    # Read size when hashing note contents
+    HASH_BLOCK_SIZE = 1024 * 1024
+    
+    # Formats whose extracted text is worth caching (plain text is read directly)
+    CACHED_EXTENSIONS = {".pdf", ".docx"}
+    
+    def __init__(
+        self,
+        incoming_dir: Path,
+        index_path: Path,
+        parser: Optional[DocumentParser] = None,
+        text_cache: Optional[DiskCache] = None
+    ):
         """
         Initialize file handler.
         
         Args:
             incoming_dir: Directory containing incoming notes
             index_path: Path to processed files index
+            parser: Document parser (defaults to serial extraction)
+            text_cache: Cache of extracted PDF/DOCX text, keyed by file digest
         """
         self.incoming_dir = incoming_dir
         self.index_path = index_path
-        self.parser = DocumentParser()
+        self.parser = parser or DocumentParser()
+        self.text_cache = text_cache
+        # (path, size, mtime_ns) -> digest, so a file is hashed at most once per version
+        self._digests: Dict[Tuple[str, int, int], str] = {}
         self._ensure_directories()
     
     def _ensure_directories(self) -> None:
@@ -42,7 +63,7 @@ class FileHandler:
         Returns:
             List of file paths to process
         """
-        files = []
+        files: List[Path] = []
         
         for ext in self.SUPPORTED_EXTENSIONS:
             files.extend(self.incoming_dir.glob(f"*{ext}"))
@@ -62,14 +83,71 @@ class FileHandler:
             File content as string
         """
         try:
+            cache_key = self._text_cache_key(filepath)
+            cached = self._cached_text(cache_key)
+            if cached is not None:
+                logger.debug(f"Using cached text for {filepath.name}")
+                return cached
+            
             # Use DocumentParser to handle different formats
             content = self.parser.parse_file(filepath)
             logger.debug(f"Extracted {len(content)} characters from {filepath.name}")
+            
+            if cache_key is not None and self.text_cache is not None:
+                self.text_cache.set(cache_key, content.encode("utf-8"))
             return content
         except Exception as e:
             logger.error(f"Error reading {filepath}: {e}")
             raise
     
+    def iter_note_pages(self, filepath: Path) -> Iterator[str]:
+        """
+        Read a note page by page, so chunking can start before parsing ends.
+        
+        Cached text is split back into pages. Otherwise pages are yielded
+        as they are extracted, and the text is cached once the last page
+        has been read, as ``read_note_file`` would cache it.
+        
+        Args:
+            filepath: Path to note file
+        
+        Yields:
+            Page text in document order (joined with
+            ``DocumentParser.page_separator`` it is ``read_note_file``'s text)
+        """
+        separator = DocumentParser.page_separator(filepath)
+        cache_key = self._text_cache_key(filepath)
+        cached = self._cached_text(cache_key)
+        if cached is not None:
+            yield from cached.split(separator) if separator else [cached]
+            return
+        
+        pages: List[str] = []
+        for page in self.parser.iter_pages(filepath):
+            if cache_key is not None:
+                pages.append(page)
+            yield page
+        
+        if cache_key is not None and self.text_cache is not None:
+            self.text_cache.set(cache_key, separator.join(pages).encode("utf-8"))
+    
+    def _text_cache_key(self, filepath: Path) -> Optional[str]:
+        """Return the text cache key for a note, or None if its text is not cached."""
+        if self.text_cache is None or filepath.suffix.lower() not in self.CACHED_EXTENSIONS:
+            return None
+        return f"{self.file_digest(filepath)}:{self.parser.cache_tag}"
+    
+    def _cached_text(self, cache_key: Optional[str]) -> Optional[str]:
+        """Look up extracted text in the text cache, counting the hit or miss."""
+        if cache_key is None or self.text_cache is None:
+            return None
+        cached = self.text_cache.get(cache_key)
+        if cached is None:
+            metrics.count("text_cache_misses")
+            return None
+        metrics.count("text_cache_hits")
+        return cached.decode("utf-8")
+    
     def save_output(self, output_path: Path, content: str) -> None:
         """
         Save processed content to file.
@@ -86,46 +164,179 @@ class FileHandler:
             logger.error(f"Failed to save output to {output_path}: {e}")
             raise
     
-    def load_processed_index(self) -> Dict[str, str]:
+    def save_output_stream(
+        self,
+        output_path: Path,
+        chunks: Iterable[str],
+        on_chunk: Optional[Callable[[str], None]] = None
+    ) -> str:
         """
-        Load index of processed files.
+        Save content to file as it is produced.
+        
+        Chunks are appended to ``<name>.part`` and flushed as they arrive;
+        the file is renamed into place only once the stream completes, so
+        ``output_path`` never holds partial output.
+        
+        Args:
+            output_path: Path where to save the output
+            chunks: Pieces of content in order
+            on_chunk: Called with each piece after it is written
         
         Returns:
-            Dictionary mapping filename to timestamp
+            The complete content ("" if the stream produced nothing)
         """
-        if not self.index_path.exists():
-            logger.debug("No existing processed index found")
-            return {}
+        part_path = output_path.with_name(output_path.name + ".part")
+        parts: List[str] = []
         
         try:
-            with open(self.index_path, "r", encoding="utf-8") as f:
-                index = json.load(f)
-            logger.debug(f"Loaded processed index with {len(index)} entries")
-            return index
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in processed index: {e}")
-            return {}
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(part_path, "w", encoding="utf-8") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    f.flush()
+                    parts.append(chunk)
+                    if on_chunk:
+                        on_chunk(chunk)
+            
+            if not parts:
+                part_path.unlink()
+                return ""
+            
+            os.replace(part_path, output_path)
+            logger.info(f"Saved output to {output_path}")
+            return "".join(parts)
+        except Exception as e:
+            logger.error(f"Failed to save output to {output_path}: {e}")
+            part_path.unlink(missing_ok=True)
+            raise
     
-    def save_processed_index(self, index: Dict[str, str]) -> None:
+    def file_digest(self, filepath: Path, stat: Optional[os.stat_result] = None) -> str:
         """
-        Save processed files index.
+        Compute the SHA-256 digest of a file's contents.
         
         Args:
-            index: Dictionary mapping filename to timestamp
+            filepath: Path to the file
+            stat: Result of ``filepath.stat()`` if already known
+        
+        Returns:
+            Hex digest
+        """
+        stat = stat or filepath.stat()
+        memo_key = (str(filepath), stat.st_size, stat.st_mtime_ns)
+        digest = self._digests.get(memo_key)
+        if digest is not None:
+            return digest
+        
+        sha = hashlib.sha256()
+        with open(filepath, "rb") as f:
+            for block in iter(lambda: f.read(self.HASH_BLOCK_SIZE), b""):
+                sha.update(block)
+        digest = sha.hexdigest()
+        self._digests[memo_key] = digest
+        return digest
+    
+    def load_processed_index(self) -> ProcessedIndex:
+        """
+        Open the index of processed files.
+        
+        Returns:
+            Processed files index
+        """
+        index = ProcessedIndex.open(self.index_path)
+        logger.debug(f"Opened processed index with {len(index)} entries")
+        return index
+    
+    def save_processed_index(self, index: ProcessedIndex) -> None:
+        """
+        Commit pending index updates.
+        
+        Args:
+            index: Processed files index
         """
         try:
-            with open(self.index_path, "w", encoding="utf-8") as f:
-                json.dump(index, f, indent=2, ensure_ascii=False)
-            logger.debug(f"Saved processed index with {len(index)} entries")
+            index.commit()
+            logger.debug("Committed processed index")
         except Exception as e:
             logger.error(f"Failed to save processed index: {e}")
             raise
     
-    def is_processed(self, filename: str, index: Dict[str, str]) -> bool:
-        """Check if a file has already been processed."""
-        return filename in index
+    def is_processed(self, filepath: Path, index: ProcessedIndex) -> bool:
+        """
+        Check if this version of a file has already been processed.
+        
+        An unchanged size and mtime is trusted without reading the file.
+        Otherwise the contents are hashed, so an edited note is reprocessed
+        while a touched file or a renamed copy of a processed note is not.
+        
+        Args:
+            filepath: Path to the note file
+            index: Processed files index
+        
+        Returns:
+            True if identical content has already been processed
+        """
+        entry = index.get(filepath.name)
+        stat = filepath.stat()
+        if self.is_known_version(entry, stat):
+            return True
+        
+        digest = self.file_digest(filepath, stat)
+        if entry and entry["digest"] == digest:
+            # Touched but unchanged; refresh the stat fast path
+            entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            index.set(filepath.name, entry)
+            return True
+        
+        other = index.find_by_digest(digest)
+        if other:
+            logger.info(f"{filepath.name} has the same content as {other}")
+            self.mark_processed(filepath, index)
+            return True
+        
+        return False
+    
+    @staticmethod
+    def is_known_version(entry: Optional[Dict[str, Any]], stat: os.stat_result) -> bool:
+        """
+        Check from metadata alone whether an index entry matches a file.
+        
+        Args:
+            entry: Index entry for the file's name, if any
+            stat: Result of ``filepath.stat()``
+        
+        Returns:
+            True if the entry records this size and mtime (or predates
+            content tracking); False means the file must be checked further
+        """
+        if entry is None:
+            return False
+        
+        # Entries written before content tracking only recorded a timestamp
+        if entry["digest"] is None:
+            return True
+        
+        return entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
     
-    def mark_processed(self, filename: str, index: Dict[str, str]) -> None:
-        """Mark a file as processed in the index."""
-        index[filename] = datetime.now().isoformat()
-        logger.debug(f"Marked {filename} as processed")
+    def mark_processed(
+        self,
+        filepath: Path,
+        index: ProcessedIndex,
+        stat: Optional[os.stat_result] = None
+    ) -> None:
+        """
+        Record the processed version of a file in the index.
+        
+        Args:
+            filepath: Path to the note file
+            index: Processed files index
+            stat: Result of ``filepath.stat()`` for the version that was
+                processed, if the file may have changed since
+        """
+        stat = stat or filepath.stat()
+        index.set(filepath.name, {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "digest": self.file_digest(filepath, stat),
+            "processed_at": datetime.now().isoformat()
+        })
+        logger.debug(f"Marked {filepath.name} as processed")
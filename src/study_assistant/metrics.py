@@ -0,0 +1,331 @@
+"""Per-stage timing, token and cache metrics with Prometheus and JSON export."""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+R = TypeVar("R")
+
+# Pipeline stages timed for every note
+STAGES = ("parse", "llm", "write", "pdf")
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Counter name -> Prometheus help text
+COUNTERS = {
+    "files_succeeded": "Notes processed successfully",
+    "files_failed": "Notes that failed to process",
+    "pdf_failed": "Notes saved as Markdown whose PDF could not be rendered",
+    "prompt_tokens": "Prompt tokens reported by the API",
+    "completion_tokens": "Completion tokens reported by the API",
+    "retries": "API requests retried after an error",
+    "rate_limited": "API requests rejected with HTTP 429",
+    "response_cache_hits": "Completions served from the response cache",
+    "response_cache_misses": "Completions not found in the response cache",
+    "text_cache_hits": "Note texts served from the extracted-text cache",
+    "text_cache_misses": "Note texts not found in the extracted-text cache",
+}
+
+PROMETHEUS_FILE = "notepal.prom"
+JSON_FILE = "notepal_metrics.json"
+
+
+class Histogram:
+    """Durations counted into fixed buckets, as Prometheus histograms do."""
+    
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+    
+    def merge(self, other: "Histogram") -> None:
+        for i, count in enumerate(other.buckets):
+            self.buckets[i] += count
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+    
+    def quantile(self, fraction: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+    
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "max": self.max,
+        }
+
+
+@dataclass
+class FileMetrics:
+    """Stage times and counters for one note."""
+    
+    filename: str
+    subject: str
+    stages: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    success: Optional[bool] = None
+
+
+# The note the current thread or task is working on (see ``Metrics.track``)
+_current: contextvars.ContextVar[Optional[Tuple["Metrics", FileMetrics]]] = contextvars.ContextVar(
+    "notepal_file_metrics", default=None
+)
+
+
+class Metrics:
+    """
+    Thread-safe registry of stage histograms, counters and gauges.
+    
+    Everything is labelled with the subject of the note it belongs to and
+    also kept per file. Code deep in the pipeline (the API client, the text
+    cache) records through the module-level ``count`` and ``observe``
+    functions, which attribute to the note set by ``track``.
+    """
+    
+    # Per-file records kept for the JSON summary; older notes are dropped
+    MAX_FILES = 1000
+    
+    def __init__(self):
+        self.started = time.time()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._counters: Dict[Tuple[str, str], int] = {}
+        self._gauges: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._files: "OrderedDict[str, FileMetrics]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def track(self, filename: str, subject: str) -> Iterator[FileMetrics]:
+        """
+        Attribute metrics recorded in this block to one note.
+        
+        Args:
+            filename: Note filename
+            subject: Subject extracted from the filename
+        
+        Yields:
+            The note's record, for stages that finish outside the block
+        """
+        record = FileMetrics(filename, subject)
+        with self._lock:
+            self._files.pop(filename, None)
+            self._files[filename] = record
+            while len(self._files) > self.MAX_FILES:
+                self._files.popitem(last=False)
+        
+        token = _current.set((self, record))
+        try:
+            yield record
+        finally:
+            _current.reset(token)
+    
+    def observe(self, stage: str, seconds: float, record: FileMetrics) -> None:
+        """Record the duration of one stage of a note."""
+        with self._lock:
+            key = (stage, record.subject)
+            if key not in self._histograms:
+                self._histograms[key] = Histogram()
+            self._histograms[key].observe(seconds)
+            record.stages[stage] = record.stages.get(stage, 0.0) + seconds
+    
+    def count(self, name: str, value: int, record: FileMetrics) -> None:
+        """Add to a counter for a note."""
+        with self._lock:
+            key = (name, record.subject)
+            self._counters[key] = self._counters.get(key, 0) + value
+            record.counters[name] = record.counters.get(name, 0) + value
+    
+    def finish(self, record: FileMetrics, success: bool) -> None:
+        """Record the outcome of a note once all of its stages are done."""
+        record.success = success
+        self.count("files_succeeded" if success else "files_failed", 1, record)
+    
+    def tokens_used(self, filename: str) -> Optional[int]:
+        """Return the API tokens reported for a note, or None if it is not tracked."""
+        with self._lock:
+            record = self._files.get(filename)
+            if record is None:
+                return None
+            return record.counters.get("prompt_tokens", 0) + record.counters.get("completion_tokens", 0)
+    
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        """Set a point-in-time value such as a queue depth, optionally per label."""
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = value
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Build the JSON summary.
+        
+        Returns:
+            Totals, per-subject breakdown and per-file records
+        """
+        with self._lock:
+            subjects: Dict[str, Dict[str, Any]] = {}
+            totals: Dict[str, Histogram] = {}
+            for (stage, subject), histogram in self._histograms.items():
+                subjects.setdefault(subject, {"stages": {}, "counters": {}})["stages"][stage] = histogram.to_dict()
+                totals.setdefault(stage, Histogram()).merge(histogram)
+            
+            counters: Dict[str, int] = {}
+            for (name, subject), value in self._counters.items():
+                subjects.setdefault(subject, {"stages": {}, "counters": {}})["counters"][name] = value
+                counters[name] = counters.get(name, 0) + value
+            
+            # Labelled gauges become {label values: value}
+            gauges: Dict[str, Any] = {}
+            for (gauge, gauge_labels), reading in sorted(self._gauges.items()):
+                if gauge_labels:
+                    gauges.setdefault(gauge, {})[",".join(v for _, v in gauge_labels)] = reading
+                else:
+                    gauges[gauge] = reading
+            
+            return {
+                "started": _timestamp(self.started),
+                "updated": _timestamp(time.time()),
+                "totals": {
+                    "stages": {stage: totals[stage].to_dict() for stage in STAGES if stage in totals},
+                    "counters": counters,
+                    "gauges": gauges,
+                },
+                "subjects": subjects,
+                "files": [asdict(record) for record in self._files.values()],
+            }
+    
+    def prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            lines.append("# HELP notepal_stage_duration_seconds Time spent in each pipeline stage")
+            lines.append("# TYPE notepal_stage_duration_seconds histogram")
+            for (stage, subject), histogram in sorted(self._histograms.items()):
+                labels = f'stage="{stage}",subject="{_escape(subject)}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.buckets):
+                    cumulative += count
+                    lines.append(f'notepal_stage_duration_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+                lines.append(f'notepal_stage_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"notepal_stage_duration_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+                lines.append(f"notepal_stage_duration_seconds_count{{{labels}}} {histogram.count}")
+            
+            for name, help_text in COUNTERS.items():
+                values = sorted((subject, value) for (counter, subject), value in self._counters.items() if counter == name)
+                if not values:
+                    continue
+                lines.append(f"# HELP notepal_{name}_total {help_text}")
+                lines.append(f"# TYPE notepal_{name}_total counter")
+                for subject, value in values:
+                    lines.append(f'notepal_{name}_total{{subject="{_escape(subject)}"}} {value}')
+            
+            previous = None
+            for (gauge, gauge_labels), reading in sorted(self._gauges.items()):
+                if gauge != previous:
+                    lines.append(f"# TYPE notepal_{gauge} gauge")
+                    previous = gauge
+                label_text = ",".join(f'{key}="{_escape(v)}"' for key, v in gauge_labels)
+                lines.append(f"notepal_{gauge}{{{label_text}}} {reading:g}" if gauge_labels else f"notepal_{gauge} {reading:g}")
+        return "\n".join(lines) + "\n"
+    
+    def export(self, directory: Path) -> None:
+        """
+        Write the Prometheus textfile and the JSON summary.
+        
+        Both files are replaced atomically, so a collector polling the
+        directory never reads a partial file.
+        
+        Args:
+            directory: Directory for ``notepal.prom`` and ``notepal_metrics.json``
+        """
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            _write_atomic(directory / PROMETHEUS_FILE, self.prometheus())
+            _write_atomic(directory / JSON_FILE, json.dumps(self.summary(), indent=2))
+            logger.debug(f"Exported metrics to {directory}")
+        except OSError as e:
+            logger.warning(f"Could not export metrics to {directory}: {e}")
+
+
+def count(name: str, value: int = 1) -> None:
+    """Add to a counter for the note being processed, if any."""
+    current = _current.get()
+    if current is not None:
+        current[0].count(name, value, current[1])
+
+
+def observe(stage: str, seconds: float) -> None:
+    """Record a stage duration for the note being processed, if any."""
+    current = _current.get()
+    if current is not None:
+        current[0].observe(stage, seconds, current[1])
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Time a block as one stage of the note being processed."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def in_current_context(func: Callable[..., R]) -> Callable[..., R]:
+    """
+    Wrap ``func`` to run with the caller's note attribution on any thread.
+    
+    Worker threads start with an empty context; each call gets its own
+    copy of the context captured here.
+    """
+    context = contextvars.copy_context()
+    
+    def run(*args: Any, **kwargs: Any) -> R:
+        return context.copy().run(func, *args, **kwargs)
+    return run
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat(timespec="seconds")
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
@@ -1,17 +1,28 @@
 """OpenAI API client for Study Assistant."""
 
-from typing import Optional
-
-from openai import OpenAI, OpenAIError
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional
 
+from . import metrics
+from .adaptive import is_retryable
+from .backends import Endpoint, EndpointPool
+from .cache import DiskCache
+from .chunker import NoteChunker
 from .config import AppConfig
+from .rate_limiter import RateLimiter
 from .utils.logger import setup_logger
+from .utils.tokens import estimate_tokens
 
 logger = setup_logger(__name__)
 
 
-class StudyAssistantClient:
-    """Client for interacting with OpenAI API."""
+class BaseStudyAssistantClient:
+    """Prompt construction and response handling shared by the sync and async clients."""
     
     SYSTEM_PROMPT = """You are an expert study assistant. Your task is to help students 
 learn by processing their notes and creating study materials.
@@ -41,17 +52,43 @@ Always structure your output in clear Markdown sections with the following forma
 
 Be precise, educational, and focus on understanding core concepts."""
     
-    def __init__(self, api_key: str, model: str = "gpt-4-turbo-preview"):
+    CHUNK_SYSTEM_PROMPT = """You are an expert study assistant. You will receive one part of a 
+longer set of lecture notes. Extract the material needed to study this part:
+the main concepts, important facts and definitions, and a few candidate study
+questions and flashcards. Be concise and use Markdown bullet points. Do not
+write an introduction or conclusion; your notes will be merged with the notes
+for the other parts."""
+    
+    MAX_TOKENS = 2000
+    CHUNK_MAX_TOKENS = 800
+    TEMPERATURE = 0.7
+    
+    endpoints: EndpointPool
+    
+    def __init__(
+        self,
+        model: str,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[DiskCache] = None,
+        chunk_token_budget: int = 0,
+        chunk_workers: int = 4
+    ):
         """
-        Initialize OpenAI client.
+        Initialize settings shared by the sync and async clients.
         
         Args:
-            api_key: OpenAI API key
             model: Model to use
+            rate_limiter: Limiter shared by every request from this client
+            cache: Response cache consulted before calling the API
+            chunk_token_budget: Notes estimated above this many tokens are
+                summarized in chunks and merged (0 disables chunking)
+            chunk_workers: Chunks of one note summarized concurrently
         """
         self.model = model
-        self.client = OpenAI(api_key=api_key)
-        logger.debug(f"Initialized OpenAI client with model: {model}")
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.chunker = NoteChunker(chunk_token_budget) if chunk_token_budget else None
+        self.chunk_workers = max(1, chunk_workers)
     
     def build_prompt(self, note_content: str) -> str:
         """
@@ -71,55 +108,764 @@ Be precise, educational, and focus on understanding core concepts."""
 
 Create the output following the structure I specified in the system prompt."""
     
+    def build_chunk_prompt(self, chunk: str, part: int, total: Optional[int] = None) -> str:
+        """
+        Build the prompt for one part of a chunked note.
+        
+        Args:
+            chunk: Text of this part
+            part: 1-based part number
+            total: Number of parts, if known before the note is fully parsed
+        
+        Returns:
+            Formatted prompt for the AI
+        """
+        of_total = f" of {total}" if total else ""
+        return f"""These are part {part}{of_total} of a set of lecture notes:
+
+---
+{chunk}
+---
+
+Extract the study notes for this part."""
+    
+    def build_reduce_prompt(self, partials: List[str]) -> str:
+        """
+        Build the prompt that merges per-chunk study notes.
+        
+        Args:
+            partials: Study notes for each part, in document order
+        
+        Returns:
+            Formatted prompt for the AI
+        """
+        parts = "\n\n".join(
+            f"## Part {i}\n{partial}" for i, partial in enumerate(partials, start=1)
+        )
+        return f"""These are study notes extracted from consecutive parts of one long set 
+of lecture notes. Treat them as the lecture notes and create comprehensive study 
+materials that cover the whole lecture:
+
+---
+{parts}
+---
+
+Create the output following the structure I specified in the system prompt."""
+    
+    def build_messages(self, prompt: str, system_prompt: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for one request.
+        
+        Args:
+            prompt: User prompt from ``build_prompt``
+            system_prompt: System prompt (defaults to ``SYSTEM_PROMPT``)
+        
+        Returns:
+            System and user messages
+        """
+        return [
+            {"role": "system", "content": system_prompt or self.SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def estimate_request_tokens(self, messages: List[Dict[str, str]], max_tokens: int) -> int:
+        """
+        Estimate the worst-case token cost of one request.
+        
+        Args:
+            messages: Messages that will be sent
+            max_tokens: Completion allowance
+        
+        Returns:
+            Prompt tokens plus the completion allowance
+        """
+        return sum(estimate_tokens(m["content"]) for m in messages) + max_tokens
+    
+    def estimate_note_tokens(self, text_tokens: int) -> int:
+        """
+        Estimate the API tokens processing a note will use, before reading it.
+        
+        Counts prompts and full completion allowances, including the chunk
+        requests and the merge request of a note over the chunk budget.
+        
+        Args:
+            text_tokens: Estimated tokens of note text
+        
+        Returns:
+            Worst-case prompt plus completion tokens
+        """
+        system_tokens = estimate_tokens(self.SYSTEM_PROMPT)
+        if self.chunker is None or text_tokens <= self.chunker.max_tokens:
+            return system_tokens + text_tokens + self.MAX_TOKENS
+        
+        chunks = math.ceil(text_tokens / self.chunker.max_tokens)
+        chunk_tokens = chunks * (estimate_tokens(self.CHUNK_SYSTEM_PROMPT) + self.CHUNK_MAX_TOKENS)
+        # The merge request reads every chunk's notes back
+        merge_tokens = system_tokens + chunks * self.CHUNK_MAX_TOKENS + self.MAX_TOKENS
+        return text_tokens + chunk_tokens + merge_tokens
+    
+    def model_for(self, endpoint: Endpoint) -> str:
+        """Return the model requests to ``endpoint`` are sent to."""
+        return endpoint.model or self.model
+    
+    def cache_key(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        model: Optional[str] = None
+    ) -> str:
+        """
+        Build a content-addressed cache key for one request.
+        
+        Args:
+            messages: Messages that will be sent (system prompt and note)
+            max_tokens: Completion allowance
+            model: Model the request is sent to (defaults to the client's)
+        
+        Returns:
+            Hex digest over everything that affects the completion
+        """
+        payload = json.dumps(
+            [messages, model or self.model, self.TEMPERATURE, max_tokens],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _cache_keys(self, messages: List[Dict[str, str]], max_tokens: int) -> Dict[str, str]:
+        """Map every model the endpoint pool may send a request to onto its cache key."""
+        models = dict.fromkeys(self.model_for(endpoint) for endpoint in self.endpoints.endpoints)
+        return {model: self.cache_key(messages, max_tokens, model) for model in models}
+    
+    def split_note(self, note_content: str) -> List[str]:
+        """Split a note into chunks, or return it whole if chunking is off or unneeded."""
+        if self.chunker is None:
+            return [note_content]
+        return self.chunker.split(note_content)
+    
+    def _chunk_messages(self, chunks: List[str]) -> List[List[Dict[str, str]]]:
+        """Build the map-stage messages for each chunk."""
+        return [
+            self._chunk_message(chunk, part, len(chunks))
+            for part, chunk in enumerate(chunks, start=1)
+        ]
+    
+    def _chunk_message(self, chunk: str, part: int, total: Optional[int]) -> List[Dict[str, str]]:
+        """Build the map-stage messages for one chunk."""
+        return self.build_messages(self.build_chunk_prompt(chunk, part, total), self.CHUNK_SYSTEM_PROMPT)
+    
+    def _cached_response(self, keys: Dict[str, str]) -> Optional[str]:
+        """
+        Return a cached completion if the cache is enabled.
+        
+        Args:
+            keys: Cache key for each model the request may be sent to; a
+                completion cached for any of them is used
+        """
+        if self.cache is None:
+            return None
+        
+        for key in keys.values():
+            value = self.cache.get(key)
+            if value is not None:
+                metrics.count("response_cache_hits")
+                logger.info("Using cached study material (no API call)")
+                return value.decode("utf-8")
+        
+        metrics.count("response_cache_misses")
+        return None
+    
+    def _store_response(self, key: str, content: str) -> None:
+        """Store a completion in the cache if the cache is enabled."""
+        if self.cache is not None:
+            self.cache.set(key, content.encode("utf-8"))
+    
+    def _extract_content(self, response: Any) -> Optional[str]:
+        """Return the completion text, logging usage or an empty response."""
+        content = response.choices[0].message.content
+        
+        if content:
+            self._log_usage(content, response.usage)
+            return content
+        
+        logger.warning("Received empty response from OpenAI")
+        return None
+    
+    def _log_usage(self, content: str, usage: Any) -> None:
+        """Log the size of a completion and the tokens it used."""
+        total_tokens = usage.total_tokens if usage else "unknown"
+        logger.info(
+            f"Generated {len(content)} characters of study material "
+            f"(tokens used: {total_tokens})"
+        )
+        if usage:
+            metrics.count("prompt_tokens", usage.prompt_tokens)
+            metrics.count("completion_tokens", usage.completion_tokens)
+    
+    @staticmethod
+    def _record_error(error: Exception, attempt: int, max_retries: int) -> bool:
+        """
+        Count a failed request as rate limited and/or retried.
+        
+        Returns:
+            True if the request should be retried
+        """
+        if getattr(error, "status_code", None) == 429:
+            metrics.count("rate_limited")
+        if not is_retryable(error):
+            logger.error("Request cannot succeed as sent, giving up")
+            return False
+        if attempt < max_retries - 1:
+            metrics.count("retries")
+            return True
+        logger.error("Max retries reached, giving up")
+        return False
+    
+    @staticmethod
+    def _stream_delta(event: Any) -> str:
+        """Return the text carried by one streamed completion event."""
+        if event.choices and event.choices[0].delta.content:
+            return event.choices[0].delta.content
+        return ""
+
+
+class StudyAssistantClient(BaseStudyAssistantClient):
+    """Client for interacting with OpenAI API."""
+    
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4-turbo-preview",
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[DiskCache] = None,
+        chunk_token_budget: int = 0,
+        chunk_workers: int = 4,
+        base_url: Optional[str] = None,
+        endpoints: Optional[EndpointPool] = None
+    ):
+        """
+        Initialize OpenAI client.
+        
+        Args:
+            api_key: OpenAI API key
+            model: Model to use
+            rate_limiter: Limiter shared by every request from this client
+            cache: Response cache consulted before calling the API
+            chunk_token_budget: Notes estimated above this many tokens are
+                summarized in chunks and merged (0 disables chunking)
+            chunk_workers: Chunks of one note summarized concurrently
+            base_url: API endpoint (defaults to OpenAI)
+            endpoints: Endpoints to route requests across (defaults to one
+                endpoint from ``api_key`` and ``base_url``)
+        """
+        super().__init__(model, rate_limiter, cache, chunk_token_budget, chunk_workers)
+        self.endpoints = endpoints or EndpointPool.single(api_key, base_url)
+        # Requests outside the pool (the Batch API) go to the first endpoint
+        self.client = self.endpoints.primary.client
+        logger.debug(f"Initialized OpenAI client with model: {model}")
+    
     def generate_study_material(
         self,
         note_content: str,
-        max_retries: int = 3
+        max_retries: int = 5
     ) -> Optional[str]:
         """
         Generate study material from note content.
         
+        Notes over the chunk budget are split; each chunk is summarized in
+        parallel and a final request merges the parts into the usual
+        Summary / Key Points / Study Questions / Flashcards structure.
+        
         Args:
             note_content: Raw note text
-            max_retries: Maximum number of retry attempts
+            max_retries: Maximum number of retry attempts per request
         
         Returns:
             Generated study material in Markdown format, or None on failure
         """
-        prompt = self.build_prompt(note_content)
+        messages = self._final_messages(note_content, max_retries)
+        if messages is None:
+            return None
+        return self._complete(messages, self.MAX_TOKENS, max_retries)
+    
+    def generate_study_material_from_pages(
+        self,
+        pages: Iterable[str],
+        separator: str,
+        max_retries: int = 5
+    ) -> Optional[str]:
+        """
+        Generate study material for a note that is still being parsed.
+        
+        Pages are packed into chunks as they arrive and each chunk is sent
+        as soon as it is full, so extracting later pages overlaps the
+        requests for earlier ones. A note that fits in one chunk is sent
+        whole, as ``generate_study_material`` would send it.
+        
+        Args:
+            pages: Page texts in document order (see ``DocumentParser.iter_pages``)
+            separator: Joins the pages into the note text
+            max_retries: Maximum number of retry attempts per request
+        
+        Returns:
+            Generated study material in Markdown format, or None on failure
+        """
+        if self.chunker is None:
+            return self.generate_study_material(separator.join(pages), max_retries)
+        
+        # Pages are kept only until the note turns out to need chunking
+        head: Optional[List[str]] = []
+        
+        def read_pages() -> Iterator[str]:
+            for page in pages:
+                if head is not None:
+                    head.append(page)
+                yield page
+        
+        chunks = self.chunker.iter_chunks(read_pages())
+        first = next(chunks, "")
+        second = next(chunks, None)
+        if second is None:
+            return self.generate_study_material(separator.join(head or []), max_retries)
+        head = None
+        
+        messages = self._merge_messages(itertools.chain([first, second], chunks), None, max_retries)
+        if messages is None:
+            return None
+        return self._complete(messages, self.MAX_TOKENS, max_retries)
+    
+    def stream_study_material(
+        self,
+        note_content: str,
+        max_retries: int = 5
+    ) -> Iterator[str]:
+        """
+        Generate study material, yielding Markdown as it is produced.
+        
+        Chunked notes run their map stage first; only the final merge is
+        streamed. A failure before any text is produced ends the stream
+        empty; a failure after that raises, since the output is partial.
+        
+        Args:
+            note_content: Raw note text
+            max_retries: Maximum number of retry attempts per request
+        
+        Yields:
+            Pieces of the study material in order
+        """
+        messages = self._final_messages(note_content, max_retries)
+        if messages is not None:
+            yield from self._stream(messages, self.MAX_TOKENS, max_retries)
+    
+    def _final_messages(
+        self,
+        note_content: str,
+        max_retries: int
+    ) -> Optional[List[Dict[str, str]]]:
+        """
+        Build the messages for the request that produces the study material.
+        
+        For a chunked note this first summarizes every chunk in parallel.
+        
+        Returns:
+            Messages for the final request, or None if a chunk failed
+        """
+        chunks = self.split_note(note_content)
+        if len(chunks) == 1:
+            return self.build_messages(self.build_prompt(note_content))
+        return self._merge_messages(chunks, len(chunks), max_retries)
+    
+    def _merge_messages(
+        self,
+        chunks: Iterable[str],
+        total: Optional[int],
+        max_retries: int
+    ) -> Optional[List[Dict[str, str]]]:
+        """
+        Summarize chunks in parallel and build the request that merges them.
+        
+        Each chunk is sent as soon as ``chunks`` yields it.
+        
+        Args:
+            chunks: Chunk texts in document order
+            total: Number of chunks, if known up front
+            max_retries: Maximum number of retry attempts per request
+        
+        Returns:
+            Messages for the final request, or None if a chunk failed
+        """
+        # Chunk requests count towards the note being processed
+        complete = metrics.in_current_context(
+            lambda messages: self._complete(messages, self.CHUNK_MAX_TOKENS, max_retries)
+        )
+        with ThreadPoolExecutor(
+            max_workers=min(self.chunk_workers, total or self.chunk_workers),
+            thread_name_prefix="chunk-worker"
+        ) as executor:
+            futures = [
+                executor.submit(complete, self._chunk_message(chunk, part, total))
+                for part, chunk in enumerate(chunks, start=1)
+            ]
+            partials = [future.result() for future in futures]
+        
+        completed = [partial for partial in partials if partial]
+        if len(completed) < len(partials):
+            logger.error("Failed to generate study notes for every chunk")
+            return None
+        
+        return self.build_messages(self.build_reduce_prompt(completed))
+    
+    def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        max_retries: int
+    ) -> Optional[str]:
+        """
+        Run one chat completion through the cache, rate limiter and retries.
+        
+        Args:
+            messages: Messages to send
+            max_tokens: Completion allowance
+            max_retries: Maximum number of retry attempts
+        
+        Returns:
+            Completion text, or None on failure
+        """
+        keys = self._cache_keys(messages, max_tokens)
+        cached = self._cached_response(keys)
+        if cached is not None:
+            return cached
+        
+        from openai import OpenAIError
+        
+        request_tokens = self.estimate_request_tokens(messages, max_tokens)
         
         for attempt in range(max_retries):
             try:
-                logger.debug(f"Calling OpenAI API (attempt {attempt + 1}/{max_retries})")
-                
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": self.SYSTEM_PROMPT},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=2000,
-                    temperature=0.7
-                )
+                with self.endpoints.request(request_tokens, self.rate_limiter) as endpoint:
+                    logger.debug(f"Calling {endpoint.name} (attempt {attempt + 1}/{max_retries})")
+                    
+                    response = endpoint.client.chat.completions.create(
+                        model=self.model_for(endpoint),
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=self.TEMPERATURE
+                    )
                 
-                content = response.choices[0].message.content
+                content = self._extract_content(response)
+                if content:
+                    self._store_response(keys[self.model_for(endpoint)], content)
+                    return content
+                    
+            except OpenAIError as e:
+                logger.error(f"OpenAI API error (attempt {attempt + 1}): {e}")
+                if not self._record_error(e, attempt, max_retries):
+                    return None
+            except Exception as e:
+                logger.error(f"Unexpected error: {e}")
+                return None
+        
+        return None
+
+    
+    def _stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        max_retries: int
+    ) -> Iterator[str]:
+        """
+        Stream one chat completion through the cache, rate limiter and retries.
+        
+        Args:
+            messages: Messages to send
+            max_tokens: Completion allowance
+            max_retries: Maximum number of retry attempts
+        
+        Yields:
+            Completion text as it arrives
+        """
+        keys = self._cache_keys(messages, max_tokens)
+        cached = self._cached_response(keys)
+        if cached is not None:
+            yield cached
+            return
+        
+        from openai import OpenAIError
+        
+        request_tokens = self.estimate_request_tokens(messages, max_tokens)
+        
+        for attempt in range(max_retries):
+            parts: List[str] = []
+            usage = None
+            try:
+                with self.endpoints.request(request_tokens, self.rate_limiter) as endpoint:
+                    logger.debug(f"Streaming from {endpoint.name} (attempt {attempt + 1}/{max_retries})")
+                    
+                    stream = endpoint.client.chat.completions.create(
+                        model=self.model_for(endpoint),
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=self.TEMPERATURE,
+                        stream=True,
+                        stream_options={"include_usage": True}
+                    )
+                    
+                    for event in stream:
+                        delta = self._stream_delta(event)
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+                        usage = event.usage or usage
                 
+                content = "".join(parts)
                 if content:
-                    logger.info(
-                        f"Generated {len(content)} characters of study material "
-                        f"(tokens used: {response.usage.total_tokens})"
+                    self._log_usage(content, usage)
+                    self._store_response(keys[self.model_for(endpoint)], content)
+                    return
+                logger.warning("Received empty response from OpenAI")
+                    
+            except OpenAIError as e:
+                if parts:
+                    # Text already reached the caller; a retry would duplicate it
+                    raise
+                logger.error(f"OpenAI API error (attempt {attempt + 1}): {e}")
+                if not self._record_error(e, attempt, max_retries):
+                    return
+            except Exception as e:
+                if parts:
+                    raise
+                logger.error(f"Unexpected error: {e}")
+                return
+
+
+class AsyncStudyAssistantClient(BaseStudyAssistantClient):
+    """Asyncio client for interacting with OpenAI API."""
+    
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4-turbo-preview",
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[DiskCache] = None,
+        chunk_token_budget: int = 0,
+        chunk_workers: int = 4,
+        base_url: Optional[str] = None,
+        endpoints: Optional[EndpointPool] = None
+    ):
+        """
+        Initialize async OpenAI client.
+        
+        Args:
+            api_key: OpenAI API key
+            model: Model to use
+            rate_limiter: Limiter shared by every request from this client
+            cache: Response cache consulted before calling the API
+            chunk_token_budget: Notes estimated above this many tokens are
+                summarized in chunks and merged (0 disables chunking)
+            chunk_workers: Chunks of one note summarized concurrently
+            base_url: API endpoint (defaults to OpenAI)
+            endpoints: Endpoints to route requests across (defaults to one
+                endpoint from ``api_key`` and ``base_url``)
+        """
+        super().__init__(model, rate_limiter, cache, chunk_token_budget, chunk_workers)
+        self.endpoints = endpoints or EndpointPool.single(api_key, base_url)
+        self.client = self.endpoints.primary.async_client
+        logger.debug(f"Initialized async OpenAI client with model: {model}")
+    
+    async def generate_study_material(
+        self,
+        note_content: str,
+        max_retries: int = 5
+    ) -> Optional[str]:
+        """
+        Generate study material from note content.
+        
+        Args:
+            note_content: Raw note text
+            max_retries: Maximum number of retry attempts per request
+        
+        Returns:
+            Generated study material in Markdown format, or None on failure
+        """
+        messages = await self._final_messages(note_content, max_retries)
+        if messages is None:
+            return None
+        return await self._complete(messages, self.MAX_TOKENS, max_retries)
+    
+    async def stream_study_material(
+        self,
+        note_content: str,
+        max_retries: int = 5
+    ) -> AsyncIterator[str]:
+        """
+        Generate study material, yielding Markdown as it is produced.
+        
+        Args:
+            note_content: Raw note text
+            max_retries: Maximum number of retry attempts per request
+        
+        Yields:
+            Pieces of the study material in order
+        """
+        messages = await self._final_messages(note_content, max_retries)
+        if messages is not None:
+            async for delta in self._stream(messages, self.MAX_TOKENS, max_retries):
+                yield delta
+    
+    async def _final_messages(
+        self,
+        note_content: str,
+        max_retries: int
+    ) -> Optional[List[Dict[str, str]]]:
+        """
+        Build the messages for the request that produces the study material.
+        
+        For a chunked note this first summarizes every chunk concurrently.
+        
+        Returns:
+            Messages for the final request, or None if a chunk failed
+        """
+        chunks = self.split_note(note_content)
+        if len(chunks) == 1:
+            return self.build_messages(self.build_prompt(note_content))
+        
+        semaphore = asyncio.Semaphore(self.chunk_workers)
+        
+        async def complete_chunk(messages: List[Dict[str, str]]) -> Optional[str]:
+            async with semaphore:
+                return await self._complete(messages, self.CHUNK_MAX_TOKENS, max_retries)
+        
+        partials = await asyncio.gather(
+            *(complete_chunk(messages) for messages in self._chunk_messages(chunks))
+        )
+        
+        completed = [partial for partial in partials if partial]
+        if len(completed) < len(partials):
+            logger.error("Failed to generate study notes for every chunk")
+            return None
+        
+        return self.build_messages(self.build_reduce_prompt(completed))
+    
+    async def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        max_retries: int
+    ) -> Optional[str]:
+        """
+        Run one chat completion through the cache, rate limiter and retries.
+        
+        Args:
+            messages: Messages to send
+            max_tokens: Completion allowance
+            max_retries: Maximum number of retry attempts
+        
+        Returns:
+            Completion text, or None on failure
+        """
+        keys = self._cache_keys(messages, max_tokens)
+        cached = self._cached_response(keys)
+        if cached is not None:
+            return cached
+        
+        from openai import OpenAIError
+        
+        request_tokens = self.estimate_request_tokens(messages, max_tokens)
+        
+        for attempt in range(max_retries):
+            try:
+                async with self.endpoints.request_async(request_tokens, self.rate_limiter) as endpoint:
+                    logger.debug(f"Calling {endpoint.name} (attempt {attempt + 1}/{max_retries})")
+                    
+                    response = await endpoint.async_client.chat.completions.create(
+                        model=self.model_for(endpoint),
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=self.TEMPERATURE
                     )
+                
+                content = self._extract_content(response)
+                if content:
+                    self._store_response(keys[self.model_for(endpoint)], content)
                     return content
-                else:
-                    logger.warning("Received empty response from OpenAI")
                     
             except OpenAIError as e:
                 logger.error(f"OpenAI API error (attempt {attempt + 1}): {e}")
-                if attempt == max_retries - 1:
-                    logger.error("Max retries reached, giving up")
+                if not self._record_error(e, attempt, max_retries):
                     return None
             except Exception as e:
                 logger.error(f"Unexpected error: {e}")
                 return None
         
         return None
+    
+    async def _stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        max_retries: int
+    ) -> AsyncIterator[str]:
+        """
+        Stream one chat completion through the cache, rate limiter and retries.
+        
+        Args:
+            messages: Messages to send
+            max_tokens: Completion allowance
+            max_retries: Maximum number of retry attempts
+        
+        Yields:
+            Completion text as it arrives
+        """
+        keys = self._cache_keys(messages, max_tokens)
+        cached = self._cached_response(keys)
+        if cached is not None:
+            yield cached
+            return
+        
+        from openai import OpenAIError
+        
+        request_tokens = self.estimate_request_tokens(messages, max_tokens)
+        
+        for attempt in range(max_retries):
+            parts: List[str] = []
+            usage = None
+            try:
+                async with self.endpoints.request_async(request_tokens, self.rate_limiter) as endpoint:
+                    logger.debug(f"Streaming from {endpoint.name} (attempt {attempt + 1}/{max_retries})")
+                    
+                    stream = await endpoint.async_client.chat.completions.create(
+                        model=self.model_for(endpoint),
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=self.TEMPERATURE,
+                        stream=True,
+                        stream_options={"include_usage": True}
+                    )
+                    
+                    async for event in stream:
+                        delta = self._stream_delta(event)
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+                        usage = event.usage or usage
+                
+                content = "".join(parts)
+                if content:
+                    self._log_usage(content, usage)
+                    self._store_response(keys[self.model_for(endpoint)], content)
+                    return
+                logger.warning("Received empty response from OpenAI")
+                    
+            except OpenAIError as e:
+                if parts:
+                    # Text already reached the caller; a retry would duplicate it
+                    raise
+                logger.error(f"OpenAI API error (attempt {attempt + 1}): {e}")
+                if not self._record_error(e, attempt, max_retries):
+                    return
+            except Exception as e:
+                if parts:
+                    raise
+                logger.error(f"Unexpected error: {e}")
+                return
@@ -1,10 +1,11 @@
 """PDF generation from Markdown study materials."""
 
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Optional
-import markdown
-from weasyprint import HTML, CSS
-from weasyprint.text.fonts import FontConfiguration
 
 from .utils.logger import setup_logger
 
@@ -143,6 +144,9 @@ class PDFGenerator:
         """
         Convert Markdown content to styled PDF.
         
+        Builds a renderer for this document alone; ``render_pdf`` reuses a
+        warm one.
+        
         Args:
             markdown_content: Markdown text
             output_path: Where to save PDF
@@ -152,16 +156,25 @@ class PDFGenerator:
             True if successful
         """
         try:
-            logger.info(f"Generating PDF: {output_path.name}")
-            
-            # Convert Markdown to HTML
-            html_content = markdown.markdown(
-                markdown_content,
-                extensions=['extra', 'codehilite', 'tables']
-            )
-            
-            # Wrap in full HTML document
-            full_html = f"""
+            renderer = PDFRenderer()
+        except Exception as e:
+            logger.error(f"Failed to generate PDF: {e}")
+            return False
+        return renderer.render(markdown_content, output_path, title)
+
+
+class PDFRenderer:
+    """
+    Long-lived PDF renderer for batch and watch modes.
+    
+    Fonts, the compiled stylesheet, the Markdown converter and the HTML
+    template are built once and reused, so each document only pays for
+    Markdown conversion and layout.
+    """
+    
+    MARKDOWN_EXTENSIONS = ['extra', 'codehilite', 'tables']
+    
+    HTML_TEMPLATE = """
             <!DOCTYPE html>
             <html>
             <head>
@@ -173,20 +186,74 @@ class PDFGenerator:
                     <h1>📚 {title}</h1>
                     <p style="color: #666;">Generated by NotePal</p>
                 </div>
-                {html_content}
+                {content}
                 <div class="footer">
                     <p>Created with NotePal - AI-Powered Study Assistant</p>
                 </div>
             </body>
             </html>
             """
+    
+    def __init__(self, stylesheet: str = PDFGenerator.PDF_STYLE):
+        """
+        Initialize renderer.
+        
+        Args:
+            stylesheet: CSS applied to every document
+        """
+        import markdown
+        from weasyprint import CSS
+        from weasyprint.text.fonts import FontConfiguration
+        
+        self.font_config = FontConfiguration()
+        self.css = CSS(string=stylesheet, font_config=self.font_config)
+        self.converter = markdown.Markdown(extensions=self.MARKDOWN_EXTENSIONS)
+        # Neither the Markdown converter nor the font configuration is thread-safe
+        self._lock = threading.Lock()
+    
+    def render_html(self, markdown_content: str, title: str) -> str:
+        """
+        Convert Markdown into the full HTML document.
+        
+        Args:
+            markdown_content: Markdown text
+            title: Document title
+        
+        Returns:
+            HTML document
+        """
+        content = self.converter.reset().convert(markdown_content)
+        return self.HTML_TEMPLATE.format(title=title, content=content)
+    
+    def render(
+        self,
+        markdown_content: str,
+        output_path: Path,
+        title: str = "Study Material"
+    ) -> bool:
+        """
+        Convert Markdown content to styled PDF.
+        
+        Args:
+            markdown_content: Markdown text
+            output_path: Where to save PDF
+            title: Document title
+        
+        Returns:
+            True if successful
+        """
+        try:
+            from weasyprint import HTML
             
-            # Generate PDF with styling
-            font_config = FontConfiguration()
-            html = HTML(string=full_html)
-            css = CSS(string=PDFGenerator.PDF_STYLE, font_config=font_config)
+            logger.info(f"Generating PDF: {output_path.name}")
             
-            html.write_pdf(output_path, stylesheets=[css], font_config=font_config)
+            with self._lock:
+                html = HTML(string=self.render_html(markdown_content, title))
+                html.write_pdf(
+                    output_path,
+                    stylesheets=[self.css],
+                    font_config=self.font_config
+                )
             
             logger.info(f"PDF generated successfully: {output_path}")
             return True
@@ -194,3 +261,154 @@ class PDFGenerator:
         except Exception as e:
             logger.error(f"Failed to generate PDF: {e}")
             return False
+
+
+# One warm renderer per process, created on first use
+_renderer: Optional[PDFRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer() -> PDFRenderer:
+    """Return this process's shared PDFRenderer."""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = PDFRenderer()
+        return _renderer
+
+
+def render_pdf(markdown_content: str, output_path: Path, title: str) -> bool:
+    """Render a PDF with the process-wide renderer (render pool entry point)."""
+    try:
+        renderer = get_renderer()
+    except Exception as e:
+        # WeasyPrint or its system libraries are missing
+        logger.error(f"Failed to generate PDF: {e}")
+        return False
+    return renderer.render(markdown_content, output_path, title)
+
+
+class PDFRenderPool:
+    """
+    Render PDFs on a process pool as a separate pipeline stage.
+    
+    ``submit`` returns immediately while fewer than ``max_pending`` renders
+    are queued, so the caller can start on the next note; once the queue is
+    full it blocks until a render finishes.
+    """
+    
+    # Times a render is sent to a fresh pool after a worker process died
+    MAX_RESUBMITS = 1
+    
+    def __init__(self, workers: int, max_pending: int):
+        """
+        Initialize render pool.
+        
+        Args:
+            workers: Number of render processes (0 renders inline)
+            max_pending: Renders queued or running before ``submit`` blocks
+        """
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def submit(self, markdown_content: str, output_path: Path, title: str) -> "Future[bool]":
+        """
+        Queue a PDF render.
+        
+        Args:
+            markdown_content: Markdown text
+            output_path: Where to save PDF
+            title: Document title
+        
+        Returns:
+            Future resolving to True if the PDF was written; a render whose
+            worker crashed is retried on a fresh pool, then resolves to
+            False rather than raising
+        """
+        result: "Future[bool]" = Future()
+        
+        if self.workers <= 0:
+            result.set_result(render_pdf(markdown_content, output_path, title))
+            return result
+        
+        self._slots.acquire()
+        self._dispatch(result, markdown_content, output_path, title, self.MAX_RESUBMITS)
+        return result
+    
+    def _dispatch(
+        self,
+        result: "Future[bool]",
+        markdown_content: str,
+        output_path: Path,
+        title: str,
+        resubmits: int
+    ) -> None:
+        """
+        Send a render to the worker processes; the caller holds a slot.
+        
+        If the pool breaks (a worker died), the render is sent to a fresh
+        pool up to ``resubmits`` more times before it resolves to False.
+        """
+        executor = self._get_executor()
+        try:
+            render = executor.submit(render_pdf, markdown_content, output_path, title)
+        except BrokenProcessPool as e:
+            # Broken before this render was queued; handled like a crash below
+            render = Future()
+            render.set_exception(e)
+        except Exception:
+            self._slots.release()
+            raise
+        
+        def on_done(render: "Future[bool]") -> None:
+            try:
+                success = render.result()
+            except BrokenProcessPool as e:
+                self._discard_executor(executor, e)
+                if resubmits > 0:
+                    logger.warning(f"Resubmitting {output_path.name} to a fresh PDF render pool")
+                    try:
+                        self._dispatch(result, markdown_content, output_path, title, resubmits - 1)
+                    except Exception as error:
+                        logger.error(f"PDF render worker failed for {output_path.name}: {error}")
+                        result.set_result(False)
+                    return
+                logger.error(f"PDF render worker failed for {output_path.name}: {e}")
+                success = False
+            except Exception as e:
+                logger.error(f"PDF render worker failed for {output_path.name}: {e}")
+                success = False
+            self._slots.release()
+            result.set_result(success)
+        
+        render.add_done_callback(on_done)
+    
+    def _discard_executor(self, executor: ProcessPoolExecutor, error: BaseException) -> None:
+        """Forget a broken pool so the next render starts a fresh one."""
+        with self._lock:
+            # Renders failing together with one pool restart it only once
+            if self._executor is executor:
+                self._executor = None
+                logger.error(f"PDF render pool failed, restarting: {error}")
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the worker processes on first use."""
+        with self._lock:
+            if self._executor is None:
+                # Spawn rather than fork: the pool starts while note worker
+                # threads may be holding locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                logger.debug(f"Started PDF render pool with {self.workers} worker(s)")
+            return self._executor
+    
+    def shutdown(self) -> None:
+        """Wait for queued renders and stop the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
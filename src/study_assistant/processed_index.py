@@ -0,0 +1,256 @@
+"""Transactional index of processed notes on SQLite."""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Columns stored per note, in table order after the filename
+ENTRY_FIELDS = ("size", "mtime_ns", "digest", "processed_at")
+
+
+class ProcessedIndex:
+    """
+    Filename -> processed-version index.
+    
+    Every write is an upsert committed in its own short transaction, so
+    the write lock is never held between calls. With WAL mode several
+    processes (CLI runs, the watcher) can share one index file.
+    """
+    
+    def __init__(self, path: Path):
+        """
+        Open (and create if needed) the index database.
+        
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS processed ("
+            " name TEXT PRIMARY KEY,"
+            " size INTEGER,"
+            " mtime_ns INTEGER,"
+            " digest TEXT,"
+            " processed_at TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS processed_digest ON processed(digest)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        # Notes submitted to the OpenAI Batch API and not yet collected
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS batch_items ("
+            " name TEXT PRIMARY KEY,"
+            " batch_id TEXT NOT NULL,"
+            " size INTEGER,"
+            " mtime_ns INTEGER,"
+            " digest TEXT,"
+            " submitted_at TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS batch_items_batch ON batch_items(batch_id)")
+        self._conn.commit()
+    
+    @classmethod
+    def open(cls, index_path: Path) -> "ProcessedIndex":
+        """
+        Open the index for a configured path, migrating a legacy JSON index.
+        
+        A ``.json`` path is stored in a sibling ``.db`` file; the JSON file
+        is imported once and then left untouched.
+        
+        Args:
+            index_path: Configured ``PROCESSED_INDEX_PATH``
+        
+        Returns:
+            Opened index
+        """
+        if index_path.suffix.lower() != ".json":
+            return cls(index_path)
+        
+        index = cls(index_path.with_suffix(".db"))
+        if index_path.exists() and index.get_meta("migrated_from") is None:
+            index.import_json(index_path)
+        return index
+    
+    def import_json(self, json_path: Path) -> int:
+        """
+        Import entries from a legacy JSON index.
+        
+        Args:
+            json_path: Path to ``processed_index.json``
+        
+        Returns:
+            Number of imported entries
+        """
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                legacy: Dict[str, Any] = json.load(f)
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in legacy processed index, not migrating: {e}")
+            return 0
+        
+        rows = []
+        for name, entry in legacy.items():
+            if isinstance(entry, str):
+                # Timestamp-only entries from before content tracking
+                entry = {"processed_at": entry}
+            rows.append((name, *(entry.get(field) for field in ENTRY_FIELDS)))
+        
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO processed VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('migrated_from', ?)",
+                (str(json_path),)
+            )
+            self._conn.commit()
+        
+        logger.info(f"Migrated {len(rows)} entries from {json_path.name} to {self.path.name}")
+        return len(rows)
+    
+    def get_meta(self, key: str) -> Optional[str]:
+        """Return a metadata value, or None if unset."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the entry for a filename.
+        
+        Args:
+            name: Note filename
+        
+        Returns:
+            Entry with size, mtime_ns, digest and processed_at, or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, digest, processed_at FROM processed WHERE name = ?",
+                (name,)
+            ).fetchone()
+        return dict(zip(ENTRY_FIELDS, row)) if row else None
+    
+    def find_by_digest(self, digest: str) -> Optional[str]:
+        """
+        Find a processed note with the given content digest.
+        
+        Args:
+            digest: Content digest
+        
+        Returns:
+            Filename of a matching entry, or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name FROM processed WHERE digest = ? LIMIT 1", (digest,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def set(self, name: str, entry: Dict[str, Any]) -> None:
+        """
+        Insert or update the entry for a filename.
+        
+        Args:
+            name: Note filename
+            entry: Entry fields (see ``ENTRY_FIELDS``)
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO processed VALUES (?, ?, ?, ?, ?)",
+                (name, *(entry.get(field) for field in ENTRY_FIELDS))
+            )
+            self._conn.commit()
+    
+    def commit(self) -> None:
+        """Commit anything left uncommitted (writes already commit themselves)."""
+        with self._lock:
+            self._conn.commit()
+    
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+    
+    def add_batch(self, batch_id: str, entries: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Record the notes submitted in a batch job.
+        
+        Args:
+            batch_id: OpenAI batch id
+            entries: Filename -> entry describing the submitted file version
+        """
+        submitted_at = datetime.now().isoformat()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO batch_items VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (name, batch_id, entry["size"], entry["mtime_ns"], entry["digest"], submitted_at)
+                    for name, entry in entries.items()
+                ]
+            )
+            self._conn.commit()
+    
+    def open_batches(self) -> List[str]:
+        """Return ids of batches with notes still waiting to be collected."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT batch_id FROM batch_items ORDER BY submitted_at"
+            ).fetchall()
+        return [row[0] for row in rows]
+    
+    def batch_entries(self, batch_id: str) -> Dict[str, Dict[str, Any]]:
+        """Return filename -> submitted entry for the notes in a batch."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, size, mtime_ns, digest FROM batch_items WHERE batch_id = ?",
+                (batch_id,)
+            ).fetchall()
+        return {
+            name: {"size": size, "mtime_ns": mtime_ns, "digest": digest}
+            for name, size, mtime_ns, digest in rows
+        }
+    
+    def batched_names(self) -> Set[str]:
+        """Return filenames currently waiting in a batch."""
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT name FROM batch_items")}
+    
+    def remove_batch_item(self, name: str) -> None:
+        """Forget a batched note once it has been collected or has failed."""
+        with self._lock:
+            self._conn.execute("DELETE FROM batch_items WHERE name = ?", (name,))
+            self._conn.commit()
+    
+    def __enter__(self) -> "ProcessedIndex":
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+    
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.get(name) is not None
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM processed").fetchone()[0]
+    
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            names = [row[0] for row in self._conn.execute("SELECT name FROM processed")]
+        return iter(names)
@@ -1,48 +1,145 @@
 """Main processing logic for Study Assistant."""
 
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import AbstractContextManager, nullcontext
 from pathlib import Path
-from typing import Dict
+from typing import Callable, Dict, List, Optional
 
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from . import metrics
+from .backends import EndpointPool
+from .cache import open_response_cache, open_text_cache
 from .config import AppConfig
+from .document_parser import DocumentParser
 from .file_handler import FileHandler
+from .metrics import Metrics
 from .openai_client import StudyAssistantClient
+from .profiler import SamplingProfiler, profile_filename
+from .rate_limiter import RateLimiter
+from .scheduler import TOKENS_PER_PDF_PAGE, CostEstimator, NoteCost, TokenBudget
 from .subject_parser import SubjectParser
 from .utils.logger import setup_logger
-from .pdf_generator import PDFGenerator
+from .pdf_generator import PDFRenderPool
+from .processed_index import ProcessedIndex
 
 logger = setup_logger(__name__)
 console = Console()
 
+# Where generated study material is written, one folder per subject
+OUTPUT_BASE = Path("/Users/adamlisnell/Desktop/NotePal/Generated_study_material")
+
 
 class NoteProcessor:
     """Process notes and generate study materials."""
     
-    def __init__(self, config: AppConfig):
+    def __init__(
+        self,
+        config: AppConfig,
+        on_token: Optional[Callable[[str], None]] = None,
+        profile: bool = False
+    ):
         """
         Initialize note processor.
         
         Args:
             config: Application configuration
+            on_token: Called with each piece of study material as it is
+                streamed (only used when ``config.stream_output`` is set)
+            profile: Sample each stage and write collapsed-stack profiles
+                next to the outputs
         """
         self.config = config
+        self.on_token = on_token
         self.file_handler = FileHandler(
             config.notes_incoming_dir,
-            config.processed_index_path
+            config.processed_index_path,
+            DocumentParser.from_config(config),
+            open_text_cache(config)
         )
         self.ai_client = StudyAssistantClient(
             api_key=config.openai_api_key,
-            model=config.openai_model
+            model=config.openai_model,
+            rate_limiter=RateLimiter(
+                config.max_requests_per_minute,
+                config.max_tokens_per_minute
+            ),
+            cache=open_response_cache(config),
+            chunk_token_budget=config.chunk_token_budget,
+            chunk_workers=config.chunk_workers,
+            base_url=config.openai_base_url,
+            endpoints=EndpointPool.from_config(config)
         )
+        # The profiler only samples this process, so profiled runs render inline
+        pdf_workers = 0 if profile else config.pdf_workers
+        if profile and config.pdf_workers > 0:
+            logger.info("Profiling: rendering PDFs inline instead of in worker processes")
+        self.pdf_pool = PDFRenderPool(pdf_workers, config.pdf_queue_size)
+        self.cost_estimator = CostEstimator(self.file_handler.parser, self.ai_client.estimate_note_tokens)
+        self.metrics = Metrics()
+        # Notes whose PDF failed; their Markdown is saved, so they still count as processed
+        self.pdf_failures: List[str] = []
+        
+        # Only created with profiling on, so stages cost nothing otherwise
+        self.profiler: Optional[SamplingProfiler] = None
+        self.profile_path: Optional[Path] = None
+        if profile:
+            self.profile_path = OUTPUT_BASE / profile_filename()
+            self.profiler = SamplingProfiler()
+            self.profiler.start()
+    
+    def close(self) -> None:
+        """Wait for queued PDF renders and release worker processes."""
+        self.pdf_pool.shutdown()
+        self.file_handler.parser.close()
+        if self.profiler is not None:
+            self.profiler.stop()
+            if self.write_profile():
+                console.print(f"  Profile written to {self.profile_path}")
+    
+    def write_profile(self) -> bool:
+        """
+        Write the merged profile of every note so far, if profiling.
+        
+        Returns:
+            True if a profile was written
+        """
+        if self.profiler is None or self.profile_path is None:
+            return False
+        if not self.profiler.write_merged(self.profile_path):
+            return False
+        logger.debug(f"Wrote profile to {self.profile_path}")
+        return True
+    
+    def export_metrics(self) -> None:
+        """Write the metrics collected so far to ``config.metrics_dir``, if enabled."""
+        if self.config.metrics_enabled:
+            self.ai_client.endpoints.export_gauges(self.metrics)
+            self.metrics.export(self.config.metrics_dir)
     
-    def process_all_notes(self) -> Dict[str, bool]:
+    def process_all_notes(
+        self,
+        workers: Optional[int] = None,
+        token_budget: Optional[int] = None
+    ) -> Dict[str, bool]:
         """
         Process all unprocessed notes in incoming directory.
         
+        Notes are started cheapest first (see ``CostEstimator``), so small
+        notes are never stuck behind a large one.
+        
+        Args:
+            workers: Number of notes to process concurrently
+                (defaults to ``config.max_workers``)
+            token_budget: Stop starting notes once their estimated API
+                tokens would exceed this; the rest stay unprocessed
+        
         Returns:
-            Dictionary mapping filename to success status
+            Dictionary mapping filename to success status, without notes
+            left for a later run by the token budget
         """
         files = self.file_handler.list_incoming_files()
         
@@ -51,9 +148,11 @@ class NoteProcessor:
             return {}
         
         processed_index = self.file_handler.load_processed_index()
-        results: Dict[str, bool] = {}
+        pdf_failures_before = len(self.pdf_failures)
+        workers = max(1, workers or self.config.max_workers)
+        outcomes: Dict[str, bool] = {}
         
-        with Progress(
+        with processed_index, Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             console=console
@@ -64,35 +163,163 @@ class NoteProcessor:
                 total=len(files)
             )
             
+            batched = processed_index.batched_names()
+            pending: List[Path] = []
+            # The version read for each note, recorded once it has been handled
+            versions: Dict[str, os.stat_result] = {}
             for filepath in files:
                 filename = filepath.name
                 
+                # Skip notes waiting in a batch job (see ``collect``)
+                if filename in batched:
+                    logger.info(f"Skipping {filename}, already waiting in a batch")
+                    progress.advance(task)
+                    continue
+                
                 # Skip already processed files
-                if self.file_handler.is_processed(filename, processed_index):
+                versions[filename] = filepath.stat()
+                if self.file_handler.is_processed(filepath, processed_index):
                     logger.info(f"Skipping already processed file: {filename}")
                     progress.advance(task)
                     continue
                 
-                # Process the file
-                success = self._process_single_note(filepath)
-                results[filename] = success
-                
-                # Update index if successful
-                if success:
-                    self.file_handler.mark_processed(filename, processed_index)
-                    self.file_handler.save_processed_index(processed_index)
-                
+                pending.append(filepath)
+            
+            costs = self.cost_estimator.shortest_first(pending)
+            budget = TokenBudget(token_budget) if token_budget else None
+            deferred: List[Path] = []
+            
+            # Generation hands each note's PDF to the render pool and moves
+            # on; a note's result is ready once its PDF stage has finished.
+            note_futures: Dict["Future[bool]", Path] = {}
+            
+            def started(filepath: Path, result: Optional["Future[bool]"]) -> None:
+                if result is None:
+                    deferred.append(filepath)
+                    progress.advance(task)
+                else:
+                    note_futures[result] = filepath
+            
+            if workers > 1 and len(costs) > 1:
+                with ThreadPoolExecutor(
+                    max_workers=min(workers, len(costs)),
+                    thread_name_prefix="note-worker"
+                ) as executor:
+                    # The executor starts notes in submission order
+                    stage_futures = {
+                        executor.submit(self._start_note, cost, budget): cost.filepath
+                        for cost in costs
+                    }
+                    for stage_future in as_completed(stage_futures):
+                        started(stage_futures[stage_future], stage_future.result())
+            else:
+                for cost in costs:
+                    started(cost.filepath, self._start_note(cost, budget))
+            
+            # Results are recorded here, on the calling thread, so the
+            # index is never shared between workers.
+            remaining = len(note_futures)
+            self.metrics.set_gauge("queue_depth", remaining)
+            for future in as_completed(note_futures):
+                filepath = note_futures[future]
+                outcomes[filepath.name] = future.result()
+                self._record_result(
+                    filepath,
+                    outcomes[filepath.name],
+                    processed_index,
+                    versions[filepath.name]
+                )
                 progress.advance(task)
+                remaining -= 1
+                self.metrics.set_gauge("queue_depth", remaining)
+        
+        # Keep results in incoming-file order regardless of completion order
+        results = {filepath.name: outcomes[filepath.name] for filepath in files if filepath.name in outcomes}
         
         # Summary
         successful = sum(1 for v in results.values() if v)
         console.print(f"\n[green]✓[/green] Successfully processed {successful}/{len(results)} file(s)")
+        pdf_failures = self.pdf_failures[pdf_failures_before:]
+        if pdf_failures:
+            console.print(
+                f"[yellow]⚠[/yellow] {len(pdf_failures)} note(s) saved as Markdown only, "
+                f"PDF generation failed: {', '.join(sorted(pdf_failures))}"
+            )
+        if deferred and budget is not None:
+            console.print(
+                f"[yellow]Token budget of {token_budget} reached:[/yellow] "
+                f"{len(deferred)} note(s) left for the next run (~{budget.spent} tokens used)"
+            )
+        
+        cache = self.ai_client.cache
+        if cache is not None and (cache.hits or cache.misses):
+            console.print(f"  Response cache: {cache.hits} hit(s), {cache.misses} miss(es)")
         
+        endpoint_stats = self.ai_client.endpoints.stats()
+        if len(endpoint_stats) > 1 or any(stats["failures"] for stats in endpoint_stats):
+            for stats in endpoint_stats:
+                limit = f", concurrency limit {stats['limit']}" if stats["limit"] is not None else ""
+                console.print(
+                    f"  Endpoint {stats['name']}: {stats['requests']} request(s), "
+                    f"{stats['failures']} failure(s), {stats['latency']:.2f}s avg latency{limit}"
+                )
+        
+        self.export_metrics()
         return results
     
+    def _record_result(
+        self,
+        filepath: Path,
+        success: bool,
+        processed_index: ProcessedIndex,
+        stat: os.stat_result
+    ) -> None:
+        """
+        Update the processed index after a note has been handled.
+        
+        Args:
+            filepath: Path to the note file
+            success: Whether processing succeeded
+            processed_index: Index to update
+            stat: Result of ``filepath.stat()`` taken before the note was
+                read, so an edit made during generation is redone next run
+        """
+        if success:
+            self.file_handler.mark_processed(filepath, processed_index, stat)
+    
+    def _start_note(self, cost: NoteCost, budget: Optional[TokenBudget]) -> Optional["Future[bool]"]:
+        """
+        Start a note unless the run's token budget cannot cover it.
+        
+        Args:
+            cost: The note's cost estimate
+            budget: Token budget for the run, if any
+        
+        Returns:
+            Result future, or None if the note was left for a later run
+        """
+        if budget is None:
+            return self._process_note(cost.filepath)
+        
+        if not budget.reserve(cost.tokens):
+            if cost.tokens > budget.limit:
+                # Later notes are larger still, so this ends the run
+                logger.warning(
+                    f"{cost.filepath.name} is estimated at ~{cost.tokens} tokens, more than "
+                    f"the whole token budget of {budget.limit}"
+                )
+            logger.info(f"Token budget reached, leaving {cost.filepath.name} for the next run")
+            return None
+        
+        result = self._process_note(cost.filepath)
+        result.add_done_callback(
+            lambda _: budget.settle(cost.tokens, self.metrics.tokens_used(cost.filepath.name))
+        )
+        return result
+    
     def _process_single_note(self, filepath: Path) -> bool:
         """
-        Process a single note file.
+        Process a single note file, waiting for its PDF.
         
         Args:
             filepath: Path to the note file
@@ -100,6 +327,48 @@ class NoteProcessor:
         Returns:
             True if processing was successful
         """
+        return self._process_note(filepath).result()
+    
+    def _process_note(self, filepath: Path) -> "Future[bool]":
+        """
+        Generate study material for a note and queue its PDF render.
+        
+        Returns as soon as the Markdown is saved and the PDF is queued.
+        
+        Args:
+            filepath: Path to the note file
+        
+        Returns:
+            Future resolving to True if processing was successful
+        """
+        subject = SubjectParser.extract_subject(filepath.name) or ""
+        with self.metrics.track(filepath.name, subject) as record:
+            result = self._generate_note(filepath)
+        
+        def on_done(result: "Future[bool]") -> None:
+            self.metrics.finish(record, result.result())
+            if self.profiler is not None:
+                self._write_note_profile(filepath.name, subject)
+        
+        result.add_done_callback(on_done)
+        return result
+    
+    def _profile(self, filename: str, stage: str) -> AbstractContextManager:
+        """Sample a stage of a note when profiling, otherwise do nothing."""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.stage(filename, stage)
+    
+    def _write_note_profile(self, filename: str, subject: str) -> None:
+        """Write a note's profile next to its study material."""
+        if self.profiler is None:
+            return
+        profile_name = SubjectParser.generate_output_filename(filename, "_profile")
+        folder = OUTPUT_BASE / subject if subject else OUTPUT_BASE
+        self.profiler.write_note(filename, folder / Path(profile_name).with_suffix(".collapsed"))
+    
+    def _generate_note(self, filepath: Path) -> "Future[bool]":
+        """Run the stages of ``_process_note`` up to queueing the PDF."""
         filename = filepath.name
         logger.info(f"Processing: {filename}")
         
@@ -109,61 +378,176 @@ class NoteProcessor:
             if not subject:
                 logger.error(f"Invalid filename format: {filename}")
                 console.print(f"[red]✗[/red] Invalid filename format: {filename}")
-                return False
-            
-            # Read note content
-            note_content = self.file_handler.read_note_file(filepath)
-            
-            # Generate study material
-            console.print(f"  Generating study material for [cyan]{subject}[/cyan]...")
-            study_material = self.ai_client.generate_study_material(note_content)
-            
-            if not study_material:
-                logger.error(f"Failed to generate study material for {filename}")
-                console.print(f"[red]✗[/red] Failed to generate material for {filename}")
-                return False
+                return self._resolved(False)
             
-            # Save output
-            output_base = Path("/Users/adamlisnell/Desktop/NotePal/Generated_study_material")
-            subject_folder = SubjectParser.get_subject_folder(
-                output_base,
-                subject
-            )
-            output_filename = SubjectParser.generate_output_filename(filename)
-            output_path = subject_folder / output_filename
-            
-            self.file_handler.save_output(output_path, study_material)
-            
-            # Display success message with absolute path if relative path fails
-            try:
-                rel_path = output_path.relative_to(Path.cwd())
-                console.print(f"[green]✓[/green] Markdown saved to {rel_path}")
-            except ValueError:
-                console.print(f"[green]✓[/green] Markdown saved to {output_path}")
+            output_path = self._output_path(filename, subject)
             
-            # Generate PDF version
-            pdf_filename = output_filename.replace('.md', '.pdf')
-            pdf_path = subject_folder / pdf_filename
+            if self._chunks_while_parsing(filepath):
+                console.print(f"  Generating study material for [cyan]{subject}[/cyan]...")
+                # Chunks are sent while later pages are still being
+                # extracted, so parsing is timed as part of the LLM stage
+                with metrics.timed("llm"), self._profile(filename, "llm"):
+                    study_material = self.ai_client.generate_study_material_from_pages(
+                        self.file_handler.iter_note_pages(filepath),
+                        DocumentParser.page_separator(filepath)
+                    )
+                if study_material:
+                    with metrics.timed("write"), self._profile(filename, "write"):
+                        self.file_handler.save_output(output_path, study_material)
+                return self._finish_note(filename, subject, output_path, study_material)
             
-            console.print(f"  Generating PDF...")
-            pdf_success = PDFGenerator.markdown_to_pdf(
-                study_material,
-                pdf_path,
-                title=f"{subject.title()} - Study Material"
-            )
+            # Read note content
+            with metrics.timed("parse"), self._profile(filename, "parse"):
+                note_content = self.file_handler.read_note_file(filepath)
             
-            if pdf_success:
-                try:
-                    rel_pdf_path = pdf_path.relative_to(Path.cwd())
-                    console.print(f"[green]✓[/green] PDF saved to {rel_pdf_path}")
-                except ValueError:
-                    console.print(f"[green]✓[/green] PDF saved to {pdf_path}")
+            # Generate study material and save output
+            console.print(f"  Generating study material for [cyan]{subject}[/cyan]...")
+            if self.config.stream_output:
+                # Streamed text is written as it arrives: one stage
+                with metrics.timed("llm"), self._profile(filename, "llm"):
+                    study_material = self.file_handler.save_output_stream(
+                        output_path,
+                        self.ai_client.stream_study_material(note_content),
+                        self.on_token
+                    )
             else:
-                console.print(f"[yellow]⚠[/yellow] PDF generation failed, but Markdown is saved")
+                with metrics.timed("llm"), self._profile(filename, "llm"):
+                    study_material = self.ai_client.generate_study_material(note_content)
+                if study_material:
+                    with metrics.timed("write"), self._profile(filename, "write"):
+                        self.file_handler.save_output(output_path, study_material)
             
-            return True
+            return self._finish_note(filename, subject, output_path, study_material)
             
         except Exception as e:
             logger.exception(f"Error processing {filename}: {e}")
             console.print(f"[red]✗[/red] Error processing {filename}: {e}")
-            return False
\ No newline at end of file
+            return self._resolved(False)
+    
+    def _chunks_while_parsing(self, filepath: Path) -> bool:
+        """
+        Decide whether to chunk a note while it is still being parsed.
+        
+        Only PDFs long enough to be chunked qualify: their extraction is
+        slow enough to be worth overlapping with the chunk requests. PDFs
+        that ``parse_file`` would extract across processes are read whole.
+        """
+        chunker = self.ai_client.chunker
+        if chunker is None or self.config.stream_output or filepath.suffix.lower() != ".pdf":
+            return False
+        
+        parser = self.file_handler.parser
+        try:
+            if parser.count_pdf_pages(filepath) * TOKENS_PER_PDF_PAGE <= chunker.max_tokens:
+                return False
+            return not parser.extracts_in_parallel(filepath)
+        except Exception as e:
+            # Let the regular read report the problem
+            logger.debug(f"Could not inspect {filepath.name} for chunking: {e}")
+            return False
+    
+    def _finish_note(
+        self,
+        filename: str,
+        subject: str,
+        output_path: Path,
+        study_material: Optional[str]
+    ) -> "Future[bool]":
+        """Queue the PDF of saved study material, or report that generation failed."""
+        if not study_material:
+            logger.error(f"Failed to generate study material for {filename}")
+            console.print(f"[red]✗[/red] Failed to generate material for {filename}")
+            return self._resolved(False)
+        
+        return self._queue_pdf(filename, subject, output_path, study_material)
+    
+    def _output_path(self, filename: str, subject: str) -> Path:
+        """
+        Get the Markdown output path for a note, creating its subject folder.
+        
+        Args:
+            filename: Note filename
+            subject: Subject extracted from the filename
+        
+        Returns:
+            Path of the ``_study.md`` file
+        """
+        subject_folder = SubjectParser.get_subject_folder(
+            OUTPUT_BASE,
+            subject
+        )
+        output_filename = SubjectParser.generate_output_filename(filename)
+        return subject_folder / output_filename
+    
+    def _queue_pdf(
+        self,
+        filename: str,
+        subject: str,
+        output_path: Path,
+        study_material: str
+    ) -> "Future[bool]":
+        """
+        Report the saved Markdown and queue the PDF version of it.
+        
+        Args:
+            filename: Note filename
+            subject: Subject extracted from the filename
+            output_path: Where the Markdown was saved
+            study_material: Generated study material
+        
+        Returns:
+            Future resolving to True once the PDF stage has finished, even
+            if the PDF failed: the Markdown is saved, so the note is marked
+            processed rather than regenerated on the next run. Failed PDFs
+            are listed in pdf_failures and the run summary instead.
+        """
+        # Display success message with absolute path if relative path fails
+        try:
+            rel_path = output_path.relative_to(Path.cwd())
+            console.print(f"[green]✓[/green] Markdown saved to {rel_path}")
+        except ValueError:
+            console.print(f"[green]✓[/green] Markdown saved to {output_path}")
+        
+        # Generate PDF version
+        pdf_path = output_path.with_suffix('.pdf')
+        
+        console.print(f"  Generating PDF...")
+        # Includes waiting for a free render process
+        started = time.perf_counter()
+        # Profiled runs render inline, so this samples WeasyPrint itself
+        with self._profile(filename, "pdf"):
+            pdf_future = self.pdf_pool.submit(
+                study_material,
+                pdf_path,
+                f"{subject.title()} - Study Material"
+            )
+        
+        result: "Future[bool]" = Future()
+        
+        def on_pdf_done(pdf_future: "Future[bool]") -> None:
+            metrics.observe("pdf", time.perf_counter() - started)
+            try:
+                if pdf_future.result():
+                    try:
+                        rel_pdf_path = pdf_path.relative_to(Path.cwd())
+                        console.print(f"[green]✓[/green] PDF saved to {rel_pdf_path}")
+                    except ValueError:
+                        console.print(f"[green]✓[/green] PDF saved to {pdf_path}")
+                else:
+                    console.print(f"[yellow]⚠[/yellow] PDF generation failed for {filename}, but Markdown is saved")
+                    metrics.count("pdf_failed")
+                    self.pdf_failures.append(filename)
+            finally:
+                # The Markdown is saved either way
+                result.set_result(True)
+        
+        # The callback runs on a pool thread; keep the note's attribution
+        pdf_future.add_done_callback(metrics.in_current_context(on_pdf_done))
+        return result
+    
+    @staticmethod
+    def _resolved(success: bool) -> "Future[bool]":
+        """Return an already completed result future."""
+        future: "Future[bool]" = Future()
+        future.set_result(success)
+        return future
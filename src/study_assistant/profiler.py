@@ -0,0 +1,155 @@
+"""Sampling profiler for the note processing pipeline."""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from types import FrameType
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class SamplingProfiler:
+    """
+    Sample the stacks of threads working on a pipeline stage.
+    
+    A background thread snapshots the stack of every thread inside a
+    ``stage`` block at a fixed interval. Sampling is wall-clock, so time
+    spent waiting on the network or on a PDF worker shows up as the frame
+    that was waiting. Samples are kept per note and merged across notes,
+    and written in the collapsed-stack format read by flamegraph.pl,
+    speedscope and inferno.
+    
+    Nothing is installed on the profiled threads themselves: a thread
+    outside a ``stage`` block costs nothing, and with profiling off no
+    profiler exists at all.
+    """
+    
+    def __init__(self, interval: float = 0.005):
+        """
+        Initialize profiler.
+        
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        # thread ident -> (note, stage) for threads inside a stage block
+        self._active: Dict[int, Tuple[str, str]] = {}
+        self._notes: Dict[str, Counter] = {}
+        self._merged: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        """Start sampling."""
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop sampling; collected samples are kept."""
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+    
+    @contextmanager
+    def stage(self, note: str, stage: str) -> Iterator[None]:
+        """
+        Sample the calling thread as one stage of a note.
+        
+        Args:
+            note: Note filename
+            stage: Stage name, the root frame of the collapsed stacks
+        """
+        ident = threading.get_ident()
+        with self._lock:
+            previous = self._active.get(ident)
+            self._active[ident] = (note, stage)
+        try:
+            yield
+        finally:
+            with self._lock:
+                if previous is None:
+                    del self._active[ident]
+                else:
+                    self._active[ident] = previous
+    
+    def write_note(self, note: str, path: Path) -> bool:
+        """
+        Write and forget the samples of one note.
+        
+        Args:
+            note: Note filename
+            path: Collapsed-stack file to write
+        
+        Returns:
+            True if the note had samples
+        """
+        with self._lock:
+            samples = self._notes.pop(note, None)
+        if not samples:
+            return False
+        _write_collapsed(path, samples)
+        return True
+    
+    def write_merged(self, path: Path) -> bool:
+        """
+        Write the samples of every note so far, merged by stage.
+        
+        Args:
+            path: Collapsed-stack file to write
+        
+        Returns:
+            True if anything was sampled
+        """
+        with self._lock:
+            samples = Counter(self._merged)
+        if not samples:
+            return False
+        _write_collapsed(path, samples)
+        return True
+    
+    def _run(self) -> None:
+        """Sample active threads until stopped."""
+        own_ident = threading.get_ident()
+        while not self._stopping.wait(self.interval):
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for ident, (note, stage) in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is None or ident == own_ident:
+                        continue
+                    stack = f"{stage};{_collapse(frame)}"
+                    self._notes.setdefault(note, Counter())[stack] += 1
+                    self._merged[stack] += 1
+
+
+def _collapse(frame: Optional[FrameType]) -> str:
+    """Format a stack root-first as ``function (file:line);...``."""
+    names: List[str] = []
+    while frame is not None:
+        code = frame.f_code
+        filename = os.path.basename(code.co_filename)
+        names.append(f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":"))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _write_collapsed(path: Path, samples: Counter) -> None:
+    """Write ``stack count`` lines, most frequent first."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def profile_filename(prefix: str = "notepal_profile") -> str:
+    """Name for a run's merged profile, unique per second."""
+    return f"{prefix}_{time.strftime('%Y%m%d-%H%M%S')}.collapsed"
@@ -0,0 +1,119 @@
+"""Client-side rate limiting for OpenAI requests."""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+from .utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class TokenBucket:
+    """Continuously refilling bucket that allows reservations into debt."""
+    
+    def __init__(self, rate_per_minute: float, burst_seconds: float):
+        """
+        Initialize token bucket.
+        
+        Args:
+            rate_per_minute: Sustained refill rate
+            burst_seconds: How many seconds of quota may be spent at once
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+    
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Take ``amount`` from the bucket.
+        
+        The level may go negative; the caller must then wait until the
+        refill has paid the debt back.
+        
+        Returns:
+            Seconds to wait before the reservation may be used
+        """
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.level -= amount
+        return max(0.0, -self.level / self.rate)
+
+
+class RateLimiter:
+    """Shared requests-per-minute and tokens-per-minute limiter."""
+    
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: Optional[int] = None,
+        burst_seconds: float = 5.0
+    ):
+        """
+        Initialize rate limiter.
+        
+        A small burst window keeps requests evenly spaced, so a large batch
+        runs close to the quota instead of bursting into 429s.
+        
+        Args:
+            requests_per_minute: Maximum requests per minute
+            tokens_per_minute: Maximum tokens per minute (None to disable)
+            burst_seconds: Seconds of quota that may be spent back to back
+        """
+        self.requests = TokenBucket(requests_per_minute, burst_seconds)
+        self.tokens = (
+            TokenBucket(tokens_per_minute, burst_seconds)
+            if tokens_per_minute else None
+        )
+        self._lock = threading.Lock()
+    
+    def reserve(self, tokens: int) -> float:
+        """
+        Reserve capacity for one request without blocking.
+        
+        Args:
+            tokens: Estimated token cost of the request
+        
+        Returns:
+            Seconds the caller must wait before sending the request
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay = self.requests.reserve(1, now)
+            if self.tokens is not None:
+                delay = max(delay, self.tokens.reserve(tokens, now))
+        return delay
+    
+    def acquire(self, tokens: int) -> float:
+        """
+        Block until one request of ``tokens`` may be sent.
+        
+        Args:
+            tokens: Estimated token cost of the request
+        
+        Returns:
+            Seconds spent waiting
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            logger.debug(f"Rate limit reached, waiting {delay:.2f}s")
+            time.sleep(delay)
+        return delay
+    
+    async def acquire_async(self, tokens: int) -> float:
+        """
+        Wait on the event loop until one request of ``tokens`` may be sent.
+        
+        Args:
+            tokens: Estimated token cost of the request
+        
+        Returns:
+            Seconds spent waiting
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            logger.debug(f"Rate limit reached, waiting {delay:.2f}s")
+            await asyncio.sleep(delay)
+        return delay
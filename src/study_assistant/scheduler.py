@@ -0,0 +1,157 @@
+"""Shortest-job-first ordering and token budgets for processing runs."""
+
+import math
+import threading
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+from .document_parser import DocumentParser
+from .utils.logger import setup_logger
+from .utils.tokens import CHARS_PER_TOKEN
+
+logger = setup_logger(__name__)
+
+# Text tokens on a typical page of lecture notes
+TOKENS_PER_PDF_PAGE = 500
+
+# document.xml is mostly markup; roughly a third of it is text
+DOCX_XML_CHARS_PER_TOKEN = CHARS_PER_TOKEN * 3
+
+
+@dataclass
+class NoteCost:
+    """Estimated cost of processing one note."""
+    
+    filepath: Path
+    size: int
+    pages: int
+    tokens: int
+
+
+class CostEstimator:
+    """
+    Estimate what a note will cost without extracting its text.
+    
+    Estimates use only file metadata and, for PDFs, the page count, so
+    ordering a large backlog takes a fraction of the time parsing it would.
+    """
+    
+    def __init__(self, parser: DocumentParser, request_tokens: Callable[[int], int]):
+        """
+        Initialize estimator.
+        
+        Args:
+            parser: Parser used to count PDF pages
+            request_tokens: Maps a note's text tokens to the API tokens
+                processing it will use (see
+                ``BaseStudyAssistantClient.estimate_note_tokens``)
+        """
+        self.parser = parser
+        self.request_tokens = request_tokens
+    
+    def estimate(self, filepath: Path) -> NoteCost:
+        """
+        Estimate the cost of one note.
+        
+        Args:
+            filepath: Note file
+        
+        Returns:
+            Size, page count and estimated API tokens
+        """
+        suffix = filepath.suffix.lower()
+        size = 0
+        pages = 1
+        
+        try:
+            size = filepath.stat().st_size
+            if suffix == ".pdf":
+                pages = self.parser.count_pdf_pages(filepath)
+                text_tokens = pages * TOKENS_PER_PDF_PAGE
+            elif suffix == ".docx":
+                with zipfile.ZipFile(filepath) as docx:
+                    xml_size = docx.getinfo("word/document.xml").file_size
+                text_tokens = math.ceil(xml_size / DOCX_XML_CHARS_PER_TOKEN)
+            else:
+                text_tokens = math.ceil(size / CHARS_PER_TOKEN)
+        except Exception as e:
+            # Unreadable or vanished files still get processed (and reported) in turn
+            logger.debug(f"Could not inspect {filepath.name} for scheduling: {e}")
+            text_tokens = math.ceil(size / CHARS_PER_TOKEN)
+        
+        return NoteCost(filepath, size, pages, self.request_tokens(text_tokens))
+    
+    def shortest_first(self, filepaths: Iterable[Path]) -> List[NoteCost]:
+        """
+        Order notes cheapest first, which minimizes mean time to completion.
+        
+        Args:
+            filepaths: Notes to order
+        
+        Returns:
+            Cost estimates in processing order (ties keep name order)
+        """
+        costs = sorted(
+            (self.estimate(filepath) for filepath in filepaths),
+            key=lambda cost: (cost.tokens, cost.size)
+        )
+        for cost in costs:
+            logger.debug(f"Scheduled {cost.filepath.name}: ~{cost.tokens} tokens, {cost.pages} page(s)")
+        return costs
+
+
+class TokenBudget:
+    """
+    API token allowance for one run.
+    
+    A note reserves its estimated tokens before it starts and is refused
+    if they do not fit beside what has been spent and what running notes
+    have reserved. Once a note is refused every later note is too, so a
+    run stops cleanly at the first note that does not fit and the notes
+    left over are exactly the tail of the schedule. That includes a note
+    estimated above the whole limit: it and everything after it are left.
+    """
+    
+    def __init__(self, limit: int):
+        """
+        Initialize budget.
+        
+        Args:
+            limit: Total API tokens the run may use
+        """
+        self.limit = limit
+        self.spent = 0
+        self.reserved = 0
+        self.exhausted = False
+        self._lock = threading.Lock()
+    
+    def reserve(self, tokens: int) -> bool:
+        """
+        Reserve tokens for a note about to start.
+        
+        Args:
+            tokens: Estimated tokens for the note
+        
+        Returns:
+            True if the note may start
+        """
+        with self._lock:
+            if self.exhausted or self.spent + self.reserved + tokens > self.limit:
+                self.exhausted = True
+                return False
+            self.reserved += tokens
+            return True
+    
+    def settle(self, reserved: int, used: Optional[int]) -> None:
+        """
+        Replace a finished note's reservation with what it actually used.
+        
+        Args:
+            reserved: Tokens reserved for the note
+            used: Tokens the API reported (None charges the reservation)
+        """
+        with self._lock:
+            self.reserved -= reserved
+            self.spent += reserved if used is None else used
@@ -0,0 +1,19 @@
+"""Cheap token estimates for prompts and notes."""
+
+import math
+
+# OpenAI's rule of thumb for English text; good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate how many tokens a piece of text will use.
+    
+    Args:
+        text: Text to estimate
+    
+    Returns:
+        Approximate token count
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
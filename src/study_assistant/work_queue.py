@@ -0,0 +1,208 @@
+"""Bounded, deduplicating work queue for the file watcher."""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Generic, Hashable, List, Optional, Set, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+
+class QueueClosed(Exception):
+    """Raised when putting an item into a closed queue."""
+
+
+class CoalescingQueue(Generic[T]):
+    """
+    FIFO work queue in which each item is pending at most once.
+    
+    Putting an item that is already waiting coalesces with it. Putting an
+    item that a worker is currently handling marks it to be queued again
+    once that worker calls ``task_done``, so the latest change is never
+    lost and the same item is never handled by two workers at once.
+    
+    The number of distinct waiting items is bounded: ``put`` blocks while
+    the queue is full, pushing back on the producer.
+    """
+    
+    # Number of recent waits and run times kept for percentiles
+    LATENCY_WINDOW = 256
+    
+    def __init__(self, maxsize: int):
+        """
+        Initialize work queue.
+        
+        Args:
+            maxsize: Distinct items that may wait before ``put`` blocks
+        """
+        self.maxsize = max(1, maxsize)
+        self._pending: "OrderedDict[T, float]" = OrderedDict()
+        self._active: Dict[T, float] = {}
+        self._requeue: Set[T] = set()
+        self._closed = False
+        self._cond = threading.Condition()
+        
+        # Statistics
+        self.enqueued = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.max_depth = 0
+        self._waits: Deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+        self._run_times: Deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+    
+    def put(self, item: T, block: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Queue an item unless it is already waiting.
+        
+        Args:
+            item: Work item
+            block: Wait for room when the queue is full
+            timeout: Longest wait for room, in seconds
+        
+        Returns:
+            True if the item was queued, False if it coalesced with an
+            existing entry or no room became available
+        
+        Raises:
+            QueueClosed: If the queue has been closed
+        """
+        with self._cond:
+            # Waiting ends early if the item is queued or taken by a worker
+            # meanwhile, so it is coalesced rather than queued twice
+            has_room = self._cond.wait_for(
+                lambda: (
+                    self._closed
+                    or item in self._pending
+                    or item in self._active
+                    or len(self._pending) < self.maxsize
+                ),
+                timeout if block else 0
+            )
+            if self._closed:
+                raise QueueClosed()
+            
+            if item in self._pending:
+                self.coalesced += 1
+                return False
+            
+            if item in self._active:
+                # Handle it again once the current run finishes
+                self.coalesced += 1
+                self._requeue.add(item)
+                return False
+            
+            if not has_room:
+                return False
+            
+            self._enqueue(item)
+            return True
+    
+    def get(self, timeout: Optional[float] = None) -> Optional[T]:
+        """
+        Take the oldest waiting item.
+        
+        Args:
+            timeout: Longest wait for an item, in seconds
+        
+        Returns:
+            The item, or None if the queue was closed or the wait timed out
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._closed or self._pending, timeout):
+                return None
+            if not self._pending:
+                return None
+            
+            item, queued_at = self._pending.popitem(last=False)
+            now = time.monotonic()
+            self._waits.append(now - queued_at)
+            self._active[item] = now
+            self._cond.notify_all()
+            return item
+    
+    def task_done(self, item: T) -> None:
+        """
+        Mark an item returned by ``get`` as handled.
+        
+        Args:
+            item: The finished item
+        """
+        with self._cond:
+            started = self._active.pop(item, None)
+            if started is not None:
+                self._run_times.append(time.monotonic() - started)
+                self.completed += 1
+            
+            if item in self._requeue:
+                self._requeue.discard(item)
+                if not self._closed:
+                    # Bypasses the size bound: the slot was held while running
+                    self._enqueue(item)
+            self._cond.notify_all()
+    
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until no items are waiting or running.
+        
+        Args:
+            timeout: Longest wait, in seconds
+        
+        Returns:
+            True if the queue drained
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._pending and not self._active,
+                timeout
+            )
+    
+    def close(self) -> None:
+        """Stop accepting items and wake all waiting workers."""
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            self._requeue.clear()
+            self._cond.notify_all()
+    
+    def __len__(self) -> int:
+        """Number of waiting items."""
+        with self._cond:
+            return len(self._pending)
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        Return queue depth, throughput counters and latency figures.
+        
+        Returns:
+            Dictionary with ``depth``, ``in_flight``, ``max_depth``, counters
+            and wait/run time percentiles in seconds over recent items
+        """
+        with self._cond:
+            waits = sorted(self._waits)
+            run_times = sorted(self._run_times)
+            return {
+                "depth": len(self._pending),
+                "in_flight": len(self._active),
+                "max_depth": self.max_depth,
+                "enqueued": self.enqueued,
+                "coalesced": self.coalesced,
+                "completed": self.completed,
+                "wait_p50": _percentile(waits, 0.50),
+                "wait_p95": _percentile(waits, 0.95),
+                "run_p50": _percentile(run_times, 0.50),
+                "run_p95": _percentile(run_times, 0.95),
+            }
+    
+    def _enqueue(self, item: T) -> None:
+        """Append an item; the caller holds the lock."""
+        self._pending[item] = time.monotonic()
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, len(self._pending))
+        self._cond.notify_all()
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Return the given percentile of sorted values (0.0 when empty)."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
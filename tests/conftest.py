@@ -0,0 +1,54 @@
+"""Shared fixtures: a local mock of the OpenAI API."""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from mock_openai_server import MockOpenAIState, make_server  # noqa: E402
+
+
+@pytest.fixture
+def mock_openai():
+    """Start mock API servers; call with a MockOpenAIState to get a base URL."""
+    servers = []
+    
+    def start(state=None, port=0):
+        server = make_server(port=port, state=state or MockOpenAIState())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}/v1"
+    
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def app_config(tmp_path, monkeypatch):
+    """Build an isolated configuration pointing at a mock API base URL."""
+    from study_assistant import processor
+    from study_assistant.config import AppConfig
+    
+    monkeypatch.setattr(processor, "OUTPUT_BASE", tmp_path / "output")
+    
+    def build(base_url, **settings):
+        values = {
+            "OPENAI_API_KEY": "test",
+            "OPENAI_BASE_URL": base_url,
+            "NOTES_INCOMING_DIR": tmp_path / "incoming",
+            "NOTES_OUTPUT_DIR": tmp_path / "notes",
+            "PROCESSED_INDEX_PATH": tmp_path / "processed_index.json",
+            "CACHE_DIR": tmp_path / "cache",
+            "METRICS_DIR": tmp_path / "metrics",
+            "PDF_WORKERS": 0,
+            "PDF_PARSE_WORKERS": 0,
+        }
+        values.update(settings)
+        return AppConfig(_env_file=None, **values)
+    
+    return build
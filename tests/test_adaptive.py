@@ -0,0 +1,181 @@
+"""Tests for adaptive concurrency limits and retry backoff."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from study_assistant import adaptive
+from study_assistant.adaptive import (
+    MAX_RETRY_HINT,
+    AdaptiveConcurrency,
+    is_retryable,
+    retry_delay,
+    retry_hint,
+)
+from study_assistant.backends import Endpoint, EndpointConfig, EndpointPool
+
+
+class FakeClock:
+    """Stands in for the time module so decrease windows are exact."""
+    
+    def __init__(self):
+        self.now = 100.0
+    
+    def monotonic(self):
+        return self.now
+    
+    def time(self):
+        return self.now
+
+
+class EdgeRandom:
+    """Jitter source that always picks the top of the range."""
+    
+    def uniform(self, low, high):
+        return high
+
+
+def error_with(headers, status_code=429):
+    return SimpleNamespace(status_code=status_code, response=SimpleNamespace(headers=headers))
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after-ms": "250"}, 0.25),
+    ({"retry-after": "3"}, 3.0),
+    ({"retry-after-ms": "soon", "retry-after": "2"}, 2.0),
+    ({"retry-after": "600"}, MAX_RETRY_HINT),
+    ({"retry-after": "-5"}, 0.0),
+    ({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "6m0s"}, 120.0),
+    ({"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "1.5s"}, 1.5),
+    ({"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "20ms"}, 0.02),
+    (
+        {
+            "x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2s",
+            "x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "5s",
+        },
+        5.0,
+    ),
+    # Only a used-up quota's reset counts
+    ({"x-ratelimit-remaining-tokens": "10", "x-ratelimit-reset-tokens": "5s"}, None),
+    ({"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "1.2.3s"}, None),
+    ({"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "5x"}, None),
+    ({"retry-after": "whenever"}, None),
+    ({}, None),
+])
+def test_retry_hint_reads_headers(headers, expected):
+    hint = retry_hint(error_with(headers))
+    assert hint == (pytest.approx(expected) if expected is not None else None)
+
+
+def test_retry_hint_reads_http_dates(monkeypatch):
+    clock = FakeClock()
+    clock.now = 784111777.0  # Sun, 06 Nov 1994 08:49:37 GMT
+    monkeypatch.setattr(adaptive, "time", clock)
+    
+    hint = retry_hint(error_with({"retry-after": "Sun, 06 Nov 1994 08:49:47 GMT"}))
+    
+    assert hint == pytest.approx(10.0)
+
+
+def test_retry_delay_jitter_bounds():
+    hinted = error_with({"retry-after": "10"})
+    assert retry_delay(hinted, 1, EdgeRandom()) == pytest.approx(10.0 * (1 + adaptive.HINT_JITTER))
+    
+    # Without a hint: full jitter up to base * 2^(failures - 1), capped
+    unhinted = error_with({})
+    assert retry_delay(unhinted, 1, EdgeRandom()) == adaptive.BACKOFF_BASE
+    assert retry_delay(unhinted, 3, EdgeRandom()) == adaptive.BACKOFF_BASE * 4
+    assert retry_delay(unhinted, 20, EdgeRandom()) == adaptive.BACKOFF_CAP
+    for failures in range(1, 10):
+        assert 0 <= retry_delay(unhinted, failures) <= adaptive.BACKOFF_CAP
+
+
+@pytest.mark.parametrize("status_code, retryable", [
+    (None, True), (408, True), (409, True), (429, True), (500, True), (503, True),
+    (400, False), (401, False), (404, False),
+])
+def test_is_retryable(status_code, retryable):
+    assert is_retryable(error_with({}, status_code)) is retryable
+
+
+def test_slow_start_then_additive_growth(monkeypatch):
+    monkeypatch.setattr(adaptive, "time", FakeClock())
+    limit = AdaptiveConcurrency(initial=4, maximum=64)
+    
+    # Slow start: one more per success while the limit is what holds back
+    for _ in range(4):
+        limit.on_success(0.1, in_flight=limit.current)
+    assert limit.current == 8
+    
+    limit.on_overload()
+    assert limit.current == 4
+    assert not limit.slow_start
+    
+    # Congestion avoidance: about one more per window of successes
+    for _ in range(4):
+        limit.on_success(0.1, in_flight=limit.current)
+    assert limit.current == 4
+    for _ in range(2):
+        limit.on_success(0.1, in_flight=limit.current)
+    assert limit.current == 5
+
+
+def test_limit_holds_when_idle_or_slow(monkeypatch):
+    monkeypatch.setattr(adaptive, "time", FakeClock())
+    limit = AdaptiveConcurrency(initial=4)
+    limit.on_success(0.1, in_flight=4)
+    assert limit.current == 5
+    
+    # Few requests in flight: the limit was not what held them back
+    limit.on_success(0.1, in_flight=2)
+    # Far slower than the baseline: the server is queueing
+    limit.on_success(1.0, in_flight=5)
+    assert limit.current == 5
+
+
+def test_overload_halves_once_per_window(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(adaptive, "time", clock)
+    limit = AdaptiveConcurrency(initial=16, minimum=2)
+    limit.on_success(1.0, in_flight=16)
+    assert limit.current == 17
+    
+    limit.on_overload()
+    # Requests already in flight when it was cut count once
+    limit.on_overload()
+    assert limit.current == 8
+    
+    for _ in range(5):
+        clock.now += 2.0
+        limit.on_overload()
+    assert limit.current == 2
+
+
+def test_malformed_reset_header_does_not_leak_a_slot(monkeypatch):
+    monkeypatch.setattr(EndpointPool, "_classify", staticmethod(lambda error: "throttled"))
+    pool = EndpointPool([Endpoint(EndpointConfig(name="only"), "test")])
+    chosen = pool.acquire()
+    
+    pool.release(chosen, error=error_with({
+        "x-ratelimit-remaining-tokens": "0",
+        "x-ratelimit-reset-tokens": "1.2.3s",
+    }))
+    
+    stats = pool.stats()[0]
+    assert stats["in_flight"] == 0
+    assert stats["failures"] == 1
+
+
+def test_slot_is_returned_when_recording_fails(monkeypatch):
+    monkeypatch.setattr(EndpointPool, "_classify", staticmethod(lambda error: "overloaded"))
+    pool = EndpointPool([Endpoint(EndpointConfig(name="only"), "test")])
+    chosen = pool.acquire()
+    
+    def broken_delay(error, failures):
+        raise RuntimeError("bad hint")
+    
+    monkeypatch.setattr("study_assistant.backends.retry_delay", broken_delay)
+    with pytest.raises(RuntimeError):
+        pool.release(chosen, error=error_with({}, 503))
+    
+    assert pool.stats()[0]["in_flight"] == 0
@@ -0,0 +1,37 @@
+"""Tests for the asyncio processing API."""
+
+import asyncio
+
+from mock_openai_server import MockOpenAIState
+
+from study_assistant import async_processor, processor
+from study_assistant.async_processor import AsyncNoteProcessor
+from study_assistant.batch import BatchProcessor
+from study_assistant.processor import NoteProcessor
+
+
+def test_process_all_notes_skips_batched_notes(app_config, mock_openai, monkeypatch):
+    monkeypatch.setattr(async_processor, "OUTPUT_BASE", processor.OUTPUT_BASE)
+    config = app_config(mock_openai(MockOpenAIState(batch_delay=3600)))
+    (config.notes_incoming_dir / "math_lecture1.txt").write_text("Limits", encoding="utf-8")
+    note_processor = NoteProcessor(config)
+    assert BatchProcessor(note_processor).submit_pending() == {"math_lecture1.txt": True}
+    note_processor.close()
+    
+    (config.notes_incoming_dir / "physics_lecture1.txt").write_text("Forces", encoding="utf-8")
+    
+    async def run():
+        async_note_processor = AsyncNoteProcessor(config)
+        try:
+            first = await async_note_processor.process_all_notes()
+            second = await async_note_processor.process_all_notes()
+        finally:
+            await async_note_processor.aclose()
+        return first, second
+    
+    first, second = asyncio.run(run())
+    
+    assert first == {"physics_lecture1.txt": True}
+    assert second == {}
+    assert (processor.OUTPUT_BASE / "physics" / "physics_lecture1_study.md").exists()
+    assert not (processor.OUTPUT_BASE / "math" / "math_lecture1_study.md").exists()
@@ -0,0 +1,166 @@
+"""Tests for the watcher's settle window, rename handling and startup scan."""
+
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from study_assistant import auto_watcher
+from study_assistant.auto_watcher import NoteWatcher
+from study_assistant.processor import NoteProcessor
+
+
+class FakeClock:
+    """Stands in for the time module so settle windows are exact."""
+    
+    def __init__(self):
+        self.now = 100.0
+    
+    def monotonic(self):
+        return self.now
+
+
+def event(src_path, dest_path=None):
+    return SimpleNamespace(is_directory=False, src_path=str(src_path), dest_path=str(dest_path))
+
+
+@pytest.fixture
+def watcher(app_config, mock_openai):
+    """Watcher whose processor counts the notes it generates."""
+    processor = NoteProcessor(app_config(mock_openai()))
+    generated = []
+    process = processor._process_single_note
+    
+    def process_and_count(filepath):
+        generated.append(filepath.name)
+        return process(filepath)
+    
+    processor._process_single_note = process_and_count
+    watcher = NoteWatcher(processor, settle_seconds=2.0)
+    watcher.generated = generated
+    yield watcher
+    watcher.stop()
+    processor.close()
+
+
+def test_file_is_queued_once_it_stops_changing(watcher, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(auto_watcher, "time", clock)
+    note = watcher.processor.file_handler.incoming_dir / "math_lecture1.txt"
+    note.write_text("Limits", encoding="utf-8")
+    
+    watcher.on_created(event(note))
+    assert watcher._settled_files() == []
+    
+    # Still being written: every change restarts the window
+    clock.now += 1.5
+    note.write_text("Limits and derivatives", encoding="utf-8")
+    watcher.on_modified(event(note))
+    assert watcher._settled_files() == []
+    clock.now += 1.5
+    assert watcher._settled_files() == []
+    
+    clock.now += 0.5
+    assert watcher._settled_files() == [note]
+    assert watcher._settled_files() == []
+    assert watcher.stats()["settling"] == 0
+
+
+def test_editor_rename_into_place_is_settled_once(watcher, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(auto_watcher, "time", clock)
+    incoming = watcher.processor.file_handler.incoming_dir
+    note = incoming / "math_lecture1.txt"
+    temp = incoming / ".math_lecture1.txt.swp"
+    temp.write_text("Limits", encoding="utf-8")
+    
+    # Temp files are ignored; the rename settles the real name
+    watcher.on_created(event(temp))
+    watcher.on_modified(event(temp))
+    assert watcher.stats()["settling"] == 0
+    temp.rename(note)
+    watcher.on_moved(event(temp, note))
+    watcher.on_modified(event(note))
+    
+    watcher._settled_files()
+    clock.now += 2.0
+    assert watcher._settled_files() == [note]
+
+
+def test_moving_a_note_out_stops_settling_it(watcher, tmp_path):
+    note = watcher.processor.file_handler.incoming_dir / "math_lecture1.txt"
+    note.write_text("Limits", encoding="utf-8")
+    watcher.on_created(event(note))
+    assert watcher.stats()["settling"] == 1
+    
+    archived = tmp_path / "math_lecture1.txt"
+    note.rename(archived)
+    watcher.on_moved(event(note, archived))
+    
+    assert watcher.stats()["settling"] == 0
+
+
+def test_one_generation_per_file_version(watcher):
+    note = watcher.processor.file_handler.incoming_dir / "math_lecture1.txt"
+    note.write_text("Limits", encoding="utf-8")
+    
+    watcher._process_file(note)
+    watcher._process_file(note)
+    os.utime(note, ns=(1, 1))
+    watcher._process_file(note)
+    # A renamed copy of a processed note is not generated again either
+    copy = note.with_name("math_copy.txt")
+    copy.write_text("Limits", encoding="utf-8")
+    watcher._process_file(copy)
+    assert watcher.generated == ["math_lecture1.txt"]
+    assert watcher.skipped_unchanged == 3
+    
+    note.write_text("Limits and derivatives", encoding="utf-8")
+    watcher._process_file(note)
+    assert watcher.generated == ["math_lecture1.txt", "math_lecture1.txt"]
+
+
+def test_bursts_of_events_generate_once(app_config, mock_openai):
+    processor = NoteProcessor(app_config(mock_openai()))
+    generated = []
+    process = processor._process_single_note
+    processor._process_single_note = lambda filepath: generated.append(filepath.name) or process(filepath)
+    watcher = NoteWatcher(processor, workers=2, settle_seconds=0.2)
+    watcher.start(reconcile=False)
+    note = processor.file_handler.incoming_dir / "math_lecture1.txt"
+    
+    for length in range(1, 6):
+        note.write_text("Limits " * length, encoding="utf-8")
+        watcher.on_modified(event(note))
+        time.sleep(0.02)
+    
+    deadline = time.monotonic() + 10
+    while (watcher.stats()["settling"] or not watcher.queue.join(timeout=0)) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    watcher.stop()
+    processor.close()
+    
+    assert generated == ["math_lecture1.txt"]
+
+
+def test_reconcile_queues_notes_missed_while_stopped(watcher):
+    file_handler = watcher.processor.file_handler
+    incoming = file_handler.incoming_dir
+    done = incoming / "math_lecture1.txt"
+    edited = incoming / "math_lecture2.txt"
+    for note in (done, edited):
+        note.write_text("Limits", encoding="utf-8")
+        file_handler.mark_processed(note, watcher.index)
+    
+    edited.write_text("Limits and derivatives", encoding="utf-8")
+    new = incoming / "physics_lecture1.txt"
+    new.write_text("Forces", encoding="utf-8")
+    (incoming / ".physics_lecture1.txt.swp").write_text("Forces", encoding="utf-8")
+    
+    assert watcher.reconcile() == 2
+    queued = {watcher.queue.get(timeout=0), watcher.queue.get(timeout=0)}
+    assert queued == {edited, new}
+    assert watcher.queue.get(timeout=0) is None
+    for note in queued:
+        watcher.queue.task_done(note)
@@ -0,0 +1,89 @@
+"""Tests for routing across an endpoint pool."""
+
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from mock_openai_server import MockOpenAIState
+from openai import APIConnectionError
+
+from study_assistant import backends
+from study_assistant.backends import Endpoint, EndpointConfig, EndpointPool
+
+
+def endpoint(name, base_url):
+    return Endpoint(EndpointConfig(name=name, base_url=base_url), "test")
+
+
+def send(pool):
+    """Send one chat completion through the pool and return the endpoint's name."""
+    with pool.request(0) as chosen:
+        chosen.client.chat.completions.create(
+            model="mock",
+            messages=[{"role": "user", "content": "Limits"}],
+            max_tokens=10
+        )
+    return chosen.name
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_prefers_the_faster_endpoint(mock_openai):
+    fast = MockOpenAIState()
+    slow = MockOpenAIState(latency=0.2)
+    pool = EndpointPool([endpoint("fast", mock_openai(fast)), endpoint("slow", mock_openai(slow))])
+    
+    names = [send(pool) for _ in range(10)]
+    
+    # The slow endpoint gets one trial request, then loses on latency
+    assert names.count("slow") == 1
+    assert (fast.requests, slow.requests) == (9, 1)
+
+
+def test_spreads_concurrent_requests(mock_openai):
+    first = MockOpenAIState(latency=0.1)
+    second = MockOpenAIState(latency=0.1)
+    pool = EndpointPool([endpoint("first", mock_openai(first)), endpoint("second", mock_openai(second))])
+    send(pool)
+    send(pool)
+    
+    with ThreadPoolExecutor(8) as executor:
+        names = list(executor.map(lambda _: send(pool), range(16)))
+    
+    assert names.count("first") >= 4
+    assert names.count("second") >= 4
+    assert pool.stats()[0]["in_flight"] == pool.stats()[1]["in_flight"] == 0
+
+
+def test_dead_endpoint_is_ejected_and_readmitted(mock_openai, monkeypatch):
+    monkeypatch.setattr(EndpointPool, "EJECT_SECONDS", 0.5)
+    monkeypatch.setattr(backends, "retry_delay", lambda error, failures: 0.0)
+    port = free_port()
+    live = endpoint("live", mock_openai())
+    dead = endpoint("dead", f"http://127.0.0.1:{port}/v1")
+    pool = EndpointPool([live, dead])
+    
+    # While the unproven live endpoint has its trial request in flight,
+    # requests go to the dead one until it is ejected
+    held = pool.acquire()
+    assert held is live
+    for _ in range(EndpointPool.EJECT_AFTER):
+        with pytest.raises(APIConnectionError):
+            send(pool)
+    pool.release(held, 0.01)
+    
+    assert dead.stats()["ejected"]
+    assert [send(pool) for _ in range(3)] == ["live"] * 3
+    
+    # Once the ejection ends the endpoint gets a trial request, and a
+    # success restores it
+    mock_openai(port=port)
+    time.sleep(0.6)
+    assert send(pool) == "dead"
+    assert dead.ejections == 0
+    assert not dead.stats()["ejected"]
@@ -0,0 +1,33 @@
+"""Tests for Batch API submission and collection."""
+
+from mock_openai_server import MockOpenAIState
+
+from study_assistant import processor
+from study_assistant.batch import BatchProcessor
+from study_assistant.processor import NoteProcessor
+
+
+def test_submit_then_collect(app_config, mock_openai):
+    state = MockOpenAIState(batch_delay=3600)
+    config = app_config(mock_openai(state))
+    (config.notes_incoming_dir / "math_lecture1.txt").write_text("Limits", encoding="utf-8")
+    (config.notes_incoming_dir / "physics_lecture1.txt").write_text("Forces", encoding="utf-8")
+    note_processor = NoteProcessor(config)
+    batch = BatchProcessor(note_processor)
+    
+    assert batch.submit_pending() == {"math_lecture1.txt": True, "physics_lecture1.txt": True}
+    # Notes waiting in a batch are not submitted twice
+    assert batch.submit_pending() == {}
+    
+    # Still in progress: nothing is collected yet
+    assert batch.collect() == {}
+    state.batch_delay = 0
+    assert batch.collect() == {"math_lecture1.txt": True, "physics_lecture1.txt": True}
+    note_processor.close()
+    
+    output = processor.OUTPUT_BASE / "math" / "math_lecture1_study.md"
+    assert output.read_text(encoding="utf-8").startswith("# Summary")
+    with note_processor.file_handler.load_processed_index() as index:
+        assert "math_lecture1.txt" in index
+        assert not index.open_batches()
+    assert batch.collect() == {}
@@ -0,0 +1,103 @@
+"""Tests for the size-bounded disk cache."""
+
+import os
+import zlib
+
+import pytest
+
+from study_assistant import cache
+from study_assistant.cache import DiskCache
+
+# Random bytes do not compress, so every entry is about this size on disk
+VALUE_SIZE = 1000
+ENTRY_SIZE = len(zlib.compress(os.urandom(VALUE_SIZE)))
+
+
+class FakeClock:
+    """Stands in for the time module so access order is exact."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def time(self):
+        self.now += 1.0
+        return self.now
+
+
+@pytest.fixture
+def disk_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "time", FakeClock())
+    opened = DiskCache(tmp_path / "cache.sqlite3", ENTRY_SIZE * 3)
+    yield opened
+    opened.close()
+
+
+def value():
+    return os.urandom(VALUE_SIZE)
+
+
+def test_get_counts_hits_and_misses(disk_cache):
+    stored = value()
+    disk_cache.set("a", stored)
+    
+    assert disk_cache.get("a") == stored
+    assert disk_cache.get("b") is None
+    assert disk_cache.get("a") == stored
+    assert disk_cache.stats() == {"hits": 2, "misses": 1, "entries": 1, "bytes": ENTRY_SIZE}
+
+
+def test_evicts_least_recently_set_first(disk_cache):
+    for key in "abcd":
+        disk_cache.set(key, value())
+    
+    assert disk_cache.get("a") is None
+    assert all(disk_cache.get(key) is not None for key in "bcd")
+    assert disk_cache.stats()["entries"] == 3
+
+
+def test_reading_an_entry_keeps_it(disk_cache):
+    for key in "abc":
+        disk_cache.set(key, value())
+    disk_cache.get("a")
+    
+    disk_cache.set("d", value())
+    disk_cache.set("e", value())
+    
+    assert [key for key in "abcde" if disk_cache.get(key) is not None] == ["a", "d", "e"]
+
+
+def test_large_entry_evicts_several(disk_cache):
+    for key in "abc":
+        disk_cache.set(key, value())
+    
+    disk_cache.set("big", os.urandom(VALUE_SIZE * 2))
+    
+    assert [key for key in "abc" if disk_cache.get(key) is not None] == ["c"]
+    assert disk_cache.stats()["bytes"] <= disk_cache.max_bytes
+
+
+def test_replacing_an_entry_counts_its_size_once(disk_cache):
+    for _ in range(10):
+        disk_cache.set("a", value())
+    disk_cache.set("b", value())
+    disk_cache.set("c", value())
+    
+    # Nothing is evicted: three entries fit
+    assert disk_cache.stats()["entries"] == 3
+    assert disk_cache._size == disk_cache.stats()["bytes"]
+
+
+def test_size_is_restored_on_reopen(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "time", FakeClock())
+    path = tmp_path / "cache.sqlite3"
+    first = DiskCache(path, ENTRY_SIZE * 3)
+    for key in "abc":
+        first.set(key, value())
+    first.close()
+    
+    reopened = DiskCache(path, ENTRY_SIZE * 3)
+    reopened.set("d", value())
+    
+    assert reopened.stats()["entries"] == 3
+    assert reopened.get("a") is None
+    reopened.close()
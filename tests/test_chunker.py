@@ -0,0 +1,106 @@
+"""Tests for map-reduce chunking of long notes."""
+
+from study_assistant.chunker import NoteChunker
+from study_assistant.document_parser import PAGE_BREAK
+from study_assistant.openai_client import StudyAssistantClient
+from study_assistant.utils.tokens import estimate_tokens
+
+BUDGET = 50
+
+PARAGRAPH = "Energy is conserved in a closed system, so work done turns into heat."
+
+NOTE = "\n\n".join([
+    "# Mechanics",
+    "\n\n".join([PARAGRAPH] * 6),
+    "## Momentum",
+    "Momentum " * 120,
+    "## Units",
+    "kilogrammetrepersecondsquared" * 20,
+])
+
+
+def words(text):
+    return text.split()
+
+
+def test_short_note_is_one_chunk():
+    assert NoteChunker(BUDGET).split(PARAGRAPH) == [PARAGRAPH]
+
+
+def test_chunks_respect_the_budget():
+    chunks = NoteChunker(BUDGET).split(NOTE)
+    
+    assert len(chunks) > 3
+    assert all(estimate_tokens(chunk) <= BUDGET for chunk in chunks)
+
+
+def test_chunks_keep_the_text_in_order():
+    chunks = NoteChunker(BUDGET).split(NOTE)
+    
+    # Only the cuts inside unbroken words change the word boundaries
+    assert "".join("".join(words(chunk)) for chunk in chunks) == "".join(words(NOTE))
+    assert chunks[0].startswith("# Mechanics")
+
+
+def test_headings_start_new_chunks_when_sections_do_not_fit():
+    sections = [f"# Topic {number}\n\n" + PARAGRAPH * 2 for number in range(4)]
+    
+    chunks = NoteChunker(BUDGET + 20).split("\n\n".join(sections))
+    
+    assert chunks == [section.strip() for section in sections]
+
+
+def test_small_sections_are_packed_together():
+    sections = [f"# Topic {number}\n\nShort." for number in range(10)]
+    
+    chunks = NoteChunker(BUDGET).split("\n\n".join(sections) + "\n\n" + PARAGRAPH * 4)
+    
+    assert chunks[0].startswith("# Topic 0") and "# Topic 5" in chunks[0]
+
+
+def test_iter_chunks_matches_split_on_pages():
+    pages = [NOTE[:400], NOTE[400:900], NOTE[900:]]
+    chunker = NoteChunker(BUDGET)
+    
+    assert list(chunker.iter_chunks(pages)) == chunker.split(PAGE_BREAK.join(pages))
+
+
+def spy_on_requests(client):
+    """Record the prompt and token limit of every request the client sends."""
+    sent = []
+    complete = client._complete
+    
+    def record(messages, max_tokens, max_retries):
+        sent.append((messages[-1]["content"], max_tokens))
+        return complete(messages, max_tokens, max_retries)
+    
+    client._complete = record
+    return sent
+
+
+def test_short_note_skips_the_map_step(mock_openai):
+    client = StudyAssistantClient("test", base_url=mock_openai(), chunk_token_budget=BUDGET)
+    sent = spy_on_requests(client)
+    
+    assert client.generate_study_material(PARAGRAPH) is not None
+    
+    assert sent == [(client.build_prompt(PARAGRAPH), client.MAX_TOKENS)]
+
+
+def test_long_note_is_mapped_then_reduced(mock_openai):
+    client = StudyAssistantClient("test", base_url=mock_openai(), chunk_token_budget=BUDGET)
+    sent = spy_on_requests(client)
+    chunks = client.split_note(NOTE)
+    
+    assert client.generate_study_material(NOTE) is not None
+    
+    # One request per chunk, then the merge of their study notes
+    mapped, (reduce_prompt, reduce_tokens) = sent[:-1], sent[-1]
+    assert len(mapped) == len(chunks)
+    assert all(max_tokens == client.CHUNK_MAX_TOKENS for _, max_tokens in mapped)
+    assert sorted(prompt for prompt, _ in mapped) == sorted(
+        client.build_chunk_prompt(chunk, part, len(chunks))
+        for part, chunk in enumerate(chunks, start=1)
+    )
+    assert reduce_tokens == client.MAX_TOKENS
+    assert f"part {len(chunks)}" in reduce_prompt.lower()
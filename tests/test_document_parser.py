@@ -0,0 +1,94 @@
+"""Tests for streaming document parsing."""
+
+import pytest
+from corpus import write_docx, write_pdf
+
+from study_assistant.document_parser import DocumentParser, score_page_text
+
+PAGES = [f"Lecture part {number}\n\nThe {number} topic covers energy and force." for number in range(1, 6)]
+
+
+def test_text_blocks_reproduce_the_file(tmp_path):
+    note = tmp_path / "physics_lecture.md"
+    note.write_text("# Forces\nNewton\n\n\nMomentum\n\n## Energy\nWork  \n", encoding="utf-8")
+    parser = DocumentParser()
+    
+    assert "".join(parser.iter_blocks(note)) == parser.parse_file(note)
+    pages = list(parser.iter_pages(note, page_chars=10))
+    assert len(pages) > 1
+    assert DocumentParser.page_separator(note).join(pages) == parser.parse_file(note)
+
+
+def test_docx_pages_come_in_order(tmp_path):
+    note = tmp_path / "physics_lecture.docx"
+    write_docx(note, PAGES)
+    parser = DocumentParser()
+    
+    pages = list(parser.iter_pages(note, page_chars=60))
+    
+    assert len(pages) > 1
+    text = DocumentParser.page_separator(note).join(pages)
+    assert text == parser.parse_file(note)
+    positions = [text.index(f"Lecture part {number}") for number in range(1, 6)]
+    assert positions == sorted(positions)
+
+
+@pytest.mark.parametrize("extractor", DocumentParser.EXTRACTORS)
+def test_pdf_pages_come_in_order(tmp_path, extractor):
+    note = tmp_path / "physics_lecture.pdf"
+    write_pdf(note, PAGES)
+    parser = DocumentParser(extractor=extractor)
+    
+    pages = list(parser.iter_pages(note))
+    
+    assert len(pages) == len(PAGES)
+    for number, page in enumerate(pages, start=1):
+        assert page.startswith(f"Lecture part {number}")
+    assert DocumentParser.page_separator(note).join(pages) == parser.parse_file(note)
+
+
+# A US Letter page, in PDF points
+LETTER_AREA = 612 * 792
+
+
+@pytest.mark.parametrize("text, low, high", [
+    ("", 0.0, 0.0),
+    ("   \n ", 0.0, 0.0),
+    ("Newton's second law relates force, mass and acceleration.", 1.0, 1.0),
+    # Undecoded glyphs
+    ("(cid:12)(cid:40)(cid:7) force (cid:3)(cid:9)", 0.0, 0.3),
+    ("���� force", 0.0, 0.6),
+    # Missing spaces
+    ("Newtonssecondlawrelatesforcemassandacceleration", 0.2, 0.4),
+    # Letter-spaced
+    ("N e w t o n s  s e c o n d  l a w  r e l a t e s  f o r c e", 0.0, 0.1),
+])
+def test_score_page_text(text, low, high):
+    assert low <= score_page_text(text) <= high
+
+
+def test_score_page_text_penalises_sparse_pages():
+    heading = "Newton's laws"
+    
+    assert score_page_text(heading, LETTER_AREA) < 0.5
+    assert score_page_text(heading * 10, LETTER_AREA) == 1.0
+    # Without an area there is no density penalty
+    assert score_page_text(heading) == 1.0
+
+
+def test_adaptive_keeps_pypdf_text_on_sparse_pages(tmp_path, monkeypatch):
+    note = tmp_path / "physics_lecture.pdf"
+    write_pdf(note, [f"Lecture {number}" for number in range(1, 4)])
+    parser = DocumentParser(extractor="adaptive")
+    replaced = []
+    monkeypatch.setattr(
+        DocumentParser,
+        "_log_extractor_stats",
+        staticmethod(lambda filepath, page_count, pages: replaced.append(pages))
+    )
+    
+    # Sparse pages score low with both libraries, so neither pass replaces one
+    parser.parse_pdf_adaptive(note)
+    list(parser.iter_pdf_pages_adaptive(note))
+    
+    assert replaced == [[], []]
@@ -0,0 +1,100 @@
+"""Tests for the extracted-text cache in FileHandler."""
+
+import os
+
+from corpus import write_docx, write_pdf
+
+from study_assistant.cache import open_text_cache
+from study_assistant.document_parser import DocumentParser
+from study_assistant.file_handler import FileHandler
+
+PAGES = ["Forces\nNewton's laws of motion.", "Energy\nWork and kinetic energy."]
+
+
+def file_handler(config, parser=None):
+    handler = FileHandler(
+        config.notes_incoming_dir,
+        config.processed_index_path,
+        parser,
+        open_text_cache(config)
+    )
+    calls = []
+    parse_file, iter_pages = handler.parser.parse_file, handler.parser.iter_pages
+    handler.parser.parse_file = lambda filepath: calls.append(filepath) or parse_file(filepath)
+    handler.parser.iter_pages = lambda filepath: calls.append(filepath) or iter_pages(filepath)
+    return handler, calls
+
+
+def test_text_is_parsed_once_per_version(app_config):
+    config = app_config("http://127.0.0.1:1")
+    note = config.notes_incoming_dir / "physics_lecture.docx"
+    write_docx(note, PAGES)
+    handler, calls = file_handler(config)
+    
+    text = handler.read_note_file(note)
+    assert handler.read_note_file(note) == text
+    assert len(calls) == 1
+    
+    # A touch keeps the content, so the cached text is still used
+    os.utime(note, ns=(1, 1))
+    assert handler.read_note_file(note) == text
+    assert len(calls) == 1
+    
+    write_docx(note, PAGES + ["Momentum\nMass times velocity."])
+    assert "Momentum" in handler.read_note_file(note)
+    assert len(calls) == 2
+    handler.text_cache.close()
+
+
+def test_pages_and_whole_reads_share_the_cache(app_config):
+    config = app_config("http://127.0.0.1:1")
+    note = config.notes_incoming_dir / "physics_lecture.pdf"
+    write_pdf(note, PAGES)
+    handler, calls = file_handler(config)
+    
+    pages = list(handler.iter_note_pages(note))
+    assert handler.read_note_file(note) == DocumentParser.page_separator(note).join(pages)
+    assert list(handler.iter_note_pages(note)) == pages
+    assert len(calls) == 1
+    handler.text_cache.close()
+
+
+def test_changing_the_extractor_invalidates_cached_text(app_config):
+    config = app_config("http://127.0.0.1:1")
+    note = config.notes_incoming_dir / "physics_lecture.pdf"
+    write_pdf(note, PAGES)
+    
+    first, first_calls = file_handler(config, DocumentParser(extractor="pypdf"))
+    first.read_note_file(note)
+    first.text_cache.close()
+    second, second_calls = file_handler(config, DocumentParser(extractor="pdfplumber"))
+    second.read_note_file(note)
+    second.text_cache.close()
+    
+    assert len(first_calls) == len(second_calls) == 1
+
+
+def test_plain_text_is_not_cached(app_config):
+    config = app_config("http://127.0.0.1:1")
+    note = config.notes_incoming_dir / "physics_lecture.txt"
+    note.write_text("Forces", encoding="utf-8")
+    handler, calls = file_handler(config)
+    
+    handler.read_note_file(note)
+    handler.read_note_file(note)
+    
+    assert len(calls) == 2
+    assert handler.text_cache.stats()["entries"] == 0
+    handler.text_cache.close()
+
+
+def test_zero_size_disables_the_cache(app_config):
+    config = app_config("http://127.0.0.1:1", TEXT_CACHE_MAX_MB=0)
+    note = config.notes_incoming_dir / "physics_lecture.docx"
+    write_docx(note, PAGES)
+    handler, calls = file_handler(config)
+    
+    assert handler.text_cache is None
+    assert handler.read_note_file(note) == handler.read_note_file(note)
+    assert len(calls) == 2
+    assert not (config.cache_dir / "parsed_text.sqlite3").exists()
@@ -0,0 +1,67 @@
+"""Check that light CLI commands start without importing heavy dependencies."""
+
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+import pytest
+
+# Modules that only the processing commands may import
+HEAVY_MODULES = ("openai", "weasyprint", "pdfplumber", "pypdf", "docx", "markdown")
+
+# Import time allowed per command; the fastest of RUNS counts
+BUDGET_MS = 500.0
+RUNS = 3
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def measure(args: List[str], env: Dict[str, str], cwd: str) -> Tuple[float, List[str]]:
+    """
+    Run one CLI command with -X importtime.
+    
+    Args:
+        args: CLI arguments after ``-m study_assistant``
+        env: Process environment
+        cwd: Working directory
+    
+    Returns:
+        Total import time in milliseconds and the top-level modules imported
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "study_assistant", *args],
+        env=env,
+        cwd=cwd,
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0, result.stderr
+    
+    total_us = 0
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        modules.append(match.group(4).split(".")[0])
+        # Only top-level entries: their cumulative time includes their imports
+        if not match.group(3):
+            total_us += int(match.group(2))
+    return total_us / 1000, modules
+
+
+@pytest.mark.parametrize("command", [["info"], ["--help"]], ids=["info", "help"])
+def test_light_commands_import_quickly(command, tmp_path):
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-import-time-check")
+    env["NOTES_INCOMING_DIR"] = str(tmp_path / "incoming")
+    env["NOTES_OUTPUT_DIR"] = str(tmp_path / "output")
+    
+    runs = [measure(command, env, str(tmp_path)) for _ in range(RUNS)]
+    
+    heavy = sorted(set(HEAVY_MODULES) & set(runs[0][1]))
+    assert not heavy, f"study_assistant {' '.join(command)} imports {', '.join(heavy)}"
+    best_ms = min(total for total, _ in runs)
+    assert best_ms <= BUDGET_MS, f"imports took {best_ms:.0f} ms (budget {BUDGET_MS:.0f} ms)"
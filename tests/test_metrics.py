@@ -0,0 +1,91 @@
+"""Tests for the Prometheus textfile and JSON metrics export."""
+
+import json
+import re
+
+import pytest
+
+from study_assistant import metrics
+from study_assistant.metrics import BUCKETS, JSON_FILE, PROMETHEUS_FILE, Metrics
+
+# name{labels} value, as in the Prometheus text exposition format
+SAMPLE = re.compile(r'^[a-z_]+(\{[a-z_]+="(?:[^"\\]|\\.)*"(,[a-z_]+="(?:[^"\\]|\\.)*")*\})? [0-9.e+-]+$')
+
+
+@pytest.fixture
+def registry():
+    registry = Metrics()
+    with registry.track("physics_lecture1.txt", 'phys"ics') as record:
+        metrics.observe("parse", 0.03)
+        metrics.observe("llm", 1.5)
+        metrics.count("prompt_tokens", 100)
+    registry.finish(record, True)
+    registry.set_gauge("queue_depth", 3)
+    registry.set_gauge("endpoint_in_flight", 0.5, endpoint="b")
+    registry.set_gauge("endpoint_in_flight", 2, endpoint="a")
+    return registry
+
+
+def test_prometheus_exposition(registry):
+    lines = registry.prometheus().splitlines()
+    
+    for line in lines:
+        assert line.startswith("# HELP ") or line.startswith("# TYPE ") or SAMPLE.match(line), line
+    
+    labels = 'stage="llm",subject="phys\\"ics"'
+    llm_buckets = [line for line in lines if line.startswith(f"notepal_stage_duration_seconds_bucket{{{labels},")]
+    assert len(llm_buckets) == len(BUCKETS) + 1
+    # Cumulative counts, ending with +Inf
+    assert [int(line.rsplit(" ", 1)[1]) for line in llm_buckets] == [0] * 6 + [1] * 8
+    assert llm_buckets[-1] == f'notepal_stage_duration_seconds_bucket{{{labels},le="+Inf"}} 1'
+    assert f"notepal_stage_duration_seconds_sum{{{labels}}} 1.500000" in lines
+    assert f"notepal_stage_duration_seconds_count{{{labels}}} 1" in lines
+    
+    assert lines[lines.index("# TYPE notepal_prompt_tokens_total counter") + 1] == (
+        'notepal_prompt_tokens_total{subject="phys\\"ics"} 100'
+    )
+    assert 'notepal_files_succeeded_total{subject="phys\\"ics"} 1' in lines
+    # Counters nothing recorded are left out
+    assert not any("files_failed" in line for line in lines)
+    
+    # Each gauge gets one TYPE line, its series sorted by label
+    gauges = lines[lines.index("# TYPE notepal_endpoint_in_flight gauge"):]
+    assert gauges == [
+        "# TYPE notepal_endpoint_in_flight gauge",
+        'notepal_endpoint_in_flight{endpoint="a"} 2',
+        'notepal_endpoint_in_flight{endpoint="b"} 0.5',
+        "# TYPE notepal_queue_depth gauge",
+        "notepal_queue_depth 3",
+    ]
+
+
+def test_label_values_are_escaped():
+    assert metrics._escape('a\\b"c\nd') == 'a\\\\b\\"c\\nd'
+
+
+def test_export_writes_both_files(registry, tmp_path):
+    directory = tmp_path / "metrics"
+    
+    registry.export(directory)
+    
+    assert (directory / PROMETHEUS_FILE).read_text(encoding="utf-8") == registry.prometheus()
+    summary = json.loads((directory / JSON_FILE).read_text(encoding="utf-8"))
+    assert summary["totals"]["counters"] == {"prompt_tokens": 100, "files_succeeded": 1}
+    assert summary["totals"]["gauges"] == {"endpoint_in_flight": {"a": 2, "b": 0.5}, "queue_depth": 3}
+    assert summary["files"][0]["success"] is True
+    assert sorted(path.name for path in directory.iterdir()) == sorted([PROMETHEUS_FILE, JSON_FILE])
+
+
+def test_failed_export_keeps_the_previous_files(registry, tmp_path, monkeypatch):
+    directory = tmp_path / "metrics"
+    directory.mkdir()
+    (directory / PROMETHEUS_FILE).write_text("# previous\n", encoding="utf-8")
+    
+    def fail(src, dst):
+        raise OSError("disk full")
+    
+    monkeypatch.setattr(metrics.os, "replace", fail)
+    registry.export(directory)
+    
+    # A collector reading the directory still sees the last complete file
+    assert (directory / PROMETHEUS_FILE).read_text(encoding="utf-8") == "# previous\n"
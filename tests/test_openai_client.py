@@ -0,0 +1,18 @@
+"""Tests for the OpenAI client's response cache."""
+
+from study_assistant.backends import Endpoint, EndpointConfig, EndpointPool
+from study_assistant.cache import DiskCache
+from study_assistant.openai_client import StudyAssistantClient
+
+
+def test_cache_key_uses_the_model_sent(tmp_path, mock_openai):
+    base_url = mock_openai()
+    pool = EndpointPool([Endpoint(EndpointConfig(name="a", base_url=base_url, model="model-a"), "test")])
+    cache = DiskCache(tmp_path / "cache.db", 1024 * 1024)
+    client = StudyAssistantClient("test", model="default-model", cache=cache, endpoints=pool)
+    
+    assert client.generate_study_material("Limits and derivatives") is not None
+    
+    messages = client.build_messages(client.build_prompt("Limits and derivatives"))
+    assert cache.get(client.cache_key(messages, client.MAX_TOKENS, "model-a")) is not None
+    assert cache.get(client.cache_key(messages, client.MAX_TOKENS)) is None
@@ -0,0 +1,67 @@
+"""Tests for PDF rendering."""
+
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+from study_assistant import pdf_generator
+from study_assistant.pdf_generator import PDFGenerator, PDFRenderPool
+
+
+class MissingWeasyPrint:
+    def __init__(self):
+        raise OSError("cannot load library 'libpango-1.0-0'")
+
+
+def test_setup_errors_fail_the_render(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_generator, "PDFRenderer", MissingWeasyPrint)
+    monkeypatch.setattr(pdf_generator, "_renderer", None)
+    pdf_path = tmp_path / "notes.pdf"
+    
+    assert PDFGenerator.markdown_to_pdf("# Notes", pdf_path) is False
+    assert pdf_generator.render_pdf("# Notes", pdf_path, "Notes") is False
+    assert PDFRenderPool(0, 1).submit("# Notes", pdf_path, "Notes").result() is False
+
+
+class FlakyExecutor:
+    """Process pool stand-in whose first instance has lost a worker."""
+    
+    created = []
+    always_broken = False
+    
+    def __init__(self, max_workers, mp_context):
+        self.broken = not FlakyExecutor.created or FlakyExecutor.always_broken
+        FlakyExecutor.created.append(self)
+    
+    def submit(self, fn, *args):
+        future = Future()
+        if self.broken:
+            future.set_exception(BrokenProcessPool("A worker process died"))
+        else:
+            future.set_result(fn(*args))
+        return future
+
+
+def use_flaky_executor(monkeypatch, always_broken):
+    monkeypatch.setattr(FlakyExecutor, "created", [])
+    monkeypatch.setattr(FlakyExecutor, "always_broken", always_broken)
+    monkeypatch.setattr(pdf_generator, "ProcessPoolExecutor", FlakyExecutor)
+    monkeypatch.setattr(pdf_generator, "render_pdf", lambda markdown_content, output_path, title: True)
+
+
+def test_broken_pool_resubmits_to_a_fresh_pool(tmp_path, monkeypatch):
+    use_flaky_executor(monkeypatch, always_broken=False)
+    pool = PDFRenderPool(2, 1)
+    
+    assert pool.submit("# Notes", tmp_path / "notes.pdf", "Notes").result() is True
+    assert len(FlakyExecutor.created) == 2
+    assert pool._executor is FlakyExecutor.created[1]
+
+
+def test_render_fails_once_resubmits_are_used_up(tmp_path, monkeypatch):
+    use_flaky_executor(monkeypatch, always_broken=True)
+    pool = PDFRenderPool(2, 1)
+    
+    assert pool.submit("# Notes", tmp_path / "notes.pdf", "Notes").result() is False
+    assert len(FlakyExecutor.created) == 1 + PDFRenderPool.MAX_RESUBMITS
+    # The slot was released, so the next render is not blocked
+    assert pool.submit("# Notes", tmp_path / "notes.pdf", "Notes").result() is False
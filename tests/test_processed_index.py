@@ -0,0 +1,80 @@
+"""Tests for the SQLite processed index."""
+
+import os
+import sqlite3
+
+from study_assistant.file_handler import FileHandler
+from study_assistant.processed_index import ProcessedIndex
+
+
+ENTRY = {"size": 10, "mtime_ns": 1, "digest": "abc", "processed_at": "2024-01-01T00:00:00"}
+
+
+def test_set_does_not_hold_the_write_lock(tmp_path):
+    path = tmp_path / "index.db"
+    index = ProcessedIndex(path)
+    index.set("math_a.txt", ENTRY)
+    
+    # Another process must be able to write straight away
+    other = sqlite3.connect(str(path), timeout=0.1)
+    other.execute("BEGIN IMMEDIATE")
+    other.execute("INSERT OR REPLACE INTO processed VALUES ('math_b.txt', 1, 1, 'def', NULL)")
+    other.commit()
+    other.close()
+    
+    assert index.get("math_a.txt")["digest"] == "abc"
+    assert "math_b.txt" in index
+    index.close()
+
+
+def test_two_indexes_share_one_file(tmp_path):
+    path = tmp_path / "index.db"
+    first = ProcessedIndex(path)
+    second = ProcessedIndex(path)
+    second._conn.execute("PRAGMA busy_timeout = 100")
+    
+    first.set("math_a.txt", ENTRY)
+    second.set("math_b.txt", dict(ENTRY, digest="def"))
+    
+    assert first.find_by_digest("def") == "math_b.txt"
+    assert len(second) == 2
+    first.close()
+    second.close()
+
+
+def test_legacy_json_is_migrated_once(tmp_path):
+    legacy = tmp_path / "processed_index.json"
+    legacy.write_text('{"math_a.txt": "2024-01-01T00:00:00"}', encoding="utf-8")
+    
+    with ProcessedIndex.open(legacy) as index:
+        assert "math_a.txt" in index
+        assert index.get_meta("migrated_from") == str(legacy)
+    
+    legacy.write_text('{"math_b.txt": "2024-01-02T00:00:00"}', encoding="utf-8")
+    with ProcessedIndex.open(legacy) as index:
+        assert list(index) == ["math_a.txt"]
+
+
+def test_is_processed_refresh_does_not_hold_the_write_lock(tmp_path):
+    incoming = tmp_path / "incoming"
+    handler = FileHandler(incoming, tmp_path / "index.db")
+    note = incoming / "math_a.txt"
+    note.write_text("derivatives", encoding="utf-8")
+    index = handler.load_processed_index()
+    handler.mark_processed(note, index)
+    
+    # A touch refreshes the entry; a copy is marked as a duplicate
+    os.utime(note, ns=(1, 1))
+    copy = incoming / "math_copy.txt"
+    copy.write_text("derivatives", encoding="utf-8")
+    assert handler.is_processed(note, index)
+    assert handler.is_processed(copy, index)
+    
+    other = sqlite3.connect(str(tmp_path / "index.db"), timeout=0.1)
+    other.execute("BEGIN IMMEDIATE")
+    other.rollback()
+    other.close()
+    
+    assert index.get("math_a.txt")["mtime_ns"] == 1
+    assert "math_copy.txt" in index
+    index.close()
@@ -0,0 +1,78 @@
+"""Tests for the note processing pipeline."""
+
+from corpus import write_pdf
+from mock_openai_server import MockOpenAIState
+
+from study_assistant import processor
+from study_assistant.processor import NoteProcessor
+
+
+def test_long_pdf_is_chunked_while_parsing(app_config, mock_openai, monkeypatch):
+    state = MockOpenAIState()
+    config = app_config(mock_openai(state), CHUNK_TOKEN_BUDGET=60)
+    note = config.notes_incoming_dir / "physics_lecture.pdf"
+    write_pdf(note, [f"Lecture part {number}\n\nEnergy, force and momentum." for number in range(20)])
+    note_processor = NoteProcessor(config)
+    
+    def parse_whole(filepath):
+        raise AssertionError("the note should be read page by page")
+    
+    monkeypatch.setattr(note_processor.file_handler.parser, "parse_file", parse_whole)
+    assert note_processor._process_single_note(note)
+    note_processor.close()
+    
+    # Several chunk requests and the merge
+    assert state.requests > 3
+    assert (processor.OUTPUT_BASE / "physics" / "physics_lecture_study.md").exists()
+    # The extracted text was cached for the next read
+    assert note_processor.file_handler.read_note_file(note).startswith("Lecture part 0")
+
+
+def test_profiling_renders_pdfs_inline(app_config, mock_openai):
+    config = app_config(mock_openai(), PDF_WORKERS=2)
+    
+    assert NoteProcessor(config).pdf_pool.workers == 2
+    # The profiler samples this process only
+    note_processor = NoteProcessor(config, profile=True)
+    assert note_processor.pdf_pool.workers == 0
+    note_processor.close()
+
+
+def test_note_edited_during_generation_is_redone(app_config, mock_openai, monkeypatch):
+    config = app_config(mock_openai())
+    note = config.notes_incoming_dir / "math_lecture1.txt"
+    note.write_text("Limits", encoding="utf-8")
+    note_processor = NoteProcessor(config)
+    save_output = note_processor.file_handler.save_output
+    
+    def save_then_edit(output_path, content):
+        save_output(output_path, content)
+        note.write_text("Limits and continuity", encoding="utf-8")
+    
+    monkeypatch.setattr(note_processor.file_handler, "save_output", save_then_edit)
+    assert note_processor.process_all_notes() == {"math_lecture1.txt": True}
+    monkeypatch.setattr(note_processor.file_handler, "save_output", save_output)
+    
+    # The edit was not recorded as processed
+    assert note_processor.process_all_notes() == {"math_lecture1.txt": True}
+    assert note_processor.process_all_notes() == {}
+    note_processor.close()
+
+
+def test_failed_pdf_is_reported_but_not_regenerated(app_config, mock_openai, monkeypatch):
+    config = app_config(mock_openai())
+    for name in ("math_lecture1.txt", "physics_lecture1.txt"):
+        (config.notes_incoming_dir / name).write_text("Limits", encoding="utf-8")
+    note_processor = NoteProcessor(config)
+    
+    def render(markdown_content, output_path, title):
+        return NoteProcessor._resolved(output_path.name.startswith("physics"))
+    
+    monkeypatch.setattr(note_processor.pdf_pool, "submit", render)
+    assert note_processor.process_all_notes() == {"math_lecture1.txt": True, "physics_lecture1.txt": True}
+    
+    # The Markdown is saved, so the note counts as processed; the PDF failure is kept for the summary
+    assert note_processor.pdf_failures == ["math_lecture1.txt"]
+    assert note_processor.metrics.summary()["totals"]["counters"]["pdf_failed"] == 1
+    assert note_processor.process_all_notes() == {}
+    note_processor.close()
@@ -0,0 +1,98 @@
+"""Tests for client-side rate limiting."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from study_assistant import rate_limiter
+from study_assistant.rate_limiter import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    """Stands in for the time module: sleeping advances the clock at once."""
+    
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+    
+    def monotonic(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+def test_bucket_starts_full_and_refills(clock):
+    # 60 per minute with a 5 second burst: one per second, five at once
+    bucket = TokenBucket(60, 5)
+    assert bucket.capacity == 5
+    
+    assert [bucket.reserve(1, clock.now) for _ in range(5)] == [0.0] * 5
+    assert bucket.reserve(1, clock.now) == pytest.approx(1.0)
+    
+    # Refilled at the rate, never past capacity
+    assert bucket.reserve(0, clock.now + 0.5) == pytest.approx(0.5)
+    assert bucket.reserve(0, clock.now + 60) == 0.0
+    assert bucket.level == bucket.capacity
+
+
+def test_bucket_reservations_go_into_debt(clock):
+    bucket = TokenBucket(600, 1)
+    assert bucket.capacity == 10
+    
+    # A reservation larger than the bucket waits for the whole debt
+    assert bucket.reserve(40, clock.now) == pytest.approx(3.0)
+    assert bucket.reserve(10, clock.now) == pytest.approx(4.0)
+
+
+def test_capacity_is_at_least_one_request(clock):
+    assert TokenBucket(6, 1).capacity == 1.0
+
+
+def test_requests_are_spaced_once_the_burst_is_spent(clock):
+    limiter = RateLimiter(requests_per_minute=120, burst_seconds=1)
+    
+    waits = [limiter.acquire(0) for _ in range(6)]
+    
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2:] == [pytest.approx(0.5)] * 4
+    assert clock.sleeps == [pytest.approx(0.5)] * 4
+
+
+def test_token_quota_blocks_large_requests(clock):
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=6000, burst_seconds=1)
+    
+    assert limiter.acquire(100) == 0.0
+    # 100 tokens per second: 250 more tokens puts the bucket 250 in debt
+    assert limiter.acquire(250) == pytest.approx(2.5)
+    assert limiter.reserve(1) == pytest.approx(0.01)
+
+
+def test_tokens_are_ignored_without_a_token_quota(clock):
+    limiter = RateLimiter(requests_per_minute=600, burst_seconds=1)
+    
+    assert limiter.tokens is None
+    assert limiter.reserve(10 ** 9) == 0.0
+
+
+def test_acquire_async_waits_on_the_event_loop(clock, monkeypatch):
+    async def fake_sleep(seconds):
+        clock.sleep(seconds)
+    
+    monkeypatch.setattr(rate_limiter, "asyncio", SimpleNamespace(sleep=fake_sleep))
+    limiter = RateLimiter(requests_per_minute=60, burst_seconds=1)
+    
+    async def run():
+        return [await limiter.acquire_async(0) for _ in range(3)]
+    
+    assert asyncio.run(run()) == [0.0, pytest.approx(1.0), pytest.approx(1.0)]
+    assert clock.now == pytest.approx(1002.0)
@@ -0,0 +1,101 @@
+"""Tests for shortest-job-first ordering and run token budgets."""
+
+import logging
+
+from corpus import write_docx, write_pdf
+
+from study_assistant.document_parser import DocumentParser
+from study_assistant.processor import NoteProcessor
+from study_assistant.scheduler import TOKENS_PER_PDF_PAGE, CostEstimator, TokenBudget
+
+
+def estimator():
+    return CostEstimator(DocumentParser(), lambda text_tokens: text_tokens)
+
+
+def test_notes_are_ordered_cheapest_first(tmp_path):
+    long_text = tmp_path / "math_long.txt"
+    long_text.write_text("Limits " * 1000, encoding="utf-8")
+    short_text = tmp_path / "math_short.txt"
+    short_text.write_text("Limits", encoding="utf-8")
+    slides = tmp_path / "physics_slides.pdf"
+    write_pdf(slides, ["Forces", "Energy", "Momentum"])
+    handout = tmp_path / "physics_handout.docx"
+    write_docx(handout, ["Forces\nNewton's laws."])
+    
+    costs = estimator().shortest_first([long_text, slides, handout, short_text])
+    
+    assert [cost.filepath for cost in costs] == [short_text, handout, slides, long_text]
+    assert costs[2].pages == 3
+    assert costs[2].tokens == 3 * TOKENS_PER_PDF_PAGE
+
+
+def test_ties_keep_input_order(tmp_path):
+    notes = [tmp_path / f"math_{name}.txt" for name in "cab"]
+    for note in notes:
+        note.write_text("Limits", encoding="utf-8")
+    
+    assert [cost.filepath for cost in estimator().shortest_first(notes)] == notes
+
+
+def test_unreadable_notes_are_still_scheduled(tmp_path):
+    broken = tmp_path / "physics_broken.pdf"
+    broken.write_bytes(b"not a pdf " * 100)
+    missing = tmp_path / "physics_missing.pdf"
+    
+    costs = estimator().shortest_first([broken, missing])
+    
+    assert [cost.filepath for cost in costs] == [missing, broken]
+    assert costs[0].tokens == 0
+    assert costs[1].tokens == 250
+
+
+def test_budget_refuses_the_first_note_that_does_not_fit():
+    budget = TokenBudget(100)
+    
+    assert budget.reserve(40)
+    assert budget.reserve(40)
+    assert not budget.reserve(30)
+    # Once refused, even a note that would fit is left for the next run
+    assert not budget.reserve(10)
+    assert budget.exhausted
+
+
+def test_settle_replaces_the_reservation_with_tokens_used():
+    budget = TokenBudget(100)
+    budget.reserve(60)
+    budget.settle(60, 20)
+    assert (budget.spent, budget.reserved) == (20, 0)
+    
+    # Unknown usage is charged at the estimate
+    budget.reserve(50)
+    budget.settle(50, None)
+    assert (budget.spent, budget.reserved) == (70, 0)
+    assert budget.reserve(30)
+    assert not budget.reserve(1)
+
+
+def test_note_over_the_whole_budget_ends_the_run():
+    budget = TokenBudget(100)
+    
+    assert not budget.reserve(101)
+    assert not budget.reserve(1)
+
+
+def test_run_stops_at_the_budget(app_config, mock_openai, caplog):
+    config = app_config(mock_openai())
+    incoming = config.notes_incoming_dir
+    for name, words in [("math_a.txt", 10), ("math_b.txt", 20), ("math_c.txt", 4000)]:
+        (incoming / name).write_text("Limits " * words, encoding="utf-8")
+    note_processor = NoteProcessor(config)
+    costs = note_processor.cost_estimator.shortest_first(note_processor.file_handler.list_incoming_files())
+    budget = costs[0].tokens + costs[1].tokens
+    
+    with caplog.at_level(logging.WARNING, logger="study_assistant.processor"):
+        results = note_processor.process_all_notes(token_budget=budget)
+    
+    assert results == {"math_a.txt": True, "math_b.txt": True}
+    assert "math_c.txt is estimated at" in caplog.text
+    # The note left over is picked up by the next run
+    assert note_processor.process_all_notes() == {"math_c.txt": True}
+    note_processor.close()
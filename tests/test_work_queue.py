@@ -0,0 +1,164 @@
+"""Tests for the watcher's coalescing work queue."""
+
+import threading
+
+import pytest
+
+from study_assistant import work_queue
+from study_assistant.work_queue import CoalescingQueue, QueueClosed
+
+
+class FakeClock:
+    """Stands in for the time module so waits and run times are exact."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def monotonic(self):
+        return self.now
+
+
+def test_put_get_task_done_in_order():
+    queue = CoalescingQueue(4)
+    assert queue.put("a") and queue.put("b")
+    
+    assert queue.get() == "a"
+    assert queue.get() == "b"
+    assert queue.stats()["in_flight"] == 2
+    queue.task_done("a")
+    queue.task_done("b")
+    
+    assert queue.join(timeout=0)
+    assert queue.get(timeout=0) is None
+
+
+def test_close_wakes_workers_and_rejects_items():
+    queue = CoalescingQueue(4)
+    queue.put("a")
+    results = []
+    worker = threading.Thread(target=lambda: results.extend([queue.get(), queue.get()]))
+    worker.start()
+    
+    queue.close()
+    worker.join(timeout=5)
+    
+    assert results[0] == "a"
+    assert results[1] is None
+    with pytest.raises(QueueClosed):
+        queue.put("b")
+
+
+def test_waiting_item_coalesces():
+    queue = CoalescingQueue(4)
+    assert queue.put("a")
+    assert not queue.put("a")
+    
+    assert len(queue) == 1
+    assert queue.stats()["coalesced"] == 1
+
+
+def test_active_item_is_requeued_once_done():
+    queue = CoalescingQueue(4)
+    queue.put("a")
+    assert queue.get() == "a"
+    
+    # Changed again while a worker has it: not handed to a second worker
+    assert not queue.put("a")
+    assert not queue.put("a")
+    assert queue.get(timeout=0) is None
+    
+    queue.task_done("a")
+    assert queue.get(timeout=0) == "a"
+    queue.task_done("a")
+    assert queue.get(timeout=0) is None
+
+
+def test_full_queue_pushes_back():
+    queue = CoalescingQueue(2)
+    queue.put("a")
+    queue.put("b")
+    
+    assert not queue.put("c", block=False)
+    assert not queue.put("c", timeout=0.05)
+    
+    # A blocked producer continues once a worker takes an item
+    queued = []
+    producer = threading.Thread(target=lambda: queued.append(queue.put("c")))
+    producer.start()
+    producer.join(timeout=0.1)
+    assert producer.is_alive()
+    assert queue.get() == "a"
+    producer.join(timeout=5)
+    
+    assert queued == [True]
+    assert [queue.get(), queue.get()] == ["b", "c"]
+    assert queue.stats()["max_depth"] == 2
+
+
+def test_blocked_producers_coalesce_once_woken():
+    queue = CoalescingQueue(1)
+    queue.put("y")
+    queued = []
+    producers = [
+        threading.Thread(target=lambda: queued.append(queue.put("x")))
+        for _ in range(2)
+    ]
+    for producer in producers:
+        producer.start()
+    producers[0].join(timeout=0.1)
+    
+    assert queue.get() == "y"
+    assert queue.get(timeout=5) == "x"
+    for producer in producers:
+        producer.join(timeout=5)
+    
+    # The second producer coalesced instead of queueing "x" behind itself
+    assert sorted(queued) == [False, True]
+    assert queue.get(timeout=0.05) is None
+    assert queue.stats()["in_flight"] == 2
+    queue.task_done("y")
+    queue.task_done("x")
+
+
+def test_close_releases_blocked_producer():
+    queue = CoalescingQueue(1)
+    queue.put("a")
+    errors = []
+    
+    def produce():
+        try:
+            queue.put("b")
+        except QueueClosed as e:
+            errors.append(e)
+    
+    producer = threading.Thread(target=produce)
+    producer.start()
+    queue.close()
+    producer.join(timeout=5)
+    
+    assert len(errors) == 1
+
+
+def test_wait_and_run_statistics(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(work_queue, "time", clock)
+    queue = CoalescingQueue(8)
+    
+    for item in range(4):
+        queue.put(item)
+    for item in range(4):
+        clock.now += 1.0
+        assert queue.get() == item
+        clock.now += 10.0 * (item + 1)
+        queue.task_done(item)
+    
+    stats = queue.stats()
+    # Waits of 1, 12, 33 and 64s: each item waits for those before it
+    assert (stats["wait_p50"], stats["wait_p95"]) == (33.0, 64.0)
+    assert (stats["run_p50"], stats["run_p95"]) == (30.0, 40.0)
+    assert (stats["enqueued"], stats["completed"], stats["depth"], stats["in_flight"]) == (4, 4, 0, 0)
+
+
+def test_statistics_are_zero_before_any_work():
+    stats = CoalescingQueue(4).stats()
+    assert stats["wait_p50"] == stats["run_p95"] == 0.0